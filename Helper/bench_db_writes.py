@@ -0,0 +1,125 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Runs against a throwaway SQLite file unless BENCH_DATABASE_URL points somewhere else.
+# Compare journal modes with e.g. SQLITE_JOURNAL_MODE=DELETE SQLITE_BUSY_TIMEOUT_MS=0.
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCH_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='maritime-db-bench-')}/bench.db"
+)
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+from app.database import AsyncSessionLocal, SessionLocal, SQLALCHEMY_DATABASE_URL, engine
+from app.migrations import run_migrations
+from app import models
+
+DURATION = float(os.getenv("BENCH_DURATION", "10"))
+API_WRITERS = int(os.getenv("BENCH_API_WRITERS", "16"))
+WATCHER_WRITERS = int(os.getenv("BENCH_WATCHER_WRITERS", "2"))
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = {"api": 0, "watcher": 0}
+        self.errors = {"api": 0, "watcher": 0}
+        self.latencies = []
+
+    def record(self, role, started, ok):
+        with self.lock:
+            if ok:
+                self.writes[role] += 1
+                self.latencies.append(time.perf_counter() - started)
+            else:
+                self.errors[role] += 1
+
+
+async def api_writer(counters, deadline):
+    # Same shape as POST /nominate: one insert per request on the async engine.
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(models.BunkerRecord(
+                    delivery_id=os.urandom(32).hex(),
+                    imo_number=f"IMO{random.randint(9000000, 9000099)}",
+                    supplier_id=random.randint(5500, 5599),
+                    sulphur_content=0.49,
+                    status="NOMINATED",
+                ))
+                await db.commit()
+            counters.record("api", started, True)
+        except OperationalError:
+            counters.record("api", started, False)
+
+
+def watcher_writer(counters, deadline):
+    # Same shape as process_finalized_event: update a delivery and enqueue its seal job.
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            record_id = db.execute(
+                select(models.BunkerRecord.id).where(models.BunkerRecord.status == "NOMINATED").limit(1)
+            ).scalar()
+            if record_id is None:
+                db.close()
+                time.sleep(0.01)
+                continue
+            claimed = db.execute(
+                update(models.BunkerRecord)
+                .where(models.BunkerRecord.id == record_id, models.BunkerRecord.status == "NOMINATED")
+                .values(status="FINALIZED", sig_supplier=os.urandom(65), sig_chief=os.urandom(65), actual_qty=500.0)
+            ).rowcount
+            if claimed:
+                delivery_id = db.get(models.BunkerRecord, record_id).delivery_id
+                db.add(models.SealJob(delivery_id=delivery_id))
+            db.commit()
+            counters.record("watcher", started, True)
+        except OperationalError:
+            db.rollback()
+            counters.record("watcher", started, False)
+        finally:
+            db.close()
+
+
+async def main():
+    run_migrations(engine)
+    counters = Counters()
+    deadline = time.perf_counter() + DURATION
+
+    threads = [threading.Thread(target=watcher_writer, args=(counters, deadline)) for _ in range(WATCHER_WRITERS)]
+    for t in threads:
+        t.start()
+    await asyncio.gather(*(api_writer(counters, deadline) for _ in range(API_WRITERS)))
+    for t in threads:
+        t.join()
+
+    with SessionLocal() as db:
+        rows = db.execute(select(func.count()).select_from(models.BunkerRecord)).scalar()
+        if engine.dialect.name == "sqlite":
+            journal_mode = db.connection().exec_driver_sql("PRAGMA journal_mode").scalar()
+        else:
+            journal_mode = "n/a"
+
+    latencies = sorted(counters.latencies) or [0.0]
+    total = sum(counters.writes.values())
+    print(f"Database:        {SQLALCHEMY_DATABASE_URL.render_as_string(hide_password=True)}")
+    print(f"Journal mode:    {journal_mode}")
+    print(f"Writers:         {API_WRITERS} API (async) + {WATCHER_WRITERS} watcher (threads), {DURATION:.0f}s")
+    print(f"Commits:         api={counters.writes['api']} watcher={counters.writes['watcher']} ({rows} rows)")
+    print(f"Lock errors:     api={counters.errors['api']} watcher={counters.errors['watcher']}")
+    print(f"Throughput:      {total / DURATION:.1f} commits/s")
+    print(f"Commit latency:  p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,445 @@
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+from eth_account import Account
+from web3 import Web3
+
+# End-to-end load test. Starts anvil from anvil_state.json, deploys a fresh MaritimeRegistry,
+# serves a fake Telegram Bot API that approves every request, boots the FastAPI app against both
+# and drives BENCH_N delivery lifecycles (nominate, finalize, approval, BunkerFinalized, seal,
+# anchor) with BENCH_CONCURRENCY in flight. Per-stage percentiles, deliveries/s and the app's own
+# /metrics are written to BENCH_OUTPUT_DIR as JSON.
+#   python Helper/bench_lifecycle.py
+#   BENCH_N=200 BENCH_CONCURRENCY=50 SEAL_ANCHOR_MODE=batch python Helper/bench_lifecycle.py
+#   python Helper/bench_lifecycle.py --compare data/bench/old.json data/bench/new.json
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+ARTIFACT = os.path.join(ROOT, "blockchain", "out", "MaritimeRegistry.sol", "MaritimeRegistry.json")
+
+N = int(os.getenv("BENCH_N", "50"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "10"))
+BLOCK_TIME = os.getenv("BENCH_BLOCK_TIME", "1")  # seconds; "0" leaves anvil on automine
+APPROVAL_DELAY = float(os.getenv("BENCH_APPROVAL_DELAY", "0"))  # simulated chief engineer reaction time
+POLL_INTERVAL = float(os.getenv("BENCH_POLL_INTERVAL", "0.25"))
+LIFECYCLE_TIMEOUT = float(os.getenv("BENCH_TIMEOUT", "600"))
+OUTPUT_DIR = os.getenv("BENCH_OUTPUT_DIR", os.path.join(ROOT, "data", "bench"))
+ANVIL_PORT = int(os.getenv("ANVIL_PORT", "8546"))
+APP_PORT = int(os.getenv("BENCH_APP_PORT", "8001"))
+TELEGRAM_PORT = int(os.getenv("BENCH_TELEGRAM_PORT", "8002"))
+
+# anvil's well-known dev accounts: #0 owns the registry, #1 is the barge, #2 the chief engineer.
+ADMIN_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+BARGE_KEY = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+CHIEF_KEY = "0x5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9a804cdab365a"
+SHIP_IMO = "IMO9876543"
+SUPPLIER_ID = 5500
+
+# Job statuses as GET /jobs reports them, in lifecycle order. Polling can miss a short-lived one,
+# so reaching a status also marks every earlier one.
+STATUSES = ("FINALIZING", "AWAITING_APPROVAL", "APPROVED", "SUBMITTED", "FINALIZED", "QUANTUM_SEALED")
+STAGES = {
+    "nominate": ("start", "NOMINATED"),  # POST /nominate, includes mining the nomination
+    "finalize_request": ("NOMINATED", "FINALIZING"),  # POST /finalize until 202
+    "approval": ("FINALIZING", "APPROVED"),  # Telegram request and button press
+    "finalize_tx": ("APPROVED", "FINALIZED"),  # finalizeBunker submitted and mined
+    "seal_anchor": ("FINALIZED", "QUANTUM_SEALED"),  # event indexed, PDF sealed, seal anchored
+    "end_to_end": ("start", "QUANTUM_SEALED"),
+}
+
+
+class FakeTelegram:
+    # Just enough of the Bot API for TelegramApprovalDispatcher: every message carrying a
+    # "SIGN:<prefix>" button gets a button press after APPROVAL_DELAY seconds.
+
+    def __init__(self, port, approval_delay=APPROVAL_DELAY):
+        self.approval_delay = approval_delay
+        self.updates = []
+        self.next_update_id = 1
+        self.messages = 0
+        self.approvals = 0
+        self.cond = threading.Condition()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, result):
+                body = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                self._reply(fake.get_updates(int(query.get("offset", 0)), float(query.get("timeout", 0))))
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if urlparse(self.path).path.endswith("/sendMessage"):
+                    self._reply(fake.send_message(payload))
+                else:
+                    self._reply(True)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-telegram", daemon=True).start()
+
+    def stop(self):
+        with self.cond:
+            self.cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def send_message(self, payload):
+        with self.cond:
+            self.messages += 1
+            message_id = self.messages
+        for row in (payload.get("reply_markup") or {}).get("inline_keyboard", []):
+            for button in row:
+                if button.get("callback_data", "").upper().startswith("SIGN:"):
+                    threading.Timer(
+                        self.approval_delay, self._press, [button["callback_data"], int(time.time())]
+                    ).start()
+        return {"message_id": message_id}
+
+    def _press(self, data, sent_at):
+        with self.cond:
+            update_id = self.next_update_id
+            self.next_update_id += 1
+            self.approvals += 1
+            self.updates.append({"update_id": update_id, "callback_query": {
+                "id": str(update_id), "data": data, "from": {"id": 1},
+                "message": {"chat": {"id": 1}, "date": sent_at},
+            }})
+            self.cond.notify_all()
+
+    def get_updates(self, offset, timeout):
+        # Long poll; as in the real API, the offset acknowledges every earlier update.
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            self.updates = [u for u in self.updates if u["update_id"] >= offset]
+            while not self.updates and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            return list(self.updates)
+
+
+def start_anvil():
+    if shutil.which("anvil") is None:
+        sys.exit("anvil not found; install Foundry or set BENCH_RPC_URL")
+    args = ["anvil", "--port", str(ANVIL_PORT), "--load-state", os.path.join(ROOT, "anvil_state.json")]
+    if float(BLOCK_TIME) > 0:
+        args += ["--block-time", BLOCK_TIME]
+    proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{ANVIL_PORT}"
+    for _ in range(50):
+        if Web3(Web3.HTTPProvider(url)).is_connected():
+            return proc, url
+        time.sleep(0.1)
+    proc.kill()
+    sys.exit("anvil did not start")
+
+
+def send(w3, key, txn):
+    account = Account.from_key(key)
+    txn = {**txn, "from": account.address, "nonce": w3.eth.get_transaction_count(account.address, "pending")}
+    signed = account.sign_transaction(txn)
+    receipt = w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(signed.raw_transaction), timeout=60)
+    if receipt.status != 1:
+        raise Exception(f"Setup transaction {receipt.transactionHash.hex()} reverted")
+    return receipt
+
+
+def deploy_registry(w3):
+    # The app reads its ABI from the Foundry build output, so the same artifact is deployed here.
+    if not os.path.exists(ARTIFACT):
+        if shutil.which("forge") is None:
+            sys.exit(f"{ARTIFACT} missing and forge not found; run `forge build` in blockchain/")
+        subprocess.run(["forge", "build"], cwd=os.path.join(ROOT, "blockchain"), check=True)
+    with open(ARTIFACT) as f:
+        artifact = json.load(f)
+
+    admin = Account.from_key(ADMIN_KEY).address
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+    receipt = send(w3, ADMIN_KEY, factory.constructor().build_transaction({"from": admin}))
+    registry = w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+    # Registered up front so the first lifecycles do not race the app's own setup step, which only
+    # runs once the app has been elected leader.
+    barge, chief = Account.from_key(BARGE_KEY).address, Account.from_key(CHIEF_KEY).address
+    send(w3, ADMIN_KEY, registry.functions.registerShip(SHIP_IMO, chief).build_transaction({"from": admin}))
+    send(w3, ADMIN_KEY, registry.functions.registerSupplier(SUPPLIER_ID, barge).build_transaction({"from": admin}))
+    return receipt.contractAddress, receipt.blockNumber
+
+
+def start_app(rpc_url, contract_address, start_block, telegram_url, workdir):
+    env = {
+        **os.environ,
+        "RPC_URL": rpc_url,
+        "CONTRACT_ADDRESS": contract_address,
+        "ADMIN_PRIVATE_KEY": ADMIN_KEY,
+        "BARGE_PRIVATE_KEY": BARGE_KEY,
+        "CHIEF_PRIVATE_KEY": CHIEF_KEY,
+        "BARGE_ADDRESS": Account.from_key(BARGE_KEY).address,
+        "CHIEF_ADDRESS": Account.from_key(CHIEF_KEY).address,
+        "TELEGRAM_TOKEN": "bench",
+        "CHIEF_CHAT_ID": "1",
+        "TELEGRAM_API_URL": telegram_url,
+        "TELEGRAM_POLL_TIMEOUT": "5",
+        "DATABASE_URL": os.getenv("BENCH_DATABASE_URL", f"sqlite:///{workdir}/bench.db"),
+        "BLOB_STORE_DIR": os.path.join(workdir, "blobs"),
+        "QUANTUM_KEY_PATH": os.path.join(workdir, "keys", "master_quantum.key"),
+        "QUANTUM_KEY_CREATE": "1",
+        "INDEXER_START_BLOCK": str(start_block),
+        "INDEXER_CONFIRMATIONS": os.getenv("INDEXER_CONFIRMATIONS", "0"),
+    }
+    os.makedirs(os.path.join(workdir, "keys"), exist_ok=True)
+    log_path = os.path.join(workdir, "app.log")
+    with open(log_path, "wb") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(APP_PORT), "--log-level", "warning"],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    url = f"http://127.0.0.1:{APP_PORT}"
+    for _ in range(600):
+        if proc.poll() is not None:
+            sys.exit(f"app exited during startup; see {log_path}")
+        try:
+            with urllib.request.urlopen(f"{url}/sealing/stats", timeout=1):
+                return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    sys.exit(f"app did not start; see {log_path}")
+
+
+async def lifecycle(session, app_url, index):
+    delivery_id = f"BENCH-{uuid.uuid4().hex[:12].upper()}"
+    marks = {"start": time.perf_counter()}
+    try:
+        async with session.post(f"{app_url}/nominate", json={
+            "delivery_id": delivery_id, "imo_number": SHIP_IMO, "supplier_id": SUPPLIER_ID, "expected_sulphur": 0.49,
+        }) as resp:
+            if resp.status != 200:
+                raise Exception(f"nominate returned {resp.status}: {await resp.text()}")
+        marks["NOMINATED"] = time.perf_counter()
+
+        async with session.post(f"{app_url}/finalize", json={
+            "delivery_id": delivery_id, "actual_qty": 550, "density": 991, "sample_id": f"BENCH-SEAL-{index}",
+        }) as resp:
+            if resp.status != 202:
+                raise Exception(f"finalize returned {resp.status}: {await resp.text()}")
+            job_id = (await resp.json())["job_id"]
+        marks["FINALIZING"] = time.perf_counter()
+
+        while "QUANTUM_SEALED" not in marks:
+            await asyncio.sleep(POLL_INTERVAL)
+            async with session.get(f"{app_url}/jobs/{job_id}") as resp:
+                job = await resp.json()
+            now = time.perf_counter()
+            if job["status"] == "FAILED":
+                raise Exception(f"job failed: {job['error']}")
+            if job["status"] in STATUSES:
+                for status in STATUSES[:STATUSES.index(job["status"]) + 1]:
+                    marks.setdefault(status, now)
+            if now - marks["start"] > LIFECYCLE_TIMEOUT:
+                raise Exception(f"timed out in {job['status']}")
+        return {"delivery_id": delivery_id, "marks": marks}
+    except Exception as e:
+        return {"delivery_id": delivery_id, "marks": marks, "error": str(e)}
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(rank(50), 4),
+        "p90": round(rank(90), 4),
+        "p95": round(rank(95), 4),
+        "p99": round(rank(99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def histogram_means(text):
+    # Condenses the app's Prometheus histograms to {series: {count, mean}} for the report.
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        if line.startswith("#") or not line.strip():
+            continue
+        name, value = line.rsplit(" ", 1)
+        series, _, labels = name.partition("{")
+        labels = "{" + labels if labels else ""
+        if series.endswith("_sum"):
+            sums[series[:-4] + labels] = float(value)
+        elif series.endswith("_count"):
+            counts[series[:-6] + labels] = float(value)
+    return {
+        key: {"count": int(count), "mean": round(sums.get(key, 0) / count, 4)}
+        for key, count in sorted(counts.items()) if count
+    }
+
+
+async def run_load(app_url):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY * 2)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=300)) as session:
+        async def bounded(index):
+            async with semaphore:
+                return await lifecycle(session, app_url, index)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(N)))
+        wall = time.perf_counter() - started
+
+        server = {}
+        for name, path in (("sealing", "/sealing/stats"), ("gas", "/gas/stats")):
+            async with session.get(f"{app_url}{path}") as resp:
+                server[name] = await resp.json() if resp.status == 200 else None
+        async with session.get(f"{app_url}/metrics") as resp:
+            server["metrics"] = histogram_means(await resp.text()) if resp.status == 200 else None
+
+    completed = [r for r in results if "error" not in r]
+    errors = {}
+    for r in results:
+        if "error" in r:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    stages = {
+        stage: percentiles([r["marks"][end] - r["marks"][begin] for r in completed])
+        for stage, (begin, end) in STAGES.items()
+    }
+    return {
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "deliveries_per_second": round(len(completed) / wall, 3) if wall else None,
+        "stages": stages,
+        "server": server,
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def print_report(report):
+    print(f"\n{report['completed']}/{report['config']['deliveries']} deliveries in {report['wall_seconds']}s "
+          f"-> {report['deliveries_per_second']} deliveries/s")
+    for error, count in report["errors"].items():
+        print(f"  {count} x {error}")
+    print(f"\n{'stage':<18}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for stage, stats in report["stages"].items():
+        if stats["count"]:
+            print(f"{stage:<18}" + "".join(f"{stats[p]:>9.3f}" for p in ("p50", "p90", "p95", "p99", "max")))
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def change(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+
+    print(f"{old['commit']} -> {new['commit']}")
+    a, b = old["deliveries_per_second"] or 0, new["deliveries_per_second"] or 0
+    print(f"{'deliveries/s':<18}{a:>10.3f}{b:>10.3f}{change(a, b):>10}")
+    for stage in STAGES:
+        for p in ("p50", "p95"):
+            a, b = old["stages"][stage].get(p), new["stages"][stage].get(p)
+            if a is not None and b is not None:
+                print(f"{stage + ' ' + p:<18}{a:>10.3f}{b:>10.3f}{change(a, b):>10}")
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="maritime-lifecycle-bench-")
+    anvil, rpc_url = (None, os.getenv("BENCH_RPC_URL")) if os.getenv("BENCH_RPC_URL") else start_anvil()
+    telegram = FakeTelegram(TELEGRAM_PORT)
+    telegram.start()
+    app = None
+    try:
+        contract_address, start_block = deploy_registry(Web3(Web3.HTTPProvider(rpc_url)))
+        print(f"MaritimeRegistry deployed at {contract_address}; workdir {workdir}")
+        app, app_url = start_app(rpc_url, contract_address, start_block, telegram.url, workdir)
+        print(f"Running {N} lifecycles, {CONCURRENCY} concurrent...")
+        report = asyncio.run(run_load(app_url))
+    finally:
+        if app is not None:
+            app.terminate()
+            try:
+                app.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                app.kill()
+        telegram.stop()
+        if anvil is not None:
+            anvil.terminate()
+
+    report = {
+        "commit": git_revision(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "deliveries": N,
+            "concurrency": CONCURRENCY,
+            "block_time": float(BLOCK_TIME),
+            "approval_delay": APPROVAL_DELAY,
+            "poll_interval": POLL_INTERVAL,
+            "anchor_mode": os.getenv("SEAL_ANCHOR_MODE", "single"),
+            "telemetry_mode": os.getenv("TELEMETRY_MODE", "full"),
+            "cpus": os.cpu_count(),
+        },
+        "telegram": {"messages": telegram.messages, "approvals": telegram.approvals},
+        **report,
+    }
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(
+        OUTPUT_DIR, f"lifecycle-{report['commit']}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nResults written to {path} (app log: {os.path.join(workdir, 'app.log')})")
+    return report["failed"] == 0
+
+
+if __name__ == "__main__":
+    if "--compare" in sys.argv:
+        old_path, new_path = sys.argv[sys.argv.index("--compare") + 1:][:2]
+        compare(old_path, new_path)
+        sys.exit(0)
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,84 @@
+import datetime
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fpdf import FPDF
+from app.services.pdf_engine import generate_ebdn_receipt, render_many
+
+N = int(os.getenv("BENCH_N", "2000"))
+
+
+def legacy_generate_ebdn_receipt(record):
+    # The original FPDF implementation, kept here only as the baseline.
+    pdf = FPDF()
+    pdf.add_page()
+    
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, "ELECTRONIC BUNKER DELIVERY NOTE (eBDN)", ln=True, align="C")
+    pdf.ln(10)
+    
+    pdf.set_font("Helvetica", "", 12)
+    pdf.cell(0, 10, f"Delivery ID: {record.delivery_id}", ln=True)
+    pdf.cell(0, 10, f"IMO Number: {record.imo_number}", ln=True)
+    pdf.cell(0, 10, f"Date: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC", ln=True)
+    pdf.ln(5)
+    
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 10, "Bunker Specifications:", ln=True)
+    pdf.set_font("Helvetica", "", 12)
+    pdf.cell(0, 10, f" - Actual Quantity: {record.actual_qty} MT", ln=True)
+    pdf.cell(0, 10, f" - Density @ 15C: {record.density} kg/m3", ln=True)
+    pdf.cell(0, 10, f" - Sulphur Content: {record.sulphur_content}%", ln=True)
+    pdf.cell(0, 10, f" - Sample Seal ID: {record.sample_id}", ln=True)
+    pdf.ln(10)
+
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.cell(0, 10, "Blockchain Proofs (ECDSA):", ln=True)
+    pdf.set_font("Courier", "", 8)
+    pdf.multi_cell(0, 5, f"Supplier Signature: {record.sig_supplier.hex() if record.sig_supplier else 'N/A'}")
+    pdf.ln(2)
+    pdf.multi_cell(0, 5, f"Chief Eng Signature: {record.sig_chief.hex() if record.sig_chief else 'N/A'}")
+    
+    return pdf.output(dest='S')
+
+
+def make_records(n):
+    return [
+        SimpleNamespace(
+            delivery_id=os.urandom(32).hex(),
+            imo_number="IMO9876543",
+            supplier_id=5500,
+            actual_qty=550.0 + i,
+            density=991.0,
+            sulphur_content=0.49,
+            sample_id=f"SEAL-2026-{i:05d}",
+            sig_supplier=os.urandom(65),
+            sig_chief=os.urandom(65),
+            finalized_at=datetime.datetime(2026, 1, 1) + datetime.timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def run(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {n / elapsed:>10.1f} PDFs/s")
+
+
+if __name__ == "__main__":
+    records = make_records(N)
+    legacy_n = min(N, 500)
+    workers = os.cpu_count() or 1
+
+    print(f"{N} eBDNs ({legacy_n} for the FPDF baseline)")
+    run("legacy FPDF generate_ebdn_receipt", lambda: [legacy_generate_ebdn_receipt(r) for r in records[:legacy_n]], legacy_n)
+    run("templated generate_ebdn_receipt", lambda: [generate_ebdn_receipt(r) for r in records], N)
+    run(f"render_many ({workers} processes)", lambda: render_many(records, workers=workers), N)
+
+    assert generate_ebdn_receipt(records[0]) == generate_ebdn_receipt(records[0]), "renderer is not deterministic"
@@ -0,0 +1,185 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+# Cold-start benchmark. Boots the app under uvicorn STARTUP_RUNS times, each as a fresh container
+# would: new process, empty SQLite database. Reports the time until /healthz first answers (live)
+# and until /readyz returns 200 (ready), the per-step boot times from /readyz, and the import time
+# of app.main on its own.
+#   python Helper/bench_startup.py                                  (starts anvil from anvil_state.json)
+#   STARTUP_RPC_URL=http://127.0.0.1:8545 python Helper/bench_startup.py
+#   STARTUP_COLD=1 python Helper/bench_startup.py                   (no bytecode cache at all)
+# The default assumes the image ships compiled bytecode (pip does this for dependencies; run
+# `python -m compileall app` for the app). STARTUP_COLD=1 is the worst case: every module of the
+# app and its dependencies is compiled from source on boot, which costs more than the boot itself.
+# Exits non-zero when a median goes over STARTUP_LIVE_BUDGET or STARTUP_READY_BUDGET seconds.
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+RUNS = int(os.getenv("STARTUP_RUNS", "5"))
+COLD = os.getenv("STARTUP_COLD", "0") == "1"
+LIVE_BUDGET = float(os.getenv("STARTUP_LIVE_BUDGET", "1.5"))
+READY_BUDGET = float(os.getenv("STARTUP_READY_BUDGET", "4"))
+TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", "60"))
+POLL_INTERVAL = 0.005
+ANVIL_PORT = int(os.getenv("ANVIL_PORT", "8546"))
+APP_PORT = int(os.getenv("STARTUP_APP_PORT", "8003"))
+CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "0x5FbDB2315678afecb367f032d93F642f64180aa3")
+ADMIN_PRIVATE_KEY = os.getenv(
+    "ADMIN_PRIVATE_KEY", "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+)
+
+IMPORT_PROBE = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+# Prints the ABI functions the deployed registry lacks, as a JSON list on the last line.
+DEPLOYMENT_PROBE = (
+    "import json, sys; from web3 import Web3; from app.core.blockchain import load_contract_abi, missing_functions; "
+    "code = bytes(Web3(Web3.HTTPProvider(sys.argv[1])).eth.get_code(Web3.to_checksum_address(sys.argv[2]))); "
+    "print(json.dumps(missing_functions(code, load_contract_abi()[1])))"
+)
+
+
+def start_anvil():
+    if shutil.which("anvil") is None:
+        sys.exit("anvil not found; install Foundry or set STARTUP_RPC_URL")
+    proc = subprocess.Popen(
+        ["anvil", "--port", str(ANVIL_PORT), "--load-state", os.path.join(ROOT, "anvil_state.json")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{ANVIL_PORT}"
+    request = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}).encode()
+    for _ in range(50):
+        try:
+            urllib.request.urlopen(
+                urllib.request.Request(url, request, {"Content-Type": "application/json"}), timeout=1
+            ).close()
+            return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    sys.exit("anvil did not start")
+
+
+def app_env(rpc_url, workdir):
+    env = {
+        **os.environ,
+        "RPC_URL": rpc_url,
+        "CONTRACT_ADDRESS": CONTRACT_ADDRESS,
+        "ADMIN_PRIVATE_KEY": ADMIN_PRIVATE_KEY,
+        "DATABASE_URL": f"sqlite:///{workdir}/startup.db",
+        "BLOB_STORE_DIR": os.path.join(workdir, "blobs"),
+        "QUANTUM_KEY_PATH": os.path.join(workdir, "keys", "master_quantum.key"),
+        "QUANTUM_KEY_CREATE": "1",
+        "FAST_BOOT": "1",
+    }
+    if COLD:
+        env["PYTHONPYCACHEPREFIX"] = os.path.join(workdir, "pycache")
+    return env
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def check_deployment(rpc_url):
+    # The app only warns about a stale deployment and would boot fine, so a benchmark against an
+    # anvil_state.json older than the contract would time a service whose calls all revert.
+    missing = json.loads(subprocess.run(
+        [sys.executable, "-c", DEPLOYMENT_PROBE, rpc_url, CONTRACT_ADDRESS],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.splitlines()[-1])
+    if missing:
+        sys.exit(f"Deployed registry lacks {', '.join(missing)}; "
+                 "anvil_state.json predates the contract, run Helper/rebuild_contracts.py")
+
+
+def boot_once(rpc_url):
+    workdir = tempfile.mkdtemp(prefix="maritime-startup-bench-")
+    env = app_env(rpc_url, workdir)
+    imported = float(subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout)
+    # The import probe warmed the bytecode cache; the server gets a fresh one.
+    if COLD:
+        env["PYTHONPYCACHEPREFIX"] = os.path.join(workdir, "pycache-server")
+
+    log_path = os.path.join(workdir, "app.log")
+    url = f"http://127.0.0.1:{APP_PORT}"
+    with open(log_path, "wb") as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(APP_PORT), "--log-level", "warning"],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        live = ready = None
+        checks = {}
+        while time.perf_counter() - started < TIMEOUT:
+            if proc.poll() is not None:
+                sys.exit(f"app exited during startup; see {log_path}")
+            try:
+                if live is None:
+                    if get(f"{url}/healthz")[0] == 200:
+                        live = time.perf_counter() - started
+                else:
+                    status, body = get(f"{url}/readyz")
+                    if status == 200:
+                        ready = time.perf_counter() - started
+                        checks = {name: check["seconds"] for name, check in json.loads(body)["checks"].items()}
+                        break
+            except OSError:
+                pass
+            time.sleep(POLL_INTERVAL)
+        if ready is None:
+            sys.exit(f"app not ready after {TIMEOUT}s; see {log_path}")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {"import": imported, "live": live, "ready": ready, "checks": checks}
+
+
+def summarize(label, samples):
+    print(f"  {label:<16} median {statistics.median(samples):6.3f} s   "
+          f"min {min(samples):6.3f} s   max {max(samples):6.3f} s")
+
+
+def main():
+    anvil, rpc_url = (None, os.getenv("STARTUP_RPC_URL")) if os.getenv("STARTUP_RPC_URL") else start_anvil()
+    try:
+        check_deployment(rpc_url)
+        runs = []
+        for i in range(RUNS):
+            runs.append(boot_once(rpc_url))
+            print(f"run {i + 1}/{RUNS}: live {runs[-1]['live']:.3f} s, ready {runs[-1]['ready']:.3f} s")
+    finally:
+        if anvil is not None:
+            anvil.terminate()
+
+    print(f"Startup over {RUNS} runs ({'no' if COLD else 'warm'} bytecode cache, {os.cpu_count()} CPUs)")
+    summarize("import app.main", [run["import"] for run in runs])
+    summarize("live (/healthz)", [run["live"] for run in runs])
+    summarize("ready (/readyz)", [run["ready"] for run in runs])
+    for name in runs[0]["checks"]:
+        summarize(f"  {name}", [run["checks"][name] for run in runs])
+
+    live = statistics.median(run["live"] for run in runs)
+    ready = statistics.median(run["ready"] for run in runs)
+    ok = live <= LIVE_BUDGET and ready <= READY_BUDGET
+    print(f"{'PASS' if ok else 'FAIL'} (budgets: live {LIVE_BUDGET} s, ready {READY_BUDGET} s)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
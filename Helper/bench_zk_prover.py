@@ -0,0 +1,63 @@
+import os
+import secrets
+import shlex
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.zk_prover import BLOCKCHAIN_DIR, FIELD_MODULUS, ZK_PROVER_WORKERS, ProverPool
+
+N = int(os.getenv("BENCH_N", "60"))
+LEGACY_N = int(os.getenv("BENCH_LEGACY_N", "3"))  # one-off script runs; each pays the full cold start
+LEGACY_CMD = os.getenv("BENCH_LEGACY_CMD", f"npx tsx {os.path.join(BLOCKCHAIN_DIR, 'js-script', 'generate_noir_proof.ts')}")
+
+SULPHUR, THRESHOLD = 45, 50  # 0.45% against the 0.50% global cap, scaled by 100
+
+
+def salts(n):
+    return [hex(secrets.randbelow(FIELD_MODULUS)) for _ in range(n)]
+
+
+def report(label, count, elapsed):
+    print(f"{label:<34} {count * 60 / elapsed:>9.1f} proofs/min   ({elapsed * 1000 / count:.0f} ms/proof)")
+
+
+def legacy():
+    # generate_noir_proof.ts: a new Node process, circuit load and backend init for every proof.
+    start = time.perf_counter()
+    for salt in salts(LEGACY_N):
+        subprocess.run(shlex.split(LEGACY_CMD) + [str(SULPHUR), str(THRESHOLD), salt],
+                       check=True, capture_output=True)
+    report("legacy one-off script", LEGACY_N, time.perf_counter() - start)
+
+
+def pooled(workers):
+    start = time.perf_counter()
+    pool = ProverPool(workers=workers, max_queue=max(N, 1)).start()
+    try:
+        pool.prove(SULPHUR, THRESHOLD, salts(1)[0])
+        cold = time.perf_counter() - start
+        print(f"{f'cold start, first proof ({workers} workers)':<34} {cold * 1000:>9.0f} ms")
+        pool.wait_ready()
+
+        start = time.perf_counter()
+        for salt in salts(N):
+            pool.prove(SULPHUR, THRESHOLD, salt)
+        report("warm, one at a time", N, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        futures = [pool.submit(SULPHUR, THRESHOLD, salt) for salt in salts(N)]
+        for future in futures:
+            future.result()
+        report(f"warm, {workers} workers saturated", N, time.perf_counter() - start)
+        print(pool.stats())
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    if "--legacy" in sys.argv:
+        legacy()
+    pooled(ZK_PROVER_WORKERS)
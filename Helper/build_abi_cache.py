@@ -0,0 +1,43 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.core.blockchain import ABI_ARTIFACT_PATH, ABI_CACHE_PATH, artifact_selectors
+
+# Extracts the ABI and function selectors from the Foundry artifact into the compact file the app
+# loads at boot, so images can ship without blockchain/out. Run it after every contract change:
+#   python Helper/build_abi_cache.py          (runs `forge build` first if the artifact is missing)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def build(artifact_path, cache_path):
+    with open(artifact_path) as f:
+        artifact = json.load(f)
+    cache = {
+        "contract": os.path.splitext(os.path.basename(artifact_path))[0],
+        "abi": artifact["abi"],
+        "selectors": artifact_selectors(artifact),
+    }
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, cache_path)
+    return cache
+
+
+if __name__ == "__main__":
+    artifact_path = os.path.join(ROOT, ABI_ARTIFACT_PATH)
+    cache_path = os.path.join(ROOT, ABI_CACHE_PATH)
+    if not os.path.exists(artifact_path):
+        if shutil.which("forge") is None:
+            sys.exit(f"{artifact_path} missing and forge not found; run `forge build` in blockchain/")
+        subprocess.run(["forge", "build"], cwd=os.path.join(ROOT, "blockchain"), check=True)
+
+    cache = build(artifact_path, cache_path)
+    print(f"{cache_path}: {len(cache['abi'])} ABI entries, {len(cache['selectors'])} selectors, "
+          f"{os.path.getsize(cache_path)} bytes (artifact {os.path.getsize(artifact_path)} bytes)")
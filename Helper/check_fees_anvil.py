@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from web3 import Web3
+from app.core.blockchain import MaritimeClient
+
+# Exercises the fee subsystem against a local anvil loaded from anvil_state.json: gas estimation
+# and its cache, EIP-1559 fees, and replacement of a tx stuck behind a base-fee spike.
+#   python Helper/check_fees_anvil.py            # starts anvil on ANVIL_PORT
+#   RPC_URL=http://127.0.0.1:8545 python ...     # uses an already running node
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ANVIL_PORT = int(os.getenv("ANVIL_PORT", "8546"))
+# The registry deployed in anvil_state.json and anvil's well-known first dev account (its owner).
+CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "0x5FbDB2315678afecb367f032d93F642f64180aa3")
+ADMIN_PRIVATE_KEY = os.getenv(
+    "ADMIN_PRIVATE_KEY", "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+)
+SPIKE_GWEI = 50
+
+
+def start_anvil():
+    if shutil.which("anvil") is None:
+        sys.exit("anvil not found; install Foundry or set RPC_URL")
+    proc = subprocess.Popen(
+        ["anvil", "--port", str(ANVIL_PORT), "--load-state", os.path.join(ROOT, "anvil_state.json")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{ANVIL_PORT}"
+    for _ in range(50):
+        if Web3(Web3.HTTPProvider(url)).is_connected():
+            return proc, url
+        time.sleep(0.1)
+    proc.kill()
+    sys.exit("anvil did not start")
+
+
+def rpc(client, method, *params):
+    response = client.w3.provider.make_request(method, list(params))
+    if "error" in response:
+        raise Exception(response["error"])
+    return response.get("result")
+
+
+def check(label, ok):
+    print(f"  [{'ok' if ok else 'FAIL'}] {label}")
+    return ok
+
+
+def main(client):
+    missing = client.check_deployment()
+    if missing:
+        sys.exit(f"Deployed registry lacks {', '.join(missing)}; "
+                 "anvil_state.json predates the contract, run Helper/rebuild_contracts.py")
+    results = []
+    print("Fees:", client.fee_oracle.fees(client.w3))
+
+    print("Gas estimation")
+    receipt = client.register_ship(f"IMO{uuid.uuid4().hex[:7]}", "0x" + "11" * 20)
+    limit = client.w3.eth.get_transaction(receipt.transactionHash)["gas"]
+    results.append(check(f"limit {limit} covers gasUsed {receipt.gasUsed}", receipt.status == 1 and limit >= receipt.gasUsed))
+    client.register_ship(f"IMO{uuid.uuid4().hex[:7]}", "0x" + "22" * 20)
+    results.append(check("second call of the same shape served from the estimate cache", client.gas.cache.hits >= 1))
+
+    print(f"Stuck transaction (base fee spiked to {SPIKE_GWEI} gwei after submission)")
+    client.receipt_tracker.poll_interval = 0.2
+    rpc(client, "evm_setAutomine", False)
+    try:
+        tx_hash = client.submit_transaction(
+            client.contract.functions.registerShip(f"IMO{uuid.uuid4().hex[:7]}", "0x" + "33" * 20),
+            client.admin_private_key
+        )
+        for _ in range(client.receipt_tracker.replace_after_blocks + 3):
+            rpc(client, "anvil_setNextBlockBaseFeePerGas", hex(Web3.to_wei(SPIKE_GWEI, "gwei")))
+            rpc(client, "evm_mine")
+            time.sleep(1)
+        receipt = client.wait_for_receipt(tx_hash, timeout=30)
+    finally:
+        rpc(client, "evm_setAutomine", True)
+    results.append(check(
+        f"submitted {tx_hash.hex()[:10]}, mined {receipt.transactionHash.hex()[:10]}",
+        receipt.status == 1 and bytes(receipt.transactionHash) != bytes(tx_hash)
+    ))
+
+    print("Gas per delivery:")
+    print(json.dumps(client.gas_ledger.stats(), indent=2))
+    return all(results)
+
+
+if __name__ == "__main__":
+    anvil, rpc_url = (None, os.getenv("RPC_URL")) if os.getenv("RPC_URL") else start_anvil()
+    try:
+        ok = main(MaritimeClient(rpc_url, CONTRACT_ADDRESS, ADMIN_PRIVATE_KEY))
+    finally:
+        if anvil is not None:
+            anvil.terminate()
+    sys.exit(0 if ok else 1)
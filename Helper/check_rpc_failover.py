@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Short backoff and frequent head probes so the run sees the dead node dropped and probed again.
+os.environ.setdefault("RPC_BACKOFF_MAX", "2")
+os.environ.setdefault("RPC_HEALTH_INTERVAL", "0.5")
+
+from web3 import Web3
+from app.core.blockchain import MaritimeClient
+from app.core.metrics import RPC_COALESCED
+
+# Two anvils loaded from the same anvil_state.json behind one MaritimeClient. Concurrent async and
+# sync reads run for FAILOVER_SECONDS and the first node is killed halfway through; no read may fail.
+#   python Helper/check_rpc_failover.py
+# Writes are left to Helper/check_fees_anvil.py: two independent anvils do not share a mempool.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ANVIL_PORT = int(os.getenv("ANVIL_PORT", "8546"))
+FAILOVER_SECONDS = float(os.getenv("FAILOVER_SECONDS", "10"))
+FAILOVER_CONCURRENCY = int(os.getenv("FAILOVER_CONCURRENCY", "20"))
+CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "0x5FbDB2315678afecb367f032d93F642f64180aa3")
+ADMIN_PRIVATE_KEY = os.getenv(
+    "ADMIN_PRIVATE_KEY", "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+)
+SHIP_IMO = "IMO9876543"
+SUPPLIER_ID = 5500
+
+
+def start_anvil(port):
+    if shutil.which("anvil") is None:
+        sys.exit("anvil not found; install Foundry")
+    proc = subprocess.Popen(
+        ["anvil", "--port", str(port), "--load-state", os.path.join(ROOT, "anvil_state.json")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(50):
+        if Web3(Web3.HTTPProvider(url)).is_connected():
+            return proc, url
+        time.sleep(0.1)
+    proc.kill()
+    sys.exit("anvil did not start")
+
+
+class Tally:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {"before": [], "after": []}
+        self.failures = {"before": [], "after": []}
+        self.killed = False
+
+    def record(self, started, error=None):
+        phase = "after" if self.killed else "before"
+        with self.lock:
+            if error is None:
+                self.latencies[phase].append(time.perf_counter() - started)
+            else:
+                self.failures[phase].append(f"{type(error).__name__}: {error}")
+
+
+async def async_reader(client, tally, deadline):
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            await client.async_contract.functions.shipToChiefEng(SHIP_IMO).call()
+            tally.record(started)
+        except Exception as e:
+            tally.record(started, e)
+
+
+def sync_reader(client, tally, deadline):
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            client.contract.functions.supplierToBarge(SUPPLIER_ID).call()
+            client.w3.eth.block_number
+            tally.record(started)
+        except Exception as e:
+            tally.record(started, e)
+
+
+async def run(client, kill_first):
+    tally = Tally()
+    deadline = time.monotonic() + FAILOVER_SECONDS
+    sync_thread = threading.Thread(target=sync_reader, args=(client, tally, deadline), daemon=True)
+    sync_thread.start()
+    readers = [asyncio.create_task(async_reader(client, tally, deadline)) for _ in range(FAILOVER_CONCURRENCY)]
+
+    await asyncio.sleep(FAILOVER_SECONDS / 2)
+    kill_first()
+    tally.killed = True
+    print(f"Killed {client.rpc_pool.endpoints[0].name} at {FAILOVER_SECONDS / 2:.1f}s")
+
+    await asyncio.gather(*readers)
+    await asyncio.to_thread(sync_thread.join)
+    await client.async_w3.provider.disconnect()
+    return tally
+
+
+def summarize(label, latencies, failures):
+    if not latencies:
+        print(f"  {label}: no successful reads, {len(failures)} failed")
+        return
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"  {label}: {len(latencies)} ok, {len(failures)} failed, "
+          f"p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms")
+
+
+def main(urls, kill_first):
+    client = MaritimeClient(urls, CONTRACT_ADDRESS, ADMIN_PRIVATE_KEY)
+    missing = client.check_deployment()
+    if missing:
+        client.rpc_pool.stop()
+        sys.exit(f"Deployed registry lacks {', '.join(missing)}; "
+                 "anvil_state.json predates the contract, run Helper/rebuild_contracts.py")
+    tally = asyncio.run(run(client, kill_first))
+    client.rpc_pool.stop()
+
+    print("Reads")
+    summarize("before kill", tally.latencies["before"], tally.failures["before"])
+    summarize("after kill ", tally.latencies["after"], tally.failures["after"])
+    for failure in sorted(set(tally.failures["before"] + tally.failures["after"]))[:5]:
+        print(f"    {failure}")
+    batches = next(iter(RPC_COALESCED._values.values()), [None, 0.0, 0])
+    if batches[2]:
+        print(f"Coalesced batches: {batches[2]}, {batches[1] / batches[2]:.1f} reads per batch")
+    print("Endpoints:")
+    print(json.dumps(client.rpc_pool.stats(), indent=2))
+
+    survivor = client.rpc_pool.endpoints[1]
+    ok = (not tally.failures["before"] and not tally.failures["after"]
+          and bool(tally.latencies["after"]) and survivor.available(time.monotonic()))
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    nodes = [start_anvil(ANVIL_PORT), start_anvil(ANVIL_PORT + 1)]
+    try:
+        ok = main([url for _, url in nodes], nodes[0][0].kill)
+    finally:
+        for proc, _ in nodes:
+            proc.kill()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import SQLALCHEMY_DATABASE_URL
+from app.migrations import MIGRATIONS, current_version, run_migrations
+
+if __name__ == "__main__":
+    # Usage: python Helper/migrate_db.py [status]
+    print(f"Database: {SQLALCHEMY_DATABASE_URL.render_as_string(hide_password=True)}")
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        version = current_version()
+        print(f"Schema version {version} of {MIGRATIONS[-1][0]}")
+        for number, name, _ in MIGRATIONS:
+            print(f"  [{'x' if number <= version else ' '}] {number:03d} {name}")
+    else:
+        applied = run_migrations()
+        print(f"Applied {len(applied)} migration(s); schema is at version {current_version()}.")
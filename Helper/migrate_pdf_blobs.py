@@ -0,0 +1,46 @@
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy.orm import undefer
+from app.database import SessionLocal
+from app import models
+from app.services.blob_store import get_blob_store
+
+BATCH = 200
+
+
+def migrate():
+    # Moves PDFs stored inline in bunker_records into the blob store and clears the column.
+    store = get_blob_store()
+    moved = 0
+    db = SessionLocal()
+    try:
+        while True:
+            records = db.query(models.BunkerRecord).options(undefer(models.BunkerRecord.pdf_blob)).filter(
+                models.BunkerRecord.pdf_blob.isnot(None)
+            ).limit(BATCH).all()
+            if not records:
+                break
+
+            for record in records:
+                digest = hashlib.sha3_512(record.pdf_blob).hexdigest()
+                if record.pdf_hash and record.pdf_hash != digest:
+                    print(f"⚠️ Warning: {record.delivery_id[:12]} inline PDF does not match pdf_hash; left in place.")
+                    continue
+                store.put(digest, record.pdf_blob)
+                record.pdf_hash = digest
+                record.pdf_blob = None
+                moved += 1
+            db.commit()
+            if all(r.pdf_blob is not None for r in records):
+                break
+    finally:
+        db.close()
+    return moved
+
+
+if __name__ == "__main__":
+    print(f"Moved {migrate()} PDF(s) into the blob store.")
@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# Everything that has to be regenerated after a change to blockchain/src, in one go:
+#   forge fmt --check, forge build, forge test      (fails on the first error)
+#   forge snapshot                                   -> blockchain/.gas-snapshot
+#   fresh anvil + DeployMaritime, state dumped       -> anvil_state.json
+#   Helper/build_abi_cache.py                        -> blockchain/abi/MaritimeRegistry.json
+# Commit all three outputs together with the contract change.
+#   python Helper/rebuild_contracts.py
+#   CONTRACTS_CHECK=1 python Helper/rebuild_contracts.py      (CI: fail unless the committed three
+#                                                              match the contract, write nothing)
+# The deployment is the first transaction of anvil's first dev account, so the registry lands at
+# the address the service and the benchmarks default to.
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+
+from app.core.blockchain import ABI_ARTIFACT_PATH, ABI_CACHE_PATH, artifact_selectors, missing_functions
+
+CONTRACTS_DIR = os.path.join(ROOT, "blockchain")
+STATE_PATH = os.path.join(ROOT, "anvil_state.json")
+CHECK = os.getenv("CONTRACTS_CHECK", "0") == "1"
+ANVIL_PORT = int(os.getenv("ANVIL_PORT", "8546"))
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+DEPLOYER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def forge(*args):
+    print(f"$ forge {' '.join(args)}", flush=True)
+    subprocess.run(["forge", *args], cwd=CONTRACTS_DIR, check=True)
+
+
+def rpc(url, method, params):
+    request = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode()
+    with urllib.request.urlopen(
+        urllib.request.Request(url, request, {"Content-Type": "application/json"}), timeout=5
+    ) as response:
+        return json.load(response)["result"]
+
+
+def dump_dev_chain(state_path):
+    # anvil writes --dump-state when it shuts down, so the node is stopped with SIGINT, not killed.
+    url = f"http://127.0.0.1:{ANVIL_PORT}"
+    anvil = subprocess.Popen(
+        ["anvil", "--port", str(ANVIL_PORT), "--dump-state", state_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(50):
+            try:
+                rpc(url, "eth_chainId", [])
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            sys.exit("anvil did not start")
+
+        forge("script", "script/MaritimeRegistry.s.sol", "--rpc-url", url, "--broadcast",
+              "--private-key", DEPLOYER_KEY)
+        if rpc(url, "eth_getCode", [CONTRACT_ADDRESS, "latest"]) in ("0x", None):
+            sys.exit(f"MaritimeRegistry is not deployed at {CONTRACT_ADDRESS}")
+    finally:
+        anvil.send_signal(signal.SIGINT)
+        anvil.wait(timeout=30)
+    if not os.path.exists(state_path):
+        sys.exit("anvil did not dump its state")
+
+
+def check_committed():
+    # The committed outputs against the artifact `forge build` just wrote.
+    stale = []
+    if not os.path.exists(os.path.join(CONTRACTS_DIR, ".gas-snapshot")):
+        stale.append("blockchain/.gas-snapshot is missing")
+    with open(os.path.join(ROOT, ABI_ARTIFACT_PATH)) as f:
+        artifact = json.load(f)
+    cache_path = os.path.join(ROOT, ABI_CACHE_PATH)
+    if not os.path.exists(cache_path):
+        stale.append(f"{ABI_CACHE_PATH} is missing")
+    else:
+        with open(cache_path) as f:
+            cache = json.load(f)
+        if cache["abi"] != artifact["abi"] or cache["selectors"] != artifact_selectors(artifact):
+            stale.append(f"{ABI_CACHE_PATH} does not match the contract")
+    with open(STATE_PATH) as f:
+        account = json.load(f)["accounts"].get(CONTRACT_ADDRESS.lower(), {})
+    missing = missing_functions(bytes.fromhex((account.get("code") or "0x")[2:]), artifact_selectors(artifact))
+    if missing:
+        stale.append(f"anvil_state.json deploys a registry without {', '.join(missing)}")
+    return stale
+
+
+if __name__ == "__main__":
+    for tool in ("forge", "anvil"):
+        if shutil.which(tool) is None:
+            sys.exit(f"{tool} not found; install Foundry (https://book.getfoundry.sh/getting-started/installation)")
+    if not os.path.isdir(os.path.join(CONTRACTS_DIR, "lib", "openzeppelin-contracts")):
+        forge("install")
+
+    forge("fmt", "--check")
+    forge("build", "--sizes")
+    forge("test")
+    if CHECK:
+        stale = check_committed()
+        if stale:
+            sys.exit("\n".join(stale + ["run python Helper/rebuild_contracts.py and commit its outputs"]))
+        forge("snapshot", "--check")
+        sys.exit(0)
+    forge("snapshot")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        dumped = os.path.join(workdir, "anvil_state.json")
+        dump_dev_chain(dumped)
+        shutil.copyfile(dumped, STATE_PATH)
+    print(f"{STATE_PATH}: MaritimeRegistry at {CONTRACT_ADDRESS}")
+    subprocess.run([sys.executable, os.path.join(ROOT, "Helper", "build_abi_cache.py")], check=True)
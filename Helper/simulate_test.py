@@ -1,3 +1,4 @@
+import json
 import requests
 import time
 import uuid
@@ -35,16 +36,38 @@ def test_bunker_lifecycle():
         "sample_id": "SEAL-2026-ABC"
     }
 
+    # Subscribe before finalizing so no transition is missed; the stream replaces polling /jobs.
+    stream = requests.get(
+        f"{BASE_URL}/deliveries/stream", params={"delivery_id": DELIVERY_ID}, stream=True, timeout=(5, 300)
+    )
+
     print(" CHECK TELEGRAM: Please reply 'SIGN' to your bot now...")
     
-    fin_res = requests.post(f"{BASE_URL}/finalize", json=finalize_data, timeout=70)
+    fin_res = requests.post(f"{BASE_URL}/finalize", json=finalize_data)
+
+    if fin_res.status_code != 202:
+        print(f"Finalization Failed: {fin_res.text}")
+        return
 
-    if fin_res.status_code == 200:
+    job_id = fin_res.json().get("job_id")
+    print(f"Finalization job queued: {job_id}")
+
+    with stream:
+        for line in stream.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            print(f"   -> {event['status']}")
+            if event["status"] in ("QUANTUM_SEALED", "FAILED"):
+                break
+
+    job = requests.get(f"{BASE_URL}/jobs/{job_id}").json()
+    if job["status"] in ("FINALIZED", "QUANTUM_SEALED"):
         print(f"Finalization Success!")
-        print(f"Blockchain Tx: {fin_res.json().get('tx_hash')}")
+        print(f"Blockchain Tx: {job.get('tx_hash')}")
         print("\nEnd-to-End Bunker Lifecycle Complete!")
     else:
-        print(f"Finalization Failed: {fin_res.text}")
+        print(f"Finalization Failed: {job.get('error') or job['status']}")
 
 if __name__ == "__main__":
     test_bunker_lifecycle()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from web3 import Web3
+from app.services.verification import BatchVerifier, VERIFY_WORKERS
+
+
+def make_client():
+    from app.core.blockchain import MaritimeClient
+    return MaritimeClient(
+        rpc_url=os.getenv("RPC_URL"),
+        contract_address=os.getenv("CONTRACT_ADDRESS"),
+        private_key=os.getenv("ADMIN_PRIVATE_KEY")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit eBDN integrity in bulk.")
+    parser.add_argument("delivery_ids", nargs="*", help="Text ids or keccak hex (default: every sealed delivery)")
+    parser.add_argument("--status", action="append", help="Record statuses to audit (default QUANTUM_SEALED)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--workers", type=int, default=VERIFY_WORKERS)
+    parser.add_argument("--no-chain", action="store_true", help="Skip registry and anchor lookups")
+    parser.add_argument("--report", help="Write the per-record NDJSON report to this file")
+    args = parser.parse_args()
+
+    delivery_ids = [
+        d.removeprefix("0x").lower() if len(d.removeprefix("0x")) == 64 else Web3.keccak(text=d).hex()
+        for d in args.delivery_ids
+    ] or None
+
+    client = None if args.no_chain or not os.getenv("RPC_URL") else make_client()
+    verifier = BatchVerifier(client, workers=args.workers)
+    report = open(args.report, "w") if args.report else None
+    failures = 0
+    try:
+        for result in verifier.run(delivery_ids, [s.upper() for s in args.status or ["QUANTUM_SEALED"]], args.limit):
+            if report:
+                report.write(json.dumps(result) + "\n")
+            if not result["ok"]:
+                failures += 1
+                if failures <= 20:
+                    failed = [name for name, ok in result["checks"].items() if not ok]
+                    print(f"  [FAIL] {result['delivery_id'][:16]}... {', '.join(failed + result['errors'])}")
+    finally:
+        if report:
+            report.close()
+
+    summary = verifier.summary
+    print(f"Verified {summary['records']} eBDN(s) in {summary['elapsed_seconds']}s "
+          f"({summary['records_per_second']} records/s, {args.workers} workers, "
+          f"chain checks {'on' if summary['chain_checks'] else 'off'})")
+    print(f"Passed: {summary['passed']}  Failed: {summary['failed']}")
+    for name, count in summary["failed_checks"].items():
+        if count:
+            print(f"  {name}: {count} failure(s)")
+    sys.exit(0 if summary["failed"] == 0 else 1)
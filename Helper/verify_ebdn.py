@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+from web3 import Web3
+from app.database import SessionLocal
+from app import models
+from app.services.blob_store import get_blob_store
+from app.services.merkle import leaf_hash, verify_ebdn, verify_proof
+from app.services.quantum_vault import verify_mldsa
+
+SEAL_BATCHES_ABI = [{
+    "inputs": [{"internalType": "bytes32", "name": "", "type": "bytes32"}],
+    "name": "sealBatches",
+    "outputs": [
+        {"internalType": "uint64", "name": "timestamp", "type": "uint64"},
+        {"internalType": "uint32", "name": "leafCount", "type": "uint32"},
+        {"internalType": "bytes32", "name": "quantumSignatureHash", "type": "bytes32"}
+    ],
+    "stateMutability": "view",
+    "type": "function"
+}]
+
+
+def verify_delivery(delivery_id, pdf_path=None):
+    # Accepts the human delivery id ("BUNKER-1A2B3C4D") or its keccak hex.
+    delivery_id_hex = delivery_id.removeprefix("0x").lower()
+    if len(delivery_id_hex) != 64:
+        delivery_id_hex = Web3.keccak(text=delivery_id).hex()
+
+    db = SessionLocal()
+    try:
+        record = db.query(models.BunkerRecord).filter(
+            models.BunkerRecord.delivery_id == delivery_id_hex
+        ).first()
+        if record is None or record.seal_batch_root is None:
+            print(f"Delivery {delivery_id} has no batch seal.")
+            return False
+        batch = db.get(models.SealBatch, record.seal_batch_root)
+
+        if pdf_path is not None:
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+        elif get_blob_store().exists(record.pdf_hash):
+            pdf_bytes = get_blob_store().get(record.pdf_hash, verify=False)
+        else:
+            pdf_bytes = record.pdf_blob
+    finally:
+        db.close()
+
+    proof = json.loads(record.merkle_proof)
+    checks = {}
+
+    checks["pdf matches pdf_hash and proof"] = verify_ebdn(
+        pdf_bytes, record.delivery_id, record.pdf_hash, proof, record.seal_batch_root
+    )
+    checks["leaf included in root"] = verify_proof(
+        leaf_hash(record.delivery_id, record.pdf_hash), proof, record.seal_batch_root
+    )
+    checks["ML-DSA signature over root"] = verify_mldsa(bytes.fromhex(batch.root), batch.quantum_signature)
+
+    rpc_url = os.getenv("RPC_URL")
+    if rpc_url:
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        registry = w3.eth.contract(address=os.getenv("CONTRACT_ADDRESS"), abi=SEAL_BATCHES_ABI)
+        timestamp, leaf_count, sig_hash = registry.functions.sealBatches(bytes.fromhex(batch.root)).call()
+        checks["root anchored on-chain"] = timestamp != 0
+        checks["on-chain signature hash"] = sig_hash == Web3.keccak(batch.quantum_signature)
+
+    for name, ok in checks.items():
+        print(f"  [{'OK' if ok else 'FAIL'}] {name}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    if len(sys.argv) < 2:
+        print("Usage: python Helper/verify_ebdn.py <delivery_id> [pdf_path]")
+        sys.exit(2)
+
+    ok = verify_delivery(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print("eBDN VERIFIED" if ok else "eBDN VERIFICATION FAILED")
+    sys.exit(0 if ok else 1)
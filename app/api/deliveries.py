@@ -0,0 +1,348 @@
+import asyncio
+import base64
+import csv
+import datetime
+import io
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from app.database import AsyncSessionLocal, get_async_db
+from app import models
+from app.core.status_hub import EVICTED, STREAM_HEARTBEAT, TooManySubscribers, get_status_hub
+
+# Everything here is answered from bunker_records, the read model the event indexer keeps in sync;
+# nothing calls the chain.
+router = APIRouter(prefix="/deliveries")
+
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+Record = models.BunkerRecord
+
+# Columns returned by the list and export endpoints (no PDFs or signatures).
+LIST_COLUMNS = (
+    Record.id, Record.delivery_id, Record.imo_number, Record.supplier_id, Record.status,
+    Record.sulphur_content, Record.density, Record.actual_qty, Record.sample_id,
+    Record.pdf_hash, Record.finalize_tx_hash, Record.anchor_tx_hash, Record.seal_batch_root,
+    Record.finalized_at, Record.created_at, Record.updated_at,
+)
+EXPORT_FIELDS = [c.key for c in LIST_COLUMNS if c.key != "id"]
+
+# Statuses that carry a final quantity, for the aggregates.
+DELIVERED_STATES = ("FINALIZED", "QUANTUM_SEALED")
+
+PERIOD_FORMATS = {
+    # period: (SQLite strftime, PostgreSQL to_char)
+    "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "week": ("%Y-W%W", 'IYYY-"W"IW'),
+    "month": ("%Y-%m", "YYYY-MM"),
+    "year": ("%Y", "YYYY"),
+}
+GROUP_COLUMNS = {"ship": Record.imo_number, "supplier": Record.supplier_id}
+
+
+def _delivery_id_hex(request, delivery_id):
+    # Accepts the delivery id as submitted to /nominate or its keccak hex.
+    delivery_id_hex = delivery_id.removeprefix("0x").lower()
+    if len(delivery_id_hex) != 64:
+        delivery_id_hex = request.app.state.maritime_client.w3.keccak(text=delivery_id).hex()
+    return delivery_id_hex
+
+
+def _encode_cursor(row):
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, record_id = raw.split("|")
+        return datetime.datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _serialize(row):
+    item = {}
+    for key, value in row._mapping.items():
+        if key == "id":
+            continue
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        elif isinstance(value, bytes):
+            value = value.hex()
+        item[key] = value
+    return item
+
+
+class DeliveryFilters:
+    def __init__(
+        self,
+        status: Optional[List[str]] = Query(None, description="Repeat or comma-separate for several"),
+        imo: Optional[str] = None,
+        supplier_id: Optional[int] = None,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+    ):
+        self.statuses = [s.strip().upper() for value in status or [] for s in value.split(",") if s.strip()]
+        self.imo = imo
+        self.supplier_id = supplier_id
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def apply(self, query):
+        if self.statuses:
+            query = query.where(Record.status.in_(self.statuses))
+        if self.imo is not None:
+            query = query.where(Record.imo_number == self.imo)
+        if self.supplier_id is not None:
+            query = query.where(Record.supplier_id == self.supplier_id)
+        if self.created_from is not None:
+            query = query.where(Record.created_at >= self.created_from)
+        if self.created_to is not None:
+            query = query.where(Record.created_at < self.created_to)
+        return query
+
+
+def _page_query(filters, after=None, limit=MAX_PAGE_SIZE):
+    # Newest first, keyed on (created_at, id) so pages stay stable while new rows arrive and each
+    # page is an index range scan instead of an OFFSET.
+    query = filters.apply(select(*LIST_COLUMNS))
+    if after is not None:
+        created_at, record_id = after
+        query = query.where(or_(
+            Record.created_at < created_at,
+            and_(Record.created_at == created_at, Record.id < record_id),
+        ))
+    return query.order_by(Record.created_at.desc(), Record.id.desc()).limit(limit)
+
+
+@router.get("")
+async def list_deliveries(
+    filters: DeliveryFilters = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    # One extra row tells us whether there is a next page without a COUNT(*).
+    rows = (await db.execute(_page_query(filters, after, limit + 1))).all()
+    page = rows[:limit]
+    return {
+        "items": [_serialize(row) for row in page],
+        "next_cursor": _encode_cursor(page[-1]) if len(rows) > limit else None,
+    }
+
+
+@router.get("/aggregates")
+async def delivery_aggregates(
+    group_by: str = Query("ship", pattern="^(ship|supplier)$"),
+    period: str = Query("month", pattern="^(day|week|month|year)$"),
+    delivered_from: Optional[datetime.datetime] = None,
+    delivered_to: Optional[datetime.datetime] = None,
+    imo: Optional[str] = None,
+    supplier_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    key_column = GROUP_COLUMNS[group_by]
+    delivered_at = func.coalesce(Record.finalized_at, Record.created_at)
+    sqlite_format, pg_format = PERIOD_FORMATS[period]
+    if db.bind.dialect.name == "sqlite":
+        bucket = func.strftime(sqlite_format, delivered_at)
+    else:
+        bucket = func.to_char(delivered_at, pg_format)
+
+    query = (
+        select(
+            bucket.label("period"),
+            key_column.label("key"),
+            func.count(Record.id).label("deliveries"),
+            func.sum(Record.actual_qty).label("total_qty"),
+            func.avg(Record.sulphur_content).label("avg_sulphur"),
+        )
+        .where(Record.status.in_(DELIVERED_STATES))
+        .group_by(bucket, key_column)
+        .order_by(bucket, key_column)
+    )
+    if delivered_from is not None:
+        query = query.where(delivered_at >= delivered_from)
+    if delivered_to is not None:
+        query = query.where(delivered_at < delivered_to)
+    if imo is not None:
+        query = query.where(Record.imo_number == imo)
+    if supplier_id is not None:
+        query = query.where(Record.supplier_id == supplier_id)
+
+    rows = (await db.execute(query)).all()
+    return {
+        "group_by": group_by,
+        "period": period,
+        "buckets": [
+            {
+                "period": row.period,
+                group_by: row.key,
+                "deliveries": row.deliveries,
+                "total_qty": row.total_qty,
+                "avg_sulphur": round(row.avg_sulphur, 4) if row.avg_sulphur is not None else None,
+            }
+            for row in rows
+        ],
+    }
+
+
+async def _export_rows(filters):
+    # Walks the result set in keyset chunks, each in a short session, so memory stays flat and no
+    # read transaction is held open for the whole download.
+    after = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(_page_query(filters, after, EXPORT_CHUNK_SIZE))).all()
+        for row in rows:
+            yield row
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+async def _ndjson(filters):
+    async for row in _export_rows(filters):
+        yield json.dumps(_serialize(row)) + "\n"
+
+
+async def _csv(filters):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    async for row in _export_rows(filters):
+        writer.writerow(_serialize(row))
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_deliveries(
+    filters: DeliveryFilters = Depends(),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    if format == "csv":
+        return StreamingResponse(
+            _csv(filters), media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="deliveries.csv"'},
+        )
+    return StreamingResponse(_ndjson(filters), media_type="application/x-ndjson")
+
+
+class StreamFilters:
+    def __init__(
+        self,
+        delivery_id: Optional[str] = None,
+        imo: Optional[str] = None,
+        supplier_id: Optional[int] = None,
+        status: Optional[List[str]] = Query(None, description="Repeat or comma-separate for several"),
+    ):
+        self.delivery_id = delivery_id
+        self.imo = imo
+        self.supplier_id = supplier_id
+        self.statuses = [s.strip().upper() for value in status or [] for s in value.split(",") if s.strip()]
+
+    def subscribe(self, connection, transport):
+        delivery_id_hex = _delivery_id_hex(connection, self.delivery_id) if self.delivery_id else None
+        return get_status_hub().subscribe(
+            transport=transport, delivery_id=delivery_id_hex, imo_number=self.imo,
+            supplier_id=self.supplier_id, statuses=self.statuses,
+        )
+
+
+# Status transitions as they are committed; no history is replayed, so read the current state from
+# GET /deliveries/{id} (or the list) after connecting.
+@router.get("/stream")
+async def stream_deliveries(request: Request, filters: StreamFilters = Depends()):
+    try:
+        subscriber = filters.subscribe(request, "sse")
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscriber.next(STREAM_HEARTBEAT)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event is EVICTED:
+                    yield 'event: evicted\ndata: {"reason": "slow consumer"}\n\n'
+                    return
+                else:
+                    yield f"event: status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            get_status_hub().unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/ws")
+async def stream_deliveries_ws(websocket: WebSocket, filters: StreamFilters = Depends()):
+    try:
+        subscriber = filters.subscribe(websocket, "websocket")
+    except TooManySubscribers:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+
+    async def send():
+        while True:
+            event = await subscriber.next(STREAM_HEARTBEAT)
+            if event is None:
+                await websocket.send_json({"event": "heartbeat"})
+            elif event is EVICTED:
+                await websocket.send_json({"event": "evicted", "reason": "slow consumer"})
+                await websocket.close(code=1013)
+                return
+            else:
+                await websocket.send_json({"event": "status", **event})
+
+    async def receive():
+        # Clients send nothing; this only notices the close.
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        get_status_hub().unsubscribe(subscriber)
+
+
+@router.get("/{delivery_id}")
+async def get_delivery(delivery_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    delivery_id_hex = _delivery_id_hex(request, delivery_id)
+    row = (await db.execute(
+        select(
+            *LIST_COLUMNS, Record.sig_supplier, Record.sig_chief, Record.job_id, Record.job_error,
+            Record.merkle_proof,
+        )
+        .where(Record.delivery_id == delivery_id_hex)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+
+    delivery = _serialize(row)
+    delivery["merkle_proof"] = json.loads(row.merkle_proof) if row.merkle_proof else None
+    return delivery
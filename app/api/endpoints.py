@@ -1,22 +1,45 @@
+import asyncio
+import json
+import secrets
+import threading
+import weakref
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app import models, schemas
+from app.core.metrics import ACTIVE_FINALIZATIONS, PENDING_TXS, record_transition, render
+from app.core.status_hub import get_status_hub, publish_status
+from app.core.telemetry import get_logger
+from app.services.finalization import JOB_STATES
+from app.services.blob_store import get_blob_store
+from app.services.zk_prover import FIELD_MODULUS, ProofError, ProverBusy, get_prover, prover_stats
+from starlette.background import BackgroundTask
 from starlette.requests import Request
 import requests
 import os
+import uuid
 
 router = APIRouter()
+log = get_logger(__name__)
+
+# A verification run already uses every core; a second concurrent run would only slow both down.
+_verify_lock = threading.Lock()
 
 @router.post("/nominate")
 async def nominate_bunker(
     data: schemas.NominationCreate, 
     request: Request, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     client = request.app.state.maritime_client
     delivery_id_hash = client.w3.keccak(text=data.delivery_id).hex()
-    existing = db.query(models.BunkerRecord).filter(models.BunkerRecord.delivery_id == delivery_id_hash).first()
+    result = await db.execute(
+        select(models.BunkerRecord).where(models.BunkerRecord.delivery_id == delivery_id_hash)
+    )
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Delivery ID already exists")
 
@@ -28,7 +51,7 @@ async def nominate_bunker(
         status="NOMINATED"
     )
     db.add(new_record)
-    db.commit()
+    await db.commit()
 
     client = request.app.state.maritime_client
     try:
@@ -36,14 +59,16 @@ async def nominate_bunker(
         
         barge_key = os.getenv("BARGE_PRIVATE_KEY")
         
-        receipt = client.nominate_bunker(
+        receipt = await client.nominate_bunker(
             delivery_id_bytes=delivery_id_bytes,
             imo=data.imo_number,
             supplier_id=data.supplier_id,
             expected_sulphur=int(data.expected_sulphur * 100), 
             barge_private_key=barge_key
         )
-        
+        record_transition(None, "NOMINATED")
+        publish_status(delivery_id_hash, "NOMINATED", data.imo_number, data.supplier_id)
+
         return {
             "status": "success", 
             "delivery_id": data.delivery_id,
@@ -52,57 +77,318 @@ async def nominate_bunker(
         }
 
     except Exception as e:
-        db.delete(new_record)
-        db.commit()
+        await db.delete(new_record)
+        await db.commit()
         raise HTTPException(status_code=500, detail=f"Blockchain Nomination Failed: {str(e)}")
     
     
-@router.post("/finalize")
+@router.post("/nominate/batch")
+async def nominate_bunker_batch(
+    data: schemas.NominationBatch,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    client = request.app.state.maritime_client
+    items = [(n, client.w3.keccak(text=n.delivery_id)) for n in data.nominations]
+    results = [{"delivery_id": n.delivery_id, "status": "rejected", "tx_hash": None, "error": None}
+               for n, _ in items]
+
+    # Duplicate check and insert for the whole schedule in one transaction.
+    result = await db.execute(
+        select(models.BunkerRecord.delivery_id)
+        .where(models.BunkerRecord.delivery_id.in_([h.hex() for _, h in items]))
+    )
+    existing = set(result.scalars())
+    accepted = []
+    for i, (n, h) in enumerate(items):
+        if h.hex() in existing:
+            results[i]["error"] = "Delivery ID already exists"
+            continue
+        existing.add(h.hex())
+        accepted.append((i, n, h))
+
+    def new_record(n, h):
+        return models.BunkerRecord(
+            delivery_id=h.hex(),
+            imo_number=n.imo_number,
+            supplier_id=n.supplier_id,
+            sulphur_content=n.expected_sulphur,
+            status="NOMINATED"
+        )
+
+    db.add_all([new_record(n, h) for _, n, h in accepted])
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request inserted some of the same ids: fall back to one savepoint per row.
+        await db.rollback()
+        raced = []
+        for i, n, h in accepted:
+            try:
+                async with db.begin_nested():
+                    db.add(new_record(n, h))
+            except IntegrityError:
+                results[i]["error"] = "Delivery ID already exists"
+                continue
+            raced.append((i, n, h))
+        await db.commit()
+        accepted = raced
+
+    if accepted:
+        try:
+            outcome = await client.nominate_bunker_batch(
+                [(h, n.imo_number, n.supplier_id, int(n.expected_sulphur * 100)) for _, n, h in accepted],
+                os.getenv("BARGE_PRIVATE_KEY")
+            )
+        except Exception as e:
+            outcome = {h: (False, None, f"Blockchain Nomination Failed: {e}") for _, _, h in accepted}
+
+        failed = []
+        for i, n, h in accepted:
+            nominated, tx_hash, error = outcome[h]
+            results[i].update(
+                status="nominated" if nominated else "rejected", tx_hash=tx_hash, error=error
+            )
+            if not nominated:
+                failed.append(h.hex())
+            else:
+                publish_status(h.hex(), "NOMINATED", n.imo_number, n.supplier_id)
+        record_transition(None, "NOMINATED", len(accepted) - len(failed))
+
+        # Only the stems the chain did not accept are rolled back.
+        if failed:
+            await db.execute(
+                delete(models.BunkerRecord)
+                .where(models.BunkerRecord.delivery_id.in_(failed), models.BunkerRecord.status == "NOMINATED")
+            )
+            await db.commit()
+
+    nominated = sum(1 for r in results if r["status"] == "nominated")
+    return {
+        "status": "success" if nominated == len(results) else "partial" if nominated else "failed",
+        "nominated": nominated,
+        "rejected": len(results) - nominated,
+        "results": results
+    }
+
+
+@router.post("/finalize", status_code=202)
 async def finalize_bunker(
     data: schemas.FinalizeDelivery, 
     request: Request, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     client = request.app.state.maritime_client
     delivery_id_hash = client.w3.keccak(text=data.delivery_id).hex()
-    record = db.query(models.BunkerRecord).filter(models.BunkerRecord.delivery_id == delivery_id_hash).first()
+    result = await db.execute(
+        select(models.BunkerRecord).where(models.BunkerRecord.delivery_id == delivery_id_hash)
+    )
+    record = result.scalars().first()
     if not record:
         raise HTTPException(status_code=404, detail="Nomination not found")
+    if record.status in JOB_STATES:
+        raise HTTPException(status_code=409, detail=f"Finalization already in progress (job {record.job_id})")
+    if record.status in ("FINALIZED", "QUANTUM_SEALED"):
+        raise HTTPException(status_code=409, detail="Bunker already finalized")
 
+    previous = record.status
     record.actual_qty = data.actual_qty
     record.density = data.density
     record.sample_id = data.sample_id
-    db.commit()
+    record.status = "FINALIZING"
+    record.job_id = uuid.uuid4().hex
+    record.job_error = None
+    record.finalize_tx_hash = None
+    await db.commit()
+    record_transition(previous, "FINALIZING")
+    publish_status(record.delivery_id, "FINALIZING", record.imo_number, record.supplier_id)
+
+    log.detail("Starting finalization flow", delivery_id=record.delivery_id, job_id=record.job_id)
+    request.app.state.finalization_jobs.start(record.id)
+
+    return {
+        "status": "accepted",
+        "job_id": record.job_id,
+        "message": "Finalization queued; poll /jobs/{job_id} for progress"
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.BunkerRecord).where(models.BunkerRecord.job_id == job_id)
+    )
+    record = result.scalars().first()
+    if not record:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": record.job_id,
+        "delivery_id": record.delivery_id,
+        "status": record.status,
+        "done": record.status not in JOB_STATES,
+        "tx_hash": record.finalize_tx_hash,
+        "anchor_tx_hash": record.anchor_tx_hash,
+        "error": record.job_error,
+        "updated_at": record.updated_at.isoformat() if record.updated_at else None
+    }
+
 
+@router.get("/sealing/stats")
+async def sealing_stats(request: Request):
+    return await request.app.state.sealing.stats()
+
+
+@router.get("/cache/stats")
+async def cache_stats(request: Request):
+    return request.app.state.maritime_client.cache.stats()
+
+
+@router.get("/gas/stats")
+async def gas_stats(request: Request):
     client = request.app.state.maritime_client
-    try:
-        delivery_id_bytes = client.w3.keccak(text=data.delivery_id)
-        
-        supplier_key = os.getenv("BARGE_PRIVATE_KEY")
-        chief_key = os.getenv("CHIEF_PRIVATE_KEY")
+    return {
+        "functions": client.gas_ledger.stats(),
+        "current_fees": await client.fee_oracle.fees_async(client.async_w3),
+        "estimate_cache": client.gas.cache.stats(),
+        "pending_txs": client.receipt_tracker.pending_count(),
+    }
 
-        print(f"Starting finalization flow for {data.delivery_id}...")
-        
-        receipt = client.finalize_bunker(
-            delivery_id=delivery_id_bytes,
-            density=int(data.density),
-            qty=int(data.actual_qty),
-            sample_id=data.sample_id,
-            supplier_key=supplier_key,
-            chief_key=chief_key
+
+@router.get("/healthz")
+async def liveness():
+    # Liveness only: answers as soon as the server is up, whatever the boot checks say.
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readiness(request: Request):
+    boot = request.app.state.boot
+    return JSONResponse(boot.stats(), status_code=200 if boot.ready else 503)
+
+
+@router.get("/leader")
+async def leader_status(request: Request):
+    return request.app.state.leader.stats()
+
+
+@router.get("/rpc/endpoints")
+async def rpc_endpoints(request: Request):
+    return request.app.state.maritime_client.rpc_pool.stats()
+
+
+@router.get("/metrics")
+async def metrics(request: Request):
+    # Prometheus text exposition; the gauges are sampled at scrape time.
+    PENDING_TXS.set(request.app.state.maritime_client.receipt_tracker.pending_count())
+    request.app.state.maritime_client.rpc_pool.update_gauges()
+    get_status_hub().update_gauges()
+    ACTIVE_FINALIZATIONS.set(request.app.state.finalization_jobs.active_jobs())
+    return Response(render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/deliveries/{delivery_id}/pdf")
+async def get_delivery_pdf(delivery_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Accepts the delivery id as submitted to /nominate or its keccak hex.
+    delivery_id_hex = delivery_id.removeprefix("0x").lower()
+    if len(delivery_id_hex) != 64:
+        delivery_id_hex = request.app.state.maritime_client.w3.keccak(text=delivery_id).hex()
+
+    result = await db.execute(
+        select(models.BunkerRecord.pdf_hash).where(models.BunkerRecord.delivery_id == delivery_id_hex)
+    )
+    pdf_hash = result.scalars().first()
+    if pdf_hash is None:
+        raise HTTPException(status_code=404, detail="No eBDN PDF for this delivery")
+
+    store = get_blob_store()
+    filename = f"ebdn-{delivery_id_hex[:12]}.pdf"
+    headers = {"ETag": f'"{pdf_hash}"', "X-PDF-SHA3-512": pdf_hash}
+
+    if not await asyncio.to_thread(store.exists, pdf_hash):
+        # Rows sealed before the blob store kept the PDF inline.
+        result = await db.execute(
+            select(models.BunkerRecord.pdf_blob).where(models.BunkerRecord.delivery_id == delivery_id_hex)
         )
+        pdf_bytes = result.scalars().first()
+        if pdf_bytes is None:
+            raise HTTPException(status_code=404, detail="eBDN PDF missing from blob store")
+        return Response(pdf_bytes, media_type="application/pdf", headers=headers)
 
-        record.status = "FINALIZED"
-        record.blockchain_tx = receipt.transactionHash.hex()
-        db.commit()
+    if not await asyncio.to_thread(store.verify, pdf_hash):
+        raise HTTPException(status_code=500, detail="Stored eBDN PDF failed its SHA3-512 integrity check")
 
-        return {
-            "status": "success", 
-            "message": "Bunker finalized on-chain",
-            "tx_hash": record.blockchain_tx
-        }
+    path = store.local_path(pdf_hash)
+    if path is not None:
+        return FileResponse(path, media_type="application/pdf", filename=filename, headers=headers)
+    return Response(await asyncio.to_thread(store.get, pdf_hash), media_type="application/pdf", headers=headers)
 
-    except Exception as e:
-        record.status = "FAILED"
-        db.commit()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+
+@router.post("/verify/batch")
+def verify_batch(data: schemas.VerifyBatch, request: Request):
+    client = request.app.state.maritime_client
+    delivery_ids = None
+    if data.delivery_ids is not None:
+        delivery_ids = [
+            d.removeprefix("0x").lower() if len(d.removeprefix("0x")) == 64 else client.w3.keccak(text=d).hex()
+            for d in data.delivery_ids
+        ]
+
+    # Imported on first use to keep web3 and eth_account off the app.main import path.
+    from app.services.verification import BatchVerifier
+
+    verifier = BatchVerifier(client if data.check_chain else None)
+
+    if not _verify_lock.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="A verification run is already in progress")
+    # Released when the report ends, or for a client that disconnected before the generator ever
+    # ran, by the background task or once the unstarted generator is collected; whichever is first.
+    claimed = threading.Lock()
+
+    def release():
+        if claimed.acquire(blocking=False):
+            _verify_lock.release()
+
+    def report():
+        # NDJSON: one line per record as it completes, then a summary line with records/s.
+        try:
+            for result in verifier.run(delivery_ids, [s.upper() for s in data.statuses], data.limit):
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"summary": verifier.summary}) + "\n"
+        finally:
+            release()
+
+    lines = report()
+    weakref.finalize(lines, release)
+    return StreamingResponse(lines, media_type="application/x-ndjson", background=BackgroundTask(release))
+
+
+
+@router.post("/zk/sulphur-proof")
+async def sulphur_proof(data: schemas.SulphurProofRequest):
+    # Proves sulphur_content <= threshold without revealing it; the commitment binds the proof to
+    # (sulphur_content, salt), so keep the salt if the value must be opened later.
+    salt = data.salt if data.salt is not None else hex(secrets.randbelow(FIELD_MODULUS))
+    try:
+        future = get_prover().submit(data.sulphur_content, data.threshold, salt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ProverBusy as e:
+        raise HTTPException(status_code=503, detail=f"Prover queue full: {e}")
+
+    try:
+        result = await asyncio.wrap_future(future)
+    except ProofError as e:
+        raise HTTPException(status_code=500, detail=f"Proof generation failed: {e}")
+    return {
+        "proof": "0x" + result["proof"].hex(),
+        "public_inputs": ["0x" + p.hex() for p in result["public_inputs"]],
+        "commitment": "0x" + result["commitment"].hex(),
+        "threshold": result["threshold"],
+        "salt": salt,
+    }
+
+
+@router.get("/zk/stats")
+async def zk_stats():
+    return prover_stats()
@@ -1,136 +1,441 @@
-import os
 import json
+import os
+import threading
+import asyncio
 import time
-from web3 import Web3
+from web3 import Web3, AsyncWeb3
+from web3.logs import DISCARD
+from web3.middleware import Web3Middleware
+from eth_abi import encode as abi_encode
 from eth_account.messages import encode_defunct
-import requests
+from app.core.cache import TTLCache
+from app.core.fees import FALLBACK_GAS_LIMIT, FeeOracle, GasEstimator, GasLedger
+from app.core.metrics import RPC_ERRORS, RPC_LATENCY
+from app.core.rpc_pool import AsyncPooledHTTPProvider, PooledHTTPProvider, RpcPool
+from app.core.telemetry import batch_span, delivery_span, get_logger
+from app.core.transactions import NonceManager, ReceiptTracker, TransactionReverted
+from app.services.telegram import TelegramApprovalDispatcher
+
+# nominateBunkerBatch: stems per transaction and the gas budget for each (2 new storage slots + event).
+NOMINATION_BATCH_SIZE = int(os.getenv("NOMINATION_BATCH_SIZE", "100"))
+NOMINATION_BASE_GAS = 60000
+NOMINATION_ITEM_GAS = 80000
+
+# Compact ABI and selectors written by Helper/build_abi_cache.py. The Foundry artifact also carries
+# the AST, bytecode and metadata, and is only parsed when the cache is missing or stale.
+ABI_CACHE_PATH = os.getenv("ABI_CACHE_PATH", "blockchain/abi/MaritimeRegistry.json")
+ABI_ARTIFACT_PATH = "blockchain/out/MaritimeRegistry.sol/MaritimeRegistry.json"
+# Enough to register the demo ship and supplier when neither file exists.
+FALLBACK_ABI = [
+    {"inputs":[{"internalType":"string","name":"","type":"string"}],"name":"shipToChiefEng","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
+    {"inputs":[{"internalType":"string","name":"_imo","type":"string"},{"internalType":"address","name":"_chiefEng","type":"address"}],"name":"registerShip","outputs":[],"stateMutability":"nonpayable","type":"function"},
+    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"supplierToBarge","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
+    {"inputs":[{"internalType":"uint256","name":"_supplierId","type":"uint256"},{"internalType":"address","name":"_barge","type":"address"}],"name":"registerSupplier","outputs":[],"stateMutability":"nonpayable","type":"function"}
+]
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+NOTE_NOMINATED = 1
+
+# Field positions in a MaritimeRegistry.getNote() tuple.
+NOTE_SUPPLIER_ID, NOTE_SULPHUR, NOTE_STATUS, NOTE_IMO = 0, 2, 5, 6
+NOTE_SIGNATURES_HASH, NOTE_PDF_HASH, NOTE_QUANTUM_SIGNATURE_HASH = 8, 9, 10
+
+log = get_logger(__name__)
+
+
+def load_contract_abi(cache_path=ABI_CACHE_PATH, artifact_path=ABI_ARTIFACT_PATH):
+    # (abi, selectors, source); selectors map "0x12345678" to "name(types)". The cache wins unless
+    # a newer Foundry build sits next to it.
+    cache_mtime = os.path.getmtime(cache_path) if os.path.exists(cache_path) else None
+    artifact_mtime = os.path.getmtime(artifact_path) if os.path.exists(artifact_path) else None
+    if cache_mtime is not None and (artifact_mtime is None or cache_mtime >= artifact_mtime):
+        with open(cache_path) as f:
+            cache = json.load(f)
+        return cache["abi"], cache["selectors"], cache_path
+    if artifact_mtime is not None:
+        if cache_mtime is not None:
+            log.warning("ABI cache is older than the Foundry artifact; run Helper/build_abi_cache.py",
+                        cache_path=cache_path)
+        with open(artifact_path) as f:
+            artifact = json.load(f)
+        return artifact["abi"], artifact_selectors(artifact), artifact_path
+    log.warning("ABI file not found; using fallback ABI for registration", abi_path=artifact_path)
+    return FALLBACK_ABI, {}, None
+
+
+def artifact_selectors(artifact):
+    return {"0x" + selector: signature for signature, selector in artifact.get("methodIdentifiers", {}).items()}
+
+
+def missing_functions(code, selectors):
+    # Signatures whose selector the dispatcher in `code` never pushes (solc emits PUSH4 <selector>,
+    # or a shorter PUSH when it has leading zero bytes).
+    missing = []
+    for selector, signature in selectors.items():
+        value = bytes.fromhex(selector[2:]).lstrip(b"\0")
+        if bytes([0x5f + len(value)]) + value not in code:
+            missing.append(signature)
+    return sorted(missing)
+
+
+def finalization_message_hash(delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id):
+    # The message the barge and the chief engineer both sign to finalize a delivery.
+    return Web3.solidity_keccak(
+        ['bytes32', 'string', 'uint256', 'uint256', 'uint256', 'uint256', 'string'],
+        [delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id]
+    )
+
+def _nomination(note):
+    return note[NOTE_IMO], note[NOTE_SUPPLIER_ID], note[NOTE_SULPHUR]
+
+
+def signatures_hash(sig_supplier, sig_chief):
+    # BunkerNote.signaturesHash: the ECDSA signatures themselves only live in BunkerFinalized.
+    return Web3.keccak(abi_encode(["bytes", "bytes"], [bytes(sig_supplier), bytes(sig_chief)]))
+
+
+class RpcMetricsMiddleware(Web3Middleware):
+    # Outermost layer: times each JSON-RPC round-trip by method; a batch counts as one "batch" call.
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            started = time.perf_counter()
+            try:
+                return make_request(method, params)
+            except Exception:
+                RPC_ERRORS.inc(method)
+                raise
+            finally:
+                RPC_LATENCY.observe(time.perf_counter() - started, method)
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            with RPC_LATENCY.time("batch"):
+                return make_batch_request(requests_info)
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            started = time.perf_counter()
+            try:
+                return await make_request(method, params)
+            except Exception:
+                RPC_ERRORS.inc(method)
+                raise
+            finally:
+                RPC_LATENCY.observe(time.perf_counter() - started, method)
+        return middleware
+
+    async def async_wrap_make_batch_request(self, make_batch_request):
+        async def middleware(requests_info):
+            with RPC_LATENCY.time("batch"):
+                return await make_batch_request(requests_info)
+        return middleware
+
 
 class MaritimeClient:
     def __init__(self, rpc_url, contract_address, private_key):
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        # rpc_url (one URL or a list) plus any RPC_URLS, shared by the sync and async providers
+        # (see app.core.rpc_pool).
+        # cache_allowed_requests lets web3 memoise eth_chainId, which it otherwise re-fetches to
+        # validate every eth_call.
+        self.rpc_pool = RpcPool.from_env(rpc_url)
+        self.w3 = Web3(PooledHTTPProvider(self.rpc_pool, cache_allowed_requests=True))
+        self.w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
         if not self.w3.is_connected():
-            raise Exception(f"Failed to connect to RPC at {rpc_url}")
+            raise Exception(f"Failed to connect to any RPC endpoint ({self.w3.provider})")
+        self.rpc_pool.start()
 
         self.admin_private_key = private_key
         self.admin_account = self.w3.eth.account.from_key(self.admin_private_key)
+        # Set to an app.core.leader.LeaderElection when several processes share the admin key.
+        self.leadership = None
         self.contract_address = contract_address
+        self.chain_id = self.w3.eth.chain_id
 
-        abi_path = "blockchain/out/MaritimeRegistry.sol/MaritimeRegistry.json"
-        
-        try:
-            with open(abi_path, 'r') as f:
-                contract_json = json.load(f)
-                abi = contract_json.get('abi', contract_json)
-            self.contract = self.w3.eth.contract(address=contract_address, abi=abi)
-        except FileNotFoundError:
-            print(f"⚠️ Warning: ABI file not found at {abi_path}. Using fallback ABI for registration.")
-            self.contract = self.w3.eth.contract(address=contract_address, abi=[
-                {"inputs":[{"internalType":"string","name":"","type":"string"}],"name":"shipToChiefEng","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
-                {"inputs":[{"internalType":"string","name":"_imo","type":"string"},{"internalType":"address","name":"_chiefEng","type":"address"}],"name":"registerShip","outputs":[],"stateMutability":"nonpayable","type":"function"}
-            ])
+        self._nonce_managers = {}
+        self._nonce_lock = threading.Lock()
+        self.gas = GasEstimator()
+        self.fee_oracle = FeeOracle()
+        self.gas_ledger = GasLedger()
+        self.receipt_tracker = ReceiptTracker(self.w3, fee_oracle=self.fee_oracle, ledger=self.gas_ledger)
+
+        # Read-through cache for registry views. Registrations and note statuses are kept fresh by
+        # the event indexer; a note's nomination fields never change once set.
+        self.cache = TTLCache()
+
+        self.async_w3 = AsyncWeb3(AsyncPooledHTTPProvider(self.rpc_pool, cache_allowed_requests=True))
+        self.async_w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+        self.telegram = TelegramApprovalDispatcher.from_env()
+
+        abi, self.selectors, abi_source = load_contract_abi()
+        log.info("Loaded contract ABI", source=abi_source, functions=len(self.selectors))
+        self.contract = self.w3.eth.contract(address=contract_address, abi=abi)
+        self.async_contract = self.async_w3.eth.contract(address=contract_address, abi=self.contract.abi)
+
+    def check_deployment(self):
+        # Boot check: the registry has code, and its dispatcher knows every function in the ABI.
+        # Returns the signatures it could not find, i.e. an ABI built from a different contract version.
+        code = bytes(self.w3.eth.get_code(self.contract_address))
+        if not code:
+            raise Exception(f"No contract deployed at {self.contract_address}")
+        return missing_functions(code, self.selectors)
+
+    def chief_engineer(self, imo: str) -> str:
+        chief_address = self.cache.get(("chief", imo))
+        if chief_address is None:
+            chief_address = self.contract.functions.shipToChiefEng(imo).call()
+            self.cache.set(("chief", imo), chief_address)
+        return chief_address
+
+    def barge(self, supplier_id: int) -> str:
+        barge_address = self.cache.get(("barge", supplier_id))
+        if barge_address is None:
+            barge_address = self.contract.functions.supplierToBarge(supplier_id).call()
+            self.cache.set(("barge", supplier_id), barge_address)
+        return barge_address
+
+    def prefetch_registry(self, imos=(), supplier_ids=()):
+        # Cold lookups go out as one JSON-RPC batch instead of one round-trip each.
+        missing = [("chief", imo) for imo in imos if self.cache.get(("chief", imo)) is None]
+        missing += [("barge", s) for s in supplier_ids if self.cache.get(("barge", s)) is None]
+        if not missing:
+            return
+        views = {"chief": self.contract.functions.shipToChiefEng, "barge": self.contract.functions.supplierToBarge}
+        for key, value in zip(missing, self.batch_call([views[kind](arg) for kind, arg in missing])):
+            self.cache.set(key, value)
+
+    def invalidate_registry(self, imo=None, supplier_id=None):
+        if imo is not None:
+            self.cache.invalidate(("chief", imo))
+        if supplier_id is not None:
+            self.cache.invalidate(("barge", supplier_id))
 
     def is_ship_registered(self, imo: str) -> bool:
-        chief_address = self.contract.functions.shipToChiefEng(imo).call()
-        return chief_address != "0x0000000000000000000000000000000000000000"
+        return self.chief_engineer(imo) != ZERO_ADDRESS
 
     def register_ship(self, imo: str, chief_address: str):
-        print(f"Anchoring Ship {imo} to Chief {chief_address}...")
-        return self._send_transaction(
-            self.contract.functions.registerShip(imo, chief_address),
-            self.admin_private_key
-        )  
+        log.info("Registering ship", imo=imo, chief=chief_address)
+        try:
+            return self._send_transaction(
+                self.contract.functions.registerShip(imo, chief_address),
+                self.admin_private_key
+            )
+        finally:
+            self.invalidate_registry(imo=imo)
         
     def is_supplier_registered(self, supplier_id: int) -> bool:
-        barge_address = self.contract.functions.supplierToBarge(supplier_id).call()
-        return barge_address != "0x0000000000000000000000000000000000000000"
+        return self.barge(supplier_id) != ZERO_ADDRESS
 
     def register_supplier(self, supplier_id: int, barge_address: str):
-        print(f"Registering Supplier ID {supplier_id} to Barge {barge_address}...")
-        return self._send_transaction(
-            self.contract.functions.registerSupplier(supplier_id, barge_address),
-            self.admin_private_key
-        )
-        
-    def nominate_bunker(self, delivery_id_bytes, imo, supplier_id, expected_sulphur, barge_private_key):
-        print(f"Supplier {supplier_id} is nominating Delivery {delivery_id_bytes.hex()}...")
-        
-        return self._send_transaction(
-            self.contract.functions.nominateBunker(
-                delivery_id_bytes, 
-                imo, 
-                supplier_id, 
-                expected_sulphur
-            ),
-            barge_private_key
-        )
-        
+        log.info("Registering supplier", supplier_id=supplier_id, barge=barge_address)
+        try:
+            return self._send_transaction(
+                self.contract.functions.registerSupplier(supplier_id, barge_address),
+                self.admin_private_key
+            )
+        finally:
+            self.invalidate_registry(supplier_id=supplier_id)
+
+    def batch_call(self, calls):
+        try:
+            with self.w3.batch_requests() as batch:
+                for call in calls:
+                    batch.add(call)
+                return batch.execute()
+        except Exception as e:
+            # Providers without batch support still get answered, one call at a time.
+            log.warning("JSON-RPC batch failed; falling back to single calls", error=str(e))
+            return [call.call() for call in calls]
+
+    async def batch_call_async(self, calls):
+        try:
+            async with self.async_w3.batch_requests() as batch:
+                for call in calls:
+                    batch.add(call)
+                return await batch.async_execute()
+        except Exception as e:
+            log.warning("JSON-RPC batch failed; falling back to single calls", error=str(e))
+            return await asyncio.gather(*(call.call() for call in calls))
+
+    def _remember_note(self, delivery_id, note):
+        status = note[NOTE_STATUS]
+        if status >= NOTE_NOMINATED:
+            self.cache.set(("nomination", bytes(delivery_id)), _nomination(note), ttl=None)
+        self.advance_note_status(delivery_id, status)
+
+    def remember_nomination(self, delivery_id, imo, supplier_id, expected_sulphur):
+        self.cache.set(("nomination", bytes(delivery_id)), (imo, supplier_id, expected_sulphur), ttl=None)
+        self.advance_note_status(delivery_id, NOTE_NOMINATED)
+
+    def advance_note_status(self, delivery_id, status):
+        # Note statuses only move forward, so a lower value never overwrites a higher one.
+        key = ("status", bytes(delivery_id))
+        current = self.cache.get(key)
+        if current is None or status >= current:
+            self.cache.set(key, status)
+
+    async def get_nomination(self, delivery_id):
+        # (imo_number, supplier_id, expected_sulphur): immutable once nominated.
+        nomination = self.cache.get(("nomination", bytes(delivery_id)))
+        if nomination is None:
+            note = await self.async_contract.functions.getNote(delivery_id).call()
+            self._remember_note(delivery_id, note)
+            nomination = _nomination(note)
+        return nomination
+
+    async def prefetch_notes(self, delivery_ids):
+        missing = [d for d in delivery_ids if self.cache.get(("nomination", bytes(d))) is None]
+        if not missing:
+            return
+        notes = await self.batch_call_async([self.async_contract.functions.getNote(d) for d in missing])
+        for delivery_id, note in zip(missing, notes):
+            self._remember_note(delivery_id, note)
         
-    def finalize_bunker(self, delivery_id, density, qty, sample_id, supplier_key, chief_key):
-        note = self.contract.functions.getNote(delivery_id).call()
-        imo_number = note[0]
-        supplier_id = note[1]
-        expected_sulphur = note[3]
-
-        token = os.getenv("TELEGRAM_TOKEN")
-        chat_id = os.getenv("CHIEF_CHAT_ID")
+    async def nominate_bunker(self, delivery_id_bytes, imo, supplier_id, expected_sulphur, barge_private_key):
+        log.detail("Nominating delivery", delivery_id=delivery_id_bytes.hex(), supplier_id=supplier_id)
+
+        with delivery_span("nominate", delivery_id_bytes, supplier_id=supplier_id):
+            receipt = await self._send_transaction_async(
+                self.contract.functions.nominateBunker(
+                    delivery_id_bytes,
+                    imo,
+                    supplier_id,
+                    expected_sulphur
+                ),
+                barge_private_key
+            )
+        if receipt.status == 1:
+            self.remember_nomination(delivery_id_bytes, imo, supplier_id, expected_sulphur)
+        return receipt
+
+    async def nominate_bunker_batch(self, nominations, barge_private_key, chunk_size=NOMINATION_BATCH_SIZE):
+        # nominations: [(delivery_id_bytes, imo, supplier_id, expected_sulphur)]
+        # Returns {delivery_id_bytes: (nominated, tx_hash_hex, error)} for every input.
+        chunks = [nominations[i:i + chunk_size] for i in range(0, len(nominations), chunk_size)]
+        log.info("Nominating batch", deliveries=len(nominations), transactions=len(chunks))
+
+        with batch_span("nominate.batch", [n[0] for n in nominations], transactions=len(chunks)):
+            # Submit every chunk first so they share blocks, then wait for all receipts together.
+            submitted = []
+            for chunk in chunks:
+                try:
+                    tx_hash = await self.submit_transaction_async(
+                        self.contract.functions.nominateBunkerBatch([tuple(n) for n in chunk]),
+                        barge_private_key,
+                        tx_params={'gas': NOMINATION_BASE_GAS + NOMINATION_ITEM_GAS * len(chunk)},
+                        deliveries=len(chunk)
+                    )
+                    submitted.append((chunk, tx_hash, None))
+                except Exception as e:
+                    submitted.append((chunk, None, e))
+
+            receipts = await asyncio.gather(
+                *(self.wait_for_receipt_async(tx_hash) for _, tx_hash, error in submitted if error is None),
+                return_exceptions=True
+            )
+        receipts = iter(receipts)
+
+        results = {}
+        for chunk, tx_hash, error in submitted:
+            receipt = next(receipts) if error is None else None
+            if isinstance(receipt, Exception):
+                error = receipt
+            elif receipt is not None and receipt.status != 1:
+                error = TransactionReverted(tx_hash, "Batch transaction")
+            if error is not None:
+                for n in chunk:
+                    results[n[0]] = (False, tx_hash.hex() if tx_hash else None, str(error))
+                continue
+
+            tx_hex = receipt.transactionHash.hex()
+            rejected = {
+                entry.args.deliveryId: entry.args.reason
+                for entry in self.contract.events.BunkerNominationRejected().process_receipt(receipt, errors=DISCARD)
+            }
+            for n in chunk:
+                reason = rejected.get(n[0])
+                results[n[0]] = (reason is None, tx_hex, reason)
+                if reason is None:
+                    self.remember_nomination(*n)
+        return results
+
+    async def finalize_bunker(self, delivery_id, density, qty, sample_id, supplier_key, chief_key):
+        await self.request_finalization_approval(delivery_id, density, qty, sample_id)
+
+        if not await self.await_finalization_approval(delivery_id):
+            raise Exception("Transaction aborted: Telegram approval timed out.")
+
+        tx_hash = await self.submit_finalization(delivery_id, density, qty, sample_id, supplier_key, chief_key)
+        receipt = await self.wait_for_receipt_async(tx_hash)
+
+        if receipt.status == 1:
+            await self.notify_telegram_success(delivery_id.hex(), receipt.transactionHash.hex(), qty)
         
+        return receipt
+
+    async def request_finalization_approval(self, delivery_id, density, qty, sample_id):
+        imo_number, _, _ = await self.get_nomination(delivery_id)
+
         bunker_details = (
             f"*BUNKER FINALIZATION REQUEST*\n\n"
             f"*ID:* `{delivery_id.hex()[:12]}...`\n"
             f"*IMO:* {imo_number}\n"
             f"*Density:* {density}\n"
             f"*Quantity:* {qty} MT\n"
-            f"*Sample:* {sample_id}\n\n"
-            f"Reply with *'SIGN'* to authorize this record."
+            f"*Sample:* {sample_id}"
         )
 
-        print(f"[{delivery_id.hex()[:6]}] Sending Telegram request...")
-        requests.post(f"https://api.telegram.org/bot{token}/sendMessage", 
-                     data={"chat_id": chat_id, "text": bunker_details, "parse_mode": "Markdown"})
-
-        approved = False
-        timeout = 60  
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            updates = requests.get(f"https://api.telegram.org/bot{token}/getUpdates").json()
-            if updates["result"]:
-                last_msg = updates["result"][-1].get("message", {}).get("text", "")
-                if last_msg.upper() == "SIGN":
-                    print("Approval received via Telegram!")
-                    approved = True
-                    break
-            time.sleep(3)
-
-        if not approved:
-            raise Exception("Transaction aborted: Telegram approval timed out.")
-        
-        message_hash = Web3.solidity_keccak(
-            ['bytes32', 'string', 'uint256', 'uint256', 'uint256', 'uint256', 'string'],
-            [delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id]
+        log.detail("Sending Telegram approval request", delivery_id=delivery_id.hex())
+        await self.telegram.request_approval(delivery_id.hex(), bunker_details)
+
+    async def await_finalization_approval(self, delivery_id, timeout=60, requested_at=None):
+        return await self.telegram.wait_for_approval(delivery_id.hex(), timeout, requested_at)
+
+    def cancel_finalization_approval(self, delivery_id):
+        self.telegram.cancel_approval(delivery_id.hex())
+
+    async def submit_finalization(self, delivery_id, density, qty, sample_id, supplier_key, chief_key):
+        imo_number, supplier_id, expected_sulphur = await self.get_nomination(delivery_id)
+
+        sig_supplier, sig_chief = await asyncio.to_thread(
+            self.sign_finalization,
+            delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id,
+            supplier_key, chief_key
         )
-        msg_eth_signed = encode_defunct(message_hash)
-        
-        sig_supplier = self.w3.eth.account.sign_message(msg_eth_signed, private_key=supplier_key).signature
-        sig_chief = self.w3.eth.account.sign_message(msg_eth_signed, private_key=chief_key).signature
 
-        print("Submitting signatures to blockchain...")
-        receipt = self._send_transaction(
+        log.detail("Submitting finalization", delivery_id=delivery_id.hex())
+        return await self.submit_transaction_async(
             self.contract.functions.finalizeBunker(
                 delivery_id, density, qty, sample_id, sig_supplier, sig_chief
             ),
             self.admin_private_key
         )
 
-        if receipt.status == 1:
-            self.notify_telegram_success(delivery_id.hex(), receipt.transactionHash.hex(), qty)
+    async def get_note_status(self, delivery_id, minimum=None) -> int:
+        # With `minimum`, a cached status that already reached it is final (statuses never go
+        # back); anything lower, or no minimum at all, is re-read from the chain.
+        if minimum is not None:
+            cached = self.cache.get(("status", bytes(delivery_id)))
+            if cached is not None and cached >= minimum:
+                return cached
+        note = await self.async_contract.functions.getNote(delivery_id).call()
+        self._remember_note(delivery_id, note)
+        return note[NOTE_STATUS]
+
+    def sign_finalization(self, delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id,
+                          supplier_key, chief_key):
+        message_hash = finalization_message_hash(
+            delivery_id, imo_number, supplier_id, density, expected_sulphur, qty, sample_id
+        )
+        msg_eth_signed = encode_defunct(message_hash)
         
-        return receipt
+        sig_supplier = self.w3.eth.account.sign_message(msg_eth_signed, private_key=supplier_key).signature
+        sig_chief = self.w3.eth.account.sign_message(msg_eth_signed, private_key=chief_key).signature
+        return sig_supplier, sig_chief
     
-    def notify_telegram_success(self, delivery_id_str, tx_hash, qty):
-        token = os.getenv("TELEGRAM_TOKEN")
-        chat_id = os.getenv("CHIEF_CHAT_ID")
-        
+    async def notify_telegram_success(self, delivery_id_str, tx_hash, qty):
         success_msg = (
             f"*eBDN FINALIZED ON-CHAIN*\n\n"
             f"*ID:* `{delivery_id_str}`\n"
@@ -139,45 +444,148 @@ class MaritimeClient:
             f"The record is now immutable."
         )
         
-        requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            data={"chat_id": chat_id, "text": success_msg, "parse_mode": "Markdown"}
-        )
+        await self.telegram.send_message(success_msg)
         
     def anchor_quantum_seal(self, delivery_id_bytes: bytes, pdf_hash_hex: str, quantum_sig_bytes: bytes):
-        admin_address = self.w3.eth.account.from_key(self.admin_private_key).address
-        
-        tx = self.contract.functions.anchorQuantumSeal(
-            delivery_id_bytes,    
-            pdf_hash_hex,         
-            quantum_sig_bytes     
-        ).build_transaction({
-            'from': admin_address,
-            'nonce': self.w3.eth.get_transaction_count(admin_address),
-            'gas': 1000000,
-            'gasPrice': self.w3.to_wei('20', 'gwei')
-        })
-
-        signed_tx = self.w3.eth.account.sign_transaction(tx, self.admin_private_key)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        
-        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-        
-    def _send_transaction(self, contract_function, private_key):
+        return self._send_transaction(
+            self.contract.functions.anchorQuantumSeal(
+                delivery_id_bytes,
+                bytes.fromhex(pdf_hash_hex),
+                quantum_sig_bytes
+            ),
+            self.admin_private_key
+        )
+
+    async def submit_quantum_seal(self, delivery_id_bytes: bytes, pdf_hash_hex: str, quantum_sig_bytes: bytes):
+        return await self.submit_transaction_async(
+            self.contract.functions.anchorQuantumSeal(
+                delivery_id_bytes,
+                bytes.fromhex(pdf_hash_hex),
+                quantum_sig_bytes
+            ),
+            self.admin_private_key
+        )
+
+    async def submit_quantum_seal_batch(self, merkle_root: bytes, leaf_count: int, quantum_sig_bytes: bytes):
+        return await self.submit_transaction_async(
+            self.contract.functions.anchorQuantumSealBatch(
+                merkle_root,
+                leaf_count,
+                quantum_sig_bytes
+            ),
+            self.admin_private_key,
+            deliveries=leaf_count
+        )
+
+    async def is_seal_batch_anchored(self, merkle_root: bytes) -> bool:
+        batch = await self.async_contract.functions.sealBatches(merkle_root).call()
+        return batch[0] != 0
+
+    def nonce_manager(self, address):
+        with self._nonce_lock:
+            if address not in self._nonce_managers:
+                self._nonce_managers[address] = NonceManager(self.w3, address)
+            return self._nonce_managers[address]
+
+    def _tx_params(self, fees, tx_params):
+        # Explicit caller values win; a caller-supplied gasPrice turns the tx back into a legacy one.
+        params = {'chainId': self.chain_id, 'gas': FALLBACK_GAS_LIMIT, 'nonce': 0, **fees}
+        if tx_params and 'gasPrice' in tx_params:
+            params.pop('maxFeePerGas', None)
+            params.pop('maxPriorityFeePerGas', None)
+        params.update(tx_params or {})
+        return params
+
+    def _check_signer(self, address):
+        # Fencing: only the process holding the leader lease may sign with the admin key, so two
+        # instances never race for its nonces. Other keys (the barge's) are not restricted.
+        if self.leadership is not None and address == self.admin_account.address:
+            self.leadership.check()
+
+    def _signer(self, private_key):
         account = self.w3.eth.account.from_key(private_key)
-        
-        txn = contract_function.build_transaction({
-            'chainId': self.w3.eth.chain_id,
-            'gas': 500000,
-            'gasPrice': self.w3.eth.gas_price,
-            'nonce': self.w3.eth.get_transaction_count(account.address),
-        })
-
-        signed_txn = self.w3.eth.account.sign_transaction(txn, private_key=private_key)
-        try:
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-            return self.w3.eth.wait_for_transaction_receipt(tx_hash)
-        except Exception as e:
-            print(f"Transaction Failed! Possible Ownership Issue: {e}")
-            raise e
\ No newline at end of file
+
+        def sign(txn):
+            self._check_signer(account.address)
+            return account.sign_transaction(txn).raw_transaction
+        return sign
+
+    def submit_transaction(self, contract_function, private_key, tx_params=None, deliveries=1):
+        account = self.w3.eth.account.from_key(private_key)
+        self._check_signer(account.address)
+        nonces = self.nonce_manager(account.address)
+
+        # With every field supplied, build_transaction is pure encoding and makes no RPC calls.
+        txn = contract_function.build_transaction(self._tx_params(self.fee_oracle.fees(self.w3), tx_params))
+        if not tx_params or 'gas' not in tx_params:
+            txn['gas'] = self.gas.gas_limit(self.w3, txn, account.address)
+
+        for attempt in range(2):
+            try:
+                # A send that fails settles the nonce as unsent, which resyncs the counter so the
+                # gap is refilled; retry once if the node says we are behind.
+                with nonces.reserve() as nonce:
+                    txn['nonce'] = nonce
+                    signed_txn = self.w3.eth.account.sign_transaction(txn, private_key=private_key)
+                    tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            except Exception as e:
+                if attempt == 0 and "nonce too low" in str(e).lower():
+                    continue
+                log.error("Transaction rejected", function=contract_function.fn_name, error=str(e))
+                raise e
+
+            self.receipt_tracker.track(
+                tx_hash, account.address, txn['nonce'], nonces,
+                txn=dict(txn), sign=self._signer(private_key), label=contract_function.fn_name,
+                deliveries=deliveries,
+            )
+            return tx_hash
+
+    def wait_for_receipt(self, tx_hash, timeout=120):
+        return self.receipt_tracker.wait(tx_hash, timeout=timeout)
+
+    def _send_transaction(self, contract_function, private_key, tx_params=None, deliveries=1):
+        tx_hash = self.submit_transaction(contract_function, private_key, tx_params, deliveries)
+        return self.wait_for_receipt(tx_hash)
+
+    async def submit_transaction_async(self, contract_function, private_key, tx_params=None, deliveries=1):
+        account = self.w3.eth.account.from_key(private_key)
+        self._check_signer(account.address)
+        nonces = self.nonce_manager(account.address)
+
+        fees = await self.fee_oracle.fees_async(self.async_w3)
+        txn = contract_function.build_transaction(self._tx_params(fees, tx_params))
+        if not tx_params or 'gas' not in tx_params:
+            txn['gas'] = await self.gas.gas_limit_async(self.async_w3, txn, account.address)
+
+        for attempt in range(2):
+            try:
+                async with nonces.reserve_async(self.async_w3) as nonce:
+                    txn['nonce'] = nonce
+                    signed_txn = await asyncio.to_thread(
+                        self.w3.eth.account.sign_transaction, txn, private_key
+                    )
+                    tx_hash = await self.async_w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            except Exception as e:
+                if attempt == 0 and "nonce too low" in str(e).lower():
+                    continue
+                log.error("Transaction rejected", function=contract_function.fn_name, error=str(e))
+                raise e
+
+            self.receipt_tracker.track(
+                tx_hash, account.address, txn['nonce'], nonces,
+                txn=dict(txn), sign=self._signer(private_key), label=contract_function.fn_name,
+                deliveries=deliveries,
+            )
+            return tx_hash
+
+    async def wait_for_receipt_async(self, tx_hash, timeout=120):
+        future = self.receipt_tracker.future(tx_hash)
+        if future is None:
+            return await self.async_w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+        # Shielded: a timeout here must not cancel the tracker's future, which later waits share.
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    async def _send_transaction_async(self, contract_function, private_key, tx_params=None, deliveries=1):
+        tx_hash = await self.submit_transaction_async(contract_function, private_key, tx_params, deliveries)
+        return await self.wait_for_receipt_async(tx_hash)
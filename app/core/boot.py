@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+from starlette.responses import JSONResponse
+from starlette.websockets import WebSocketClose
+from app.core.telemetry import get_logger
+
+BOOT_RETRY_INTERVAL = float(os.getenv("BOOT_RETRY_INTERVAL", "5"))
+# Served while booting: liveness and readiness probes.
+PROBE_PATHS = frozenset(("/healthz", "/readyz"))
+
+log = get_logger(__name__)
+
+
+class BootChecks:
+    # Startup steps (migrations, RPC connection, contract check, background services) run in order
+    # after the server is already accepting connections. A failing step is logged and retried every
+    # retry_interval; the steps after it wait. ready flips once the last one has passed.
+
+    def __init__(self, retry_interval=BOOT_RETRY_INTERVAL):
+        self.retry_interval = retry_interval
+        self.started = time.monotonic()
+        self.checks = {}
+        self.ready = False
+        self.ready_after = None
+        self._task = None
+
+    def start(self, steps):
+        self._task = asyncio.create_task(self.run(steps))
+
+    async def wait(self):
+        await self._task
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run(self, steps, retry=True):
+        for name, _ in steps:
+            self.checks[name] = {"status": "pending"}
+        for name, step in steps:
+            attempts = 0
+            while True:
+                attempts += 1
+                started = time.monotonic()
+                try:
+                    await step()
+                except Exception as e:
+                    self.checks[name] = {"status": "failed", "attempts": attempts, "error": str(e)}
+                    if not retry:
+                        raise
+                    log.error("Boot check failed; retrying", check=name, attempts=attempts, error=str(e))
+                    await asyncio.sleep(self.retry_interval)
+                    continue
+                self.checks[name] = {"status": "ok", "seconds": round(time.monotonic() - started, 3)}
+                break
+        self.ready = True
+        self.ready_after = time.monotonic() - self.started
+        log.info("System ready", seconds=round(self.ready_after, 3))
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+            "checks": self.checks,
+        }
+
+
+class ReadinessGate:
+    # ASGI middleware: until boot is done, everything but the probes gets 503 (WebSockets are
+    # closed with 1013, try again later) instead of reaching handlers whose state is not set up.
+
+    def __init__(self, app, boot):
+        self.app = app
+        self.boot = boot
+
+    async def __call__(self, scope, receive, send):
+        if self.boot.ready or scope["type"] not in ("http", "websocket") or scope["path"] in PROBE_PATHS:
+            await self.app(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await WebSocketClose(code=1013)(scope, receive, send)
+        else:
+            response = JSONResponse({"detail": "Service is starting"}, status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
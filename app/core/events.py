@@ -1,78 +1,170 @@
 import asyncio
-import hashlib
+import datetime
+from sqlalchemy import update
 from app.database import SessionLocal
 from app import models
-from app.services.pdf_engine import generate_ebdn_receipt
-from app.services.quantum_vault import sign_with_mldsa
-from app.core.blockchain import MaritimeClient
+from app.core.metrics import record_transition
+from app.core.status_hub import get_status_hub, publish_status
+from app.core.telemetry import get_logger
+
+# MaritimeRegistry.BunkerStatus values, mirrored into MaritimeClient's note cache.
+NOTE_NOMINATED, NOTE_FINALIZED, NOTE_QUANTUM_SEALED = 1, 2, 3
+
+log = get_logger(__name__)
+
+
+def process_ship_registered_event(event, maritime_client):
+    maritime_client.invalidate_registry(imo=event['args']['imo'])
+
+
+def process_supplier_registered_event(event, maritime_client):
+    maritime_client.invalidate_registry(supplier_id=event['args']['supplierId'])
+
+
+def process_finalized_event(event, maritime_client):
+    maritime_client.advance_note_status(event['args']['deliveryId'], NOTE_FINALIZED)
+    db = SessionLocal()
+    try:
+        delivery_id_hex = event['args']['deliveryId'].hex()
+        log.detail("BunkerFinalized indexed; queueing quantum seal", delivery_id=delivery_id_hex)
+
+        record = db.query(models.BunkerRecord).filter(
+            models.BunkerRecord.delivery_id == delivery_id_hex
+        ).first()
+
+        if record is None:
+            log.warning("Finalized delivery not found in DB", delivery_id=delivery_id_hex)
+            return
+
+        previous = record.status
+        if record.status != "QUANTUM_SEALED":
+            record.sig_supplier = event['args']['sigSupplier']
+            record.sig_chief = event['args']['sigChiefEng']
+            record.actual_qty = event['args']['quantity']
+            record.status = "FINALIZED"
+            # The eBDN is stamped with block time, not wall-clock time, so re-rendering is reproducible.
+            block = maritime_client.w3.eth.get_block(event['blockNumber'])
+            record.finalized_at = datetime.datetime.fromtimestamp(
+                block['timestamp'], datetime.timezone.utc
+            ).replace(tzinfo=None)
+
+        # Replays (INDEXER_START_BLOCK=0) see events of deliveries sealed long ago: those get no
+        # seal job, and the job is keyed by delivery id, so the rest never get a second one.
+        anchored = previous == "QUANTUM_SEALED" or record.anchor_tx_hash is not None
+        if not anchored and db.query(models.SealJob).filter(
+            models.SealJob.delivery_id == delivery_id_hex
+        ).first() is None:
+            db.add(models.SealJob(delivery_id=delivery_id_hex))
+        db.commit()
+        if previous != record.status:
+            record_transition(previous, record.status)
+            publish_status(delivery_id_hex, record.status, record.imo_number, record.supplier_id)
+    finally:
+        db.close()
+
+
+def process_nominated_event(event, maritime_client):
+    maritime_client.advance_note_status(event['args']['deliveryId'], NOTE_NOMINATED)
+    db = SessionLocal()
+    try:
+        delivery_id_hex = event['args']['deliveryId'].hex()
+        record = db.query(models.BunkerRecord).filter(
+            models.BunkerRecord.delivery_id == delivery_id_hex
+        ).first()
+
+        previous = record.status if record is not None else None
+        if record is None:
+            # Nominated directly on-chain (or while our row was lost): mirror it locally.
+            db.add(models.BunkerRecord(
+                delivery_id=delivery_id_hex,
+                imo_number=event['args']['imo'],
+                supplier_id=event['args']['supplierId'],
+                status="NOMINATED"
+            ))
+        elif record.status == "PENDING":
+            record.status = "NOMINATED"
+        db.commit()
+        if record is None or previous == "PENDING":
+            record_transition(previous, "NOMINATED")
+            publish_status(delivery_id_hex, "NOMINATED", event['args']['imo'], event['args']['supplierId'])
+    finally:
+        db.close()
+
+
+def process_anchored_event(event, maritime_client):
+    maritime_client.advance_note_status(event['args']['deliveryId'], NOTE_QUANTUM_SEALED)
+    db = SessionLocal()
+    try:
+        delivery_id_hex = event['args']['deliveryId'].hex()
+        record = db.query(models.BunkerRecord).filter(
+            models.BunkerRecord.delivery_id == delivery_id_hex
+        ).first()
+
+        previous = record.status if record is not None else "QUANTUM_SEALED"
+        if previous != "QUANTUM_SEALED":
+            record.status = "QUANTUM_SEALED"
+            record.anchor_tx_hash = record.anchor_tx_hash or event['transactionHash'].hex()
+
+        job = db.query(models.SealJob).filter(models.SealJob.delivery_id == delivery_id_hex).first()
+        if job is not None and job.stage != "DONE":
+            job.stage = "DONE"
+            job.anchor_tx_hash = job.anchor_tx_hash or event['transactionHash'].hex()
+        db.commit()
+        if previous != "QUANTUM_SEALED":
+            record_transition(previous, "QUANTUM_SEALED")
+            publish_status(delivery_id_hex, "QUANTUM_SEALED", record.imo_number, record.supplier_id)
+    finally:
+        db.close()
+
+
+def process_batch_anchored_event(event, maritime_client):
+    db = SessionLocal()
+    try:
+        root_hex = event['args']['merkleRoot'].hex()
+        tx_hash = event['transactionHash'].hex()
+
+        batch = db.get(models.SealBatch, root_hex)
+        if batch is not None and batch.status != "ANCHORED":
+            batch.status = "ANCHORED"
+            batch.anchor_tx_hash = batch.anchor_tx_hash or tx_hash
+
+        db.query(models.SealJob).filter(
+            models.SealJob.batch_root == root_hex, models.SealJob.stage != "DONE"
+        ).update({"stage": "DONE", "anchor_tx_hash": tx_hash})
+        sealed = db.execute(
+            update(models.BunkerRecord)
+            .where(models.BunkerRecord.seal_batch_root == root_hex, models.BunkerRecord.status != "QUANTUM_SEALED")
+            .values(status="QUANTUM_SEALED", anchor_tx_hash=tx_hash)
+            .returning(models.BunkerRecord.delivery_id, models.BunkerRecord.imo_number,
+                       models.BunkerRecord.supplier_id)
+        ).all()
+        db.commit()
+        # Only FINALIZED records are ever put into a seal batch.
+        record_transition("FINALIZED", "QUANTUM_SEALED", len(sealed))
+        get_status_hub().publish_many(sealed, "QUANTUM_SEALED")
+    finally:
+        db.close()
+
+
+EVENT_HANDLERS = {
+    "ShipRegistered": process_ship_registered_event,
+    "SupplierRegistered": process_supplier_registered_event,
+    "BunkerNominated": process_nominated_event,
+    "BunkerFinalized": process_finalized_event,
+    "QuantumSealAnchored": process_anchored_event,
+    "QuantumSealBatchAnchored": process_batch_anchored_event,
+}
+
+
+async def log_loop(indexer, poll_interval):
+    log.info("Event watcher active", events=list(EVENT_HANDLERS))
 
-async def log_loop(event_filter, poll_interval, maritime_client):
-    print("Quantum Watcher Active: Monitoring for BunkerFinalized...")
-    
     while True:
-        for event in event_filter.get_new_entries():
-            db = SessionLocal()
-            try:
-                delivery_id_bytes = event['args']['deliveryId']
-                delivery_id_hex = delivery_id_bytes.hex()
-                print(f"Event Detected: {delivery_id_hex}. Finalizing eBDN...")
-
-                record = db.query(models.BunkerRecord).filter(
-                    models.BunkerRecord.delivery_id == delivery_id_hex
-                ).first()
-
-                if record:
-                    record.sig_supplier = event['args']['sigSupplier']
-                    record.sig_chief = event['args']['sigChiefEng']
-                    record.actual_qty = event['args']['quantity']
-                    record.status = "FINALIZED"
-                    db.flush()
-
-                    print(f"Generating PDF for {delivery_id_hex}...")
-                    pdf_bytes = generate_ebdn_receipt(record)
-                    record.pdf_blob = pdf_bytes
-
-                    print(f"Calculating SHA3-512 Quantum Hash...")
-                    sha3_obj = hashlib.sha3_512(pdf_bytes)
-                    pdf_hash_bytes = sha3_obj.digest()      
-                    pdf_hash_hex = sha3_obj.hexdigest()    
-
-                    record.pdf_hash = pdf_hash_hex
-
-                    print(f"Applying Post-Quantum Seal...")
-                    quantum_sig, alg_name = sign_with_mldsa(pdf_hash_bytes)
-
-                    record.quantum_signature = quantum_sig
-                    record.status = "QUANTUM_SEALED"
-                    
-                    print(f"Anchoring Quantum Seal to Blockchain (3 Parameters)...")
-                    try:
-                        receipt = maritime_client.anchor_quantum_seal(
-                            delivery_id_bytes=delivery_id_bytes,
-                            pdf_hash_hex=pdf_hash_hex,
-                            quantum_sig_bytes=quantum_sig
-                        )
-                        
-                        record.anchor_tx_hash = receipt.transactionHash.hex()
-                        record.status = "QUANTUM_SEALED"
-                        db.commit()
-
-                        print(f"QUANTUM ANCHOR SUCCESSFUL")
-                        print(f"   TX Hash: {record.anchor_tx_hash}")
-                    except Exception as e:
-                        print(f"Blockchain Anchoring Failed: {str(e)}")
-                        db.rollback() 
-                    
-                    db.commit()
-                    print(f"Quantum Seal Created: {pdf_hash_hex[:16]}...")
-                    print(f" quantum signature added to the DB using {alg_name}")
-                
-                else:
-                    print(f"⚠️ Warning: Delivery ID {delivery_id_hex} not found in DB.")
-
-            except Exception as e:
-                print(f"Error in loop: {str(e)}")
-            finally:
-                db.close()
+        # get_logs and the DB writes are blocking, so each pass runs in a worker thread.
+        # Sealing and anchoring happen separately in app.services.sealing.
+        try:
+            await asyncio.to_thread(indexer.sync_once)
+        except Exception as e:
+            log.warning("Indexer pass failed", error=str(e))
         
-        await asyncio.sleep(poll_interval)
\ No newline at end of file
+        await asyncio.sleep(poll_interval)
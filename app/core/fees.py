@@ -0,0 +1,156 @@
+import math
+import os
+import statistics
+import threading
+from web3 import Web3
+from app.core.cache import TTLCache
+from app.core.telemetry import get_logger
+
+GAS_LIMIT_MARGIN = float(os.getenv("GAS_LIMIT_MARGIN", "1.25"))
+GAS_ESTIMATE_TTL = float(os.getenv("GAS_ESTIMATE_TTL", "3600"))
+# Used when eth_estimateGas fails (e.g. the call would revert): the tx is still sent, so the chain
+# reports the revert exactly as before estimation existed.
+FALLBACK_GAS_LIMIT = int(os.getenv("FALLBACK_GAS_LIMIT", "500000"))
+
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))
+FEE_PRIORITY_PERCENTILE = float(os.getenv("FEE_PRIORITY_PERCENTILE", "50"))
+FEE_CACHE_TTL = float(os.getenv("FEE_CACHE_TTL", "3"))  # roughly one block
+MIN_PRIORITY_FEE = Web3.to_wei(os.getenv("MIN_PRIORITY_FEE_GWEI", "0.01"), "gwei")
+MAX_FEE_PER_GAS = Web3.to_wei(os.getenv("MAX_FEE_GWEI", "500"), "gwei")  # never bid above this
+# maxFeePerGas = BASE_FEE_MULTIPLIER * next base fee + tip. The base fee rises at most 12.5% per
+# block, so 2x keeps a tx valid through ~6 consecutive full blocks without overpaying: only
+# base fee + tip is actually charged.
+BASE_FEE_MULTIPLIER = 2
+
+# Watchdog: a tx still pending this many blocks after (re)submission is re-signed with higher fees.
+TX_REPLACE_AFTER_BLOCKS = int(os.getenv("TX_REPLACE_AFTER_BLOCKS", "3"))
+TX_MAX_REPLACEMENTS = int(os.getenv("TX_MAX_REPLACEMENTS", "5"))
+# Nodes reject a same-nonce replacement unless both fees rise by at least 10%.
+REPLACEMENT_BUMP = 1.125
+
+log = get_logger(__name__)
+
+
+def _gas_key(txn):
+    # Per contract function (selector) and calldata size, so strings and batches of different
+    # lengths get their own estimate.
+    data = txn.get("data") or "0x"
+    return ("gas", txn.get("to"), data[:10], len(data))
+
+
+class GasEstimator:
+    def __init__(self, margin=GAS_LIMIT_MARGIN, ttl=GAS_ESTIMATE_TTL):
+        self.margin = margin
+        self.cache = TTLCache(maxsize=1024, ttl=ttl)
+
+    def _limit(self, estimate):
+        return int(estimate * self.margin)
+
+    def gas_limit(self, w3, txn, sender):
+        key = _gas_key(txn)
+        estimate = self.cache.get(key)
+        if estimate is None:
+            try:
+                estimate = w3.eth.estimate_gas({"from": sender, "to": txn["to"], "data": txn["data"]})
+            except Exception as e:
+                log.warning("Gas estimation failed; using fallback limit", limit=FALLBACK_GAS_LIMIT, error=str(e))
+                return FALLBACK_GAS_LIMIT
+            self.cache.set(key, estimate)
+        return self._limit(estimate)
+
+    async def gas_limit_async(self, async_w3, txn, sender):
+        key = _gas_key(txn)
+        estimate = self.cache.get(key)
+        if estimate is None:
+            try:
+                estimate = await async_w3.eth.estimate_gas({"from": sender, "to": txn["to"], "data": txn["data"]})
+            except Exception as e:
+                log.warning("Gas estimation failed; using fallback limit", limit=FALLBACK_GAS_LIMIT, error=str(e))
+                return FALLBACK_GAS_LIMIT
+            self.cache.set(key, estimate)
+        return self._limit(estimate)
+
+
+class FeeOracle:
+    # EIP-1559 fees from eth_feeHistory: the pending block's base fee plus a percentile of recent
+    # tips. Chains without a base fee get a legacy gasPrice. Cached for about a block, so a burst
+    # of submissions costs one RPC call instead of one per tx.
+
+    def __init__(self, blocks=FEE_HISTORY_BLOCKS, percentile=FEE_PRIORITY_PERCENTILE, ttl=FEE_CACHE_TTL):
+        self.blocks = blocks
+        self.percentile = percentile
+        self.cache = TTLCache(maxsize=1, ttl=ttl)
+
+    def _from_history(self, history):
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or not base_fees[-1]:
+            return None
+        # The last entry is the base fee of the block after the newest one, i.e. the next block.
+        next_base_fee = base_fees[-1]
+        tips = [reward[0] for reward in history.get("reward") or [] if reward]
+        tip = max(int(statistics.median(tips)) if tips else 0, MIN_PRIORITY_FEE)
+        max_fee = min(BASE_FEE_MULTIPLIER * next_base_fee + tip, MAX_FEE_PER_GAS)
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": min(tip, max_fee)}
+
+    def fees(self, w3):
+        fees = self.cache.get("fees")
+        if fees is None:
+            history = w3.eth.fee_history(self.blocks, "pending", [self.percentile])
+            fees = self._from_history(history) or {"gasPrice": min(w3.eth.gas_price, MAX_FEE_PER_GAS)}
+            self.cache.set("fees", fees)
+        return dict(fees)
+
+    async def fees_async(self, async_w3):
+        fees = self.cache.get("fees")
+        if fees is None:
+            history = await async_w3.eth.fee_history(self.blocks, "pending", [self.percentile])
+            fees = self._from_history(history) or {"gasPrice": min(await async_w3.eth.gas_price, MAX_FEE_PER_GAS)}
+            self.cache.set("fees", fees)
+        return dict(fees)
+
+    def replacement_fees(self, w3, txn):
+        # At least REPLACEMENT_BUMP over the stuck tx (the node's replacement rule), or the current
+        # market rate if that has moved further. Returns None once the cap leaves no room to bump.
+        self.cache.clear()
+        current = self.fees(w3)
+        bumped = {}
+        for field in ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice"):
+            if field in txn:
+                bumped[field] = max(math.ceil(txn[field] * REPLACEMENT_BUMP), current.get(field, 0))
+        cap_field = "gasPrice" if "gasPrice" in bumped else "maxFeePerGas"
+        if bumped[cap_field] > MAX_FEE_PER_GAS:
+            return None
+        return bumped
+
+
+class GasLedger:
+    # Gas and fees actually paid, per contract function, with the number of deliveries each tx
+    # served so batched calls report a per-delivery cost.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, label, receipt, deliveries=1, replacements=0):
+        gas_used = receipt["gasUsed"]
+        fee = gas_used * receipt.get("effectiveGasPrice", 0)
+        with self._lock:
+            totals = self._totals.setdefault(label, {
+                "txs": 0, "reverted": 0, "replaced": 0, "deliveries": 0, "gas_used": 0, "fee_wei": 0,
+            })
+            totals["txs"] += 1
+            totals["reverted"] += receipt["status"] != 1
+            totals["replaced"] += replacements > 0
+            totals["deliveries"] += deliveries
+            totals["gas_used"] += gas_used
+            totals["fee_wei"] += fee
+
+    def stats(self):
+        with self._lock:
+            functions = {label: dict(totals) for label, totals in self._totals.items()}
+        for totals in functions.values():
+            deliveries = totals["deliveries"] or 1
+            totals["gas_per_tx"] = totals["gas_used"] // totals["txs"]
+            totals["gas_per_delivery"] = totals["gas_used"] // deliveries
+            totals["fee_gwei_per_delivery"] = round(totals["fee_wei"] / deliveries / 10**9, 3)
+        return functions
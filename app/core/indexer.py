@@ -0,0 +1,125 @@
+import os
+from app.database import SessionLocal
+from app import models
+from app.core.telemetry import delivery_span, get_logger
+
+INDEXED_EVENTS = (
+    "ShipRegistered", "SupplierRegistered",
+    "BunkerNominated", "BunkerFinalized", "QuantumSealAnchored", "QuantumSealBatchAnchored",
+)
+
+# Substrings providers use when an eth_getLogs range returns too much data.
+RANGE_ERRORS = ("more than", "too many", "limit", "range", "-32005", "response size", "timeout")
+
+log = get_logger(__name__)
+
+
+class EventIndexer:
+    def __init__(self, maritime_client, handlers, name="maritime_registry",
+                 start_block=None, confirmations=None, max_range=None):
+        self.client = maritime_client
+        self.handlers = handlers
+        self.name = name
+        self.start_block = int(start_block if start_block is not None else os.getenv("INDEXER_START_BLOCK", "0"))
+        self.confirmations = int(confirmations if confirmations is not None else os.getenv("INDEXER_CONFIRMATIONS", "2"))
+        self.max_range = int(max_range if max_range is not None else os.getenv("INDEXER_MAX_RANGE", "2000"))
+        self.batch_size = self.max_range
+
+        contract = maritime_client.contract
+        self._events = {}
+        for event_name in INDEXED_EVENTS:
+            # An ABI built from an older contract may not know every event yet.
+            if not any(e.get("type") == "event" and e.get("name") == event_name for e in contract.abi):
+                continue
+            event = getattr(contract.events, event_name)
+            self._events[event.topic] = event()
+
+    @property
+    def w3(self):
+        return self.client.w3
+
+    def load_checkpoint(self, db):
+        checkpoint = db.get(models.IndexerCheckpoint, self.name)
+        if checkpoint is None:
+            checkpoint = models.IndexerCheckpoint(name=self.name, last_block=self.start_block - 1)
+            db.add(checkpoint)
+            db.commit()
+        return checkpoint
+
+    def sync_once(self):
+        db = SessionLocal()
+        try:
+            checkpoint = self.load_checkpoint(db)
+            self._check_reorg(db, checkpoint)
+
+            safe_block = self.w3.eth.block_number - self.confirmations
+            handled = 0
+            while checkpoint.last_block < safe_block:
+                from_block = checkpoint.last_block + 1
+                to_block = min(from_block + self.batch_size - 1, safe_block)
+
+                logs = self.fetch_logs(from_block, to_block)
+                for entry in sorted(logs, key=lambda l: (l["blockNumber"], l["logIndex"])):
+                    self.dispatch(entry)
+                handled += len(logs)
+
+                checkpoint.last_block = to_block
+                checkpoint.last_block_hash = self.w3.eth.get_block(to_block)["hash"].hex()
+                db.commit()
+
+                if len(logs) > 0:
+                    log.info("Indexed blocks", from_block=from_block, to_block=to_block, events=len(logs))
+            return handled
+        finally:
+            db.close()
+
+    def _check_reorg(self, db, checkpoint):
+        if checkpoint.last_block_hash is None or checkpoint.last_block < 0:
+            return
+        current = self.w3.eth.get_block(checkpoint.last_block)["hash"].hex()
+        if current == checkpoint.last_block_hash:
+            return
+
+        # Reorg deeper than the confirmation depth: rewind and replay. Handlers are idempotent.
+        rewind_to = max(self.start_block - 1, checkpoint.last_block - 4 * max(self.confirmations, 1))
+        log.warning("Reorg detected; rewinding indexer", block=checkpoint.last_block, rewind_to=rewind_to)
+        checkpoint.last_block = rewind_to
+        checkpoint.last_block_hash = None
+        db.commit()
+
+    def fetch_logs(self, from_block, to_block):
+        try:
+            logs = self.w3.eth.get_logs({
+                "address": self.client.contract.address,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [list(self._events.keys())],
+            })
+        except Exception as e:
+            if from_block == to_block or not any(s in str(e).lower() for s in RANGE_ERRORS):
+                raise
+            # The node refused the range: halve it, and keep the smaller window for later batches.
+            mid = (from_block + to_block) // 2
+            self.batch_size = max(1, (to_block - from_block + 1) // 2)
+            return self.fetch_logs(from_block, mid) + self.fetch_logs(mid + 1, to_block)
+
+        if self.batch_size < self.max_range:
+            self.batch_size = min(self.max_range, self.batch_size + self.batch_size // 4 + 1)
+        return logs
+
+    def dispatch(self, entry):
+        topic = entry["topics"][0]
+        topic = "0x" + topic.hex().removeprefix("0x") if isinstance(topic, bytes) else topic
+        event = self._events.get(topic)
+        if event is None:
+            return
+        decoded = event.process_log(entry)
+        handler = self.handlers.get(decoded["event"])
+        if handler is None:
+            return
+        delivery_id = decoded["args"].get("deliveryId")
+        if delivery_id is None:
+            handler(decoded, self.client)
+            return
+        with delivery_span(f"event.{decoded['event']}", delivery_id, block=decoded["blockNumber"]):
+            handler(decoded, self.client)
@@ -0,0 +1,183 @@
+import asyncio
+import datetime
+import os
+import socket
+import time
+import uuid
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app.database import AsyncSessionLocal
+from app import models
+from app.core.telemetry import get_logger
+
+LEADER_LEASE_NAME = os.getenv("LEADER_LEASE_NAME", "maritime-leader")
+LEADER_LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "15"))
+LEADER_RENEW_INTERVAL = float(os.getenv("LEADER_RENEW_INTERVAL", "5"))
+# "auto": every process contends for the lease. "api": never lead (API-only replicas).
+WORKER_ROLE = os.getenv("WORKER_ROLE", "auto")
+
+log = get_logger(__name__)
+
+
+class NotLeader(Exception):
+    pass
+
+
+def _utcnow():
+    return datetime.datetime.utcnow()
+
+
+class LeaderElection:
+    # A lease row in the shared database decides which single process, across uvicorn workers and
+    # replicas, ingests chain events and signs with the admin key. The holder renews it every
+    # renew_interval; if it stops (crash, partition, shutdown) another process takes over once the
+    # lease expires. Every takeover bumps the fencing token.
+    #
+    # Locally the lease is trusted for ttl - renew_interval after the last successful renewal, so a
+    # stalled leader stops sending before anyone else can acquire it (lease times come from each
+    # host's clock, which is assumed to be NTP-synced).
+
+    def __init__(self, name=LEADER_LEASE_NAME, ttl=LEADER_LEASE_TTL, renew_interval=LEADER_RENEW_INTERVAL,
+                 eligible=WORKER_ROLE != "api"):
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.eligible = eligible
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.token = None
+        self._valid_until = 0.0
+        self._leading = False
+        self._task = None
+        self._on_elected = []
+        self._on_demoted = []
+
+    def on_elected(self, callback):
+        self._on_elected.append(callback)
+
+    def on_demoted(self, callback):
+        self._on_demoted.append(callback)
+
+    @property
+    def is_leader(self) -> bool:
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def check(self):
+        if not self.is_leader:
+            raise NotLeader(f"{self.holder} does not hold the {self.name} lease")
+
+    async def start(self):
+        if not self.eligible:
+            log.info("Not contending for leadership", holder=self.holder, role=WORKER_ROLE)
+            return
+        await self._step()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._leading:
+            await self._set_leading(False)
+        if self.token is not None:
+            await self._release()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            await self._step()
+
+    async def _step(self):
+        try:
+            await self._acquire_or_renew()
+        except Exception as e:
+            # Keep whatever validity is left; a leader that cannot reach the DB lapses on its own.
+            log.warning("Lease renewal failed", lease=self.name, error=str(e))
+        if self.is_leader != self._leading:
+            await self._set_leading(self.is_leader)
+
+    async def _acquire_or_renew(self):
+        started = time.monotonic()
+        now = _utcnow()
+        expires_at = now + datetime.timedelta(seconds=self.ttl)
+        async with AsyncSessionLocal() as db:
+            if self.token is not None:
+                renewed = await db.execute(
+                    update(models.Lease)
+                    .where(models.Lease.name == self.name, models.Lease.holder == self.holder,
+                           models.Lease.token == self.token)
+                    .values(expires_at=expires_at)
+                )
+                await db.commit()
+                if renewed.rowcount == 1:
+                    self._valid_until = started + self.ttl - self.renew_interval
+                    return
+                log.warning("Lease lost", lease=self.name, token=self.token)
+                self.token = None
+                self._valid_until = 0.0
+
+            taken = await db.execute(
+                update(models.Lease)
+                .where(models.Lease.name == self.name, or_(models.Lease.expires_at < now,
+                                                           models.Lease.holder == self.holder))
+                .values(holder=self.holder, token=models.Lease.token + 1, expires_at=expires_at)
+            )
+            if taken.rowcount == 0:
+                exists = await db.execute(select(models.Lease.name).where(models.Lease.name == self.name))
+                if exists.first() is not None:
+                    await db.rollback()
+                    return
+                db.add(models.Lease(name=self.name, holder=self.holder, token=1, expires_at=expires_at))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another process created the row first.
+                await db.rollback()
+                return
+            token = await db.execute(
+                select(models.Lease.token)
+                .where(models.Lease.name == self.name, models.Lease.holder == self.holder)
+            )
+            self.token = token.scalar()
+            if self.token is not None:
+                self._valid_until = started + self.ttl - self.renew_interval
+
+    async def _release(self):
+        # Expire the lease now so a standby takes over on its next attempt instead of after the TTL.
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(models.Lease)
+                    .where(models.Lease.name == self.name, models.Lease.holder == self.holder,
+                           models.Lease.token == self.token)
+                    .values(expires_at=datetime.datetime(1970, 1, 1))
+                )
+                await db.commit()
+        except Exception as e:
+            log.warning("Lease release failed", lease=self.name, error=str(e))
+        self.token = None
+        self._valid_until = 0.0
+
+    async def _set_leading(self, leading):
+        self._leading = leading
+        if leading:
+            log.info("Elected leader", lease=self.name, holder=self.holder, token=self.token)
+            callbacks = self._on_elected
+        else:
+            log.warning("Stepped down as leader", lease=self.name, holder=self.holder)
+            callbacks = self._on_demoted
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                log.error("Leadership callback failed", callback=getattr(callback, "__name__", callback), error=str(e))
+
+    def stats(self):
+        return {
+            "lease": self.name,
+            "holder": self.holder,
+            "role": WORKER_ROLE,
+            "is_leader": self.is_leader,
+            "token": self.token,
+            "valid_for_seconds": round(max(0.0, self._valid_until - time.monotonic()), 1) if self.token else 0.0,
+        }
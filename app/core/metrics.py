@@ -0,0 +1,185 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# full: metrics, spans and per-delivery logs. lite: metrics only (see app.core.telemetry).
+# off: metric updates become no-ops too.
+TELEMETRY_MODE = os.getenv("TELEMETRY_MODE", "full").lower()
+METRICS_ENABLED = TELEMETRY_MODE != "off"
+
+# Seconds; spans sub-millisecond RPC and DB calls up to multi-minute approval waits.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    # Hand-rolled Prometheus text exposition: one lock-guarded dict per metric keyed by label
+    # values, so an update costs a dict lookup and an add.
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _samples(self, label_values, value):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            lines.extend(self._samples(label_values, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self, label_values, value):
+        return [f"{self.name}{_labels(self.labelnames, label_values)} {_number(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def _samples(self, label_values, value):
+        return [f"{self.name}{_labels(self.labelnames, label_values)} {_number(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                # per-bucket counts (cumulated at render time), sum, count
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def _samples(self, label_values, state):
+        counts, total, count = state[0][:], state[1], state[2]
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, label_values, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, label_values)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, label_values)} {count}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+RPC_LATENCY = Histogram("maritime_rpc_request_seconds", "JSON-RPC round-trip time by method", ["method"])
+RPC_ERRORS = Counter("maritime_rpc_errors_total", "JSON-RPC calls that raised, by method", ["method"])
+RPC_FAILOVERS = Counter(
+    "maritime_rpc_endpoint_failures_total", "Requests moved off an RPC endpoint, by reason", ["endpoint", "reason"]
+)
+RPC_ENDPOINT_HEALTHY = Gauge("maritime_rpc_endpoint_healthy", "1 if the endpoint is routable and not lagging", ["endpoint"])
+RPC_COALESCED = Histogram(
+    "maritime_rpc_coalesced_requests", "Concurrent reads sent per coalesced JSON-RPC batch",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+TX_CONFIRMATION = Histogram(
+    "maritime_tx_confirmation_seconds", "First submission to mined receipt, by contract function", ["function"]
+)
+TX_REPLACEMENTS = Counter("maritime_tx_replacements_total", "Fee-bumped replacements sent", ["function"])
+DB_QUERY = Histogram("maritime_db_query_seconds", "SQL statement execution time by verb", ["operation"])
+PDF_RENDER = Histogram("maritime_pdf_render_seconds", "eBDN PDF rendering time")
+MLDSA_SIGN = Histogram("maritime_mldsa_sign_seconds", "ML-DSA signing time", ["scope"])
+APPROVAL_WAIT = Histogram("maritime_approval_wait_seconds", "Time spent waiting for Telegram approval", ["outcome"])
+EVENT_TO_SEAL = Histogram(
+    "maritime_event_to_seal_seconds", "BunkerFinalized indexed to quantum seal anchored", ["mode"]
+)
+STATUS_TRANSITIONS = Counter(
+    "maritime_status_transitions_total", "bunker_records status changes", ["from_status", "to_status"]
+)
+PENDING_TXS = Gauge("maritime_pending_transactions", "Submitted transactions without a receipt yet")
+ACTIVE_FINALIZATIONS = Gauge("maritime_active_finalization_jobs", "Finalization jobs running in this process")
+STREAM_SUBSCRIBERS = Gauge("maritime_stream_subscribers", "Connected status stream subscribers", ["transport"])
+STREAM_EVICTIONS = Counter(
+    "maritime_stream_evictions_total", "Status stream subscribers dropped for falling behind", ["transport"]
+)
+
+
+def record_transition(from_status, to_status, count=1):
+    if count:
+        STATUS_TRANSITIONS.inc(from_status or "NONE", to_status, amount=count)
+
+
+def instrument_engine(engine):
+    # Times every statement on a SQLAlchemy Engine (for AsyncEngine pass .sync_engine).
+    from sqlalchemy import event
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY.observe(time.perf_counter() - started, statement.split(None, 1)[0].upper())
+
+    def error(context):
+        stack = context.connection.info.get("query_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+    if METRICS_ENABLED:
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+        event.listen(engine, "handle_error", error)
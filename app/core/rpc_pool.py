@@ -0,0 +1,423 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from eth_utils import keccak
+from web3._utils.batching import sort_batch_response_by_response_ids
+from web3._utils.caching import async_handle_request_caching, handle_request_caching
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+from app.core.metrics import RPC_COALESCED, RPC_ENDPOINT_HEALTHY, RPC_FAILOVERS
+from app.core.telemetry import get_logger
+
+# Comma-separated JSON-RPC endpoints, added after the rpc_url MaritimeClient is given.
+RPC_URLS = os.getenv("RPC_URLS", "")
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))  # keep-alive connections per endpoint
+RPC_RATE_LIMIT = float(os.getenv("RPC_RATE_LIMIT", "0"))  # requests/s per endpoint, 0 = unlimited
+RPC_BURST = int(os.getenv("RPC_BURST", "20"))
+RPC_BACKOFF_BASE = float(os.getenv("RPC_BACKOFF_BASE", "0.5"))
+RPC_BACKOFF_MAX = float(os.getenv("RPC_BACKOFF_MAX", "30"))
+RPC_MAX_LAG_BLOCKS = int(os.getenv("RPC_MAX_LAG_BLOCKS", "3"))
+RPC_HEALTH_INTERVAL = float(os.getenv("RPC_HEALTH_INTERVAL", "5"))
+# Independent async reads issued within this window go out as one JSON-RPC batch (0 disables).
+RPC_COALESCE_WINDOW = float(os.getenv("RPC_COALESCE_WINDOW", "0.002"))
+RPC_COALESCE_MAX = int(os.getenv("RPC_COALESCE_MAX", "100"))
+
+COALESCE_METHODS = frozenset((
+    "eth_call", "eth_getBalance", "eth_getCode", "eth_getStorageAt", "eth_getTransactionReceipt",
+    "eth_getTransactionByHash", "eth_getBlockByNumber",
+))
+# JSON-RPC error codes providers use for throttling (plus HTTP 429).
+RATE_LIMIT_CODES = (-32005, -32029, 429)
+LATENCY_ALPHA = 0.2
+LAG_PENALTY = 5.0  # seconds added to a lagging endpoint's score
+
+log = get_logger(__name__)
+
+
+class EndpointError(Exception):
+    def __init__(self, reason, retry_after=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Endpoint:
+    def __init__(self, url, rate_limit=RPC_RATE_LIMIT, burst=RPC_BURST):
+        self.url = url
+        # Metric label and log field: host only, since hosted RPC URLs carry API keys in the path.
+        self.name = urlsplit(url).netloc or url
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self.latency = 0.05
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.head = None
+        self.lagging = False
+        self.requests = 0
+        self.failures = 0
+        self.session = requests.Session()
+        self.session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE))
+
+    def available(self, now) -> bool:
+        return now >= self.unhealthy_until
+
+    def wait_time(self, now) -> float:
+        # Seconds until the token bucket has a token for one more request.
+        if not self.rate_limit:
+            return 0.0
+        tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate_limit
+
+    def reserve(self, now) -> float:
+        # Takes a token (possibly one that only exists in the future) and returns the wait for it.
+        if not self.rate_limit:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit) - 1
+        self._refilled_at = now
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate_limit
+
+    def score(self, now) -> float:
+        # Expected seconds to an answer: smoothed latency, queueing behind in-flight calls, throttling.
+        return (self.latency * (1 + self.in_flight) + self.wait_time(now)
+                + (LAG_PENALTY if self.lagging else 0.0))
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "endpoint": self.name,
+            "healthy": self.available(now) and not self.lagging,
+            "latency_ms": round(self.latency * 1000, 1),
+            "in_flight": self.in_flight,
+            "head": self.head,
+            "lagging": self.lagging,
+            "backoff_seconds": round(max(0.0, self.unhealthy_until - now), 1),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class RpcPool:
+    # Shared endpoint state for the sync and async providers below. Each request goes to the endpoint
+    # with the lowest expected latency; transport errors, HTTP 429/5xx and throttling errors put the
+    # endpoint into exponential backoff and the request moves on to the next one. A background probe
+    # tracks each endpoint's head block so lagging nodes are only used as a last resort.
+
+    def __init__(self, urls, health_interval=RPC_HEALTH_INTERVAL):
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    @classmethod
+    def from_env(cls, rpc_urls=()):
+        urls = [rpc_urls] if isinstance(rpc_urls, str) else [u for u in rpc_urls or () if u]
+        urls += [u.strip() for u in RPC_URLS.split(",") if u.strip() and u.strip() not in urls]
+        return cls(urls)
+
+    def start(self):
+        # Head tracking only matters when there is another endpoint to route to.
+        if len(self.endpoints) > 1 and self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._run_health, name="rpc-health", daemon=True)
+            self._health_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def candidates(self):
+        # Healthy endpoints by score, then the ones in backoff, soonest to recover first.
+        now = time.monotonic()
+        with self._lock:
+            ready = sorted((e for e in self.endpoints if e.available(now)), key=lambda e: e.score(now))
+            waiting = sorted((e for e in self.endpoints if not e.available(now)), key=lambda e: e.unhealthy_until)
+        return ready + waiting
+
+    def begin(self, endpoint) -> float:
+        with self._lock:
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint.reserve(time.monotonic())
+
+    def succeeded(self, endpoint, started):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.latency += LATENCY_ALPHA * (elapsed - endpoint.latency)
+            endpoint.consecutive_failures = 0
+            endpoint.unhealthy_until = 0.0
+
+    def failed(self, endpoint, error):
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            backoff = min(RPC_BACKOFF_MAX, RPC_BACKOFF_BASE * 2 ** (endpoint.consecutive_failures - 1))
+            backoff = max(backoff * random.uniform(0.8, 1.2), error.retry_after or 0.0)
+            endpoint.unhealthy_until = time.monotonic() + backoff
+        RPC_FAILOVERS.inc(endpoint.name, error.reason)
+        log.warning("RPC endpoint failed", endpoint=endpoint.name, reason=error.reason,
+                    backoff=round(backoff, 2), consecutive=endpoint.consecutive_failures)
+
+    def _run_health(self):
+        while not self._stop.wait(self.health_interval):
+            self.probe()
+
+    def probe(self):
+        payload = json.dumps({"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []})
+        for endpoint in self.endpoints:
+            started = time.monotonic()
+            self.begin(endpoint)
+            try:
+                response = _check(post(endpoint, payload.encode(), timeout=min(RPC_TIMEOUT, 5)))
+                result = response["result"]
+                head = result if isinstance(result, int) else int(result, 16)
+            except EndpointError as e:
+                self.failed(endpoint, e)
+                continue
+            except (KeyError, TypeError, ValueError):
+                self.failed(endpoint, EndpointError("bad_response"))
+                continue
+            self.succeeded(endpoint, started)
+            endpoint.head = head
+        heads = [e.head for e in self.endpoints if e.head is not None and e.available(time.monotonic())]
+        best = max(heads, default=None)
+        with self._lock:
+            for endpoint in self.endpoints:
+                lagging = best is not None and endpoint.head is not None and best - endpoint.head > RPC_MAX_LAG_BLOCKS
+                if lagging and not endpoint.lagging:
+                    log.warning("RPC endpoint lagging", endpoint=endpoint.name, head=endpoint.head, best=best)
+                endpoint.lagging = lagging
+
+    def update_gauges(self):
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            RPC_ENDPOINT_HEALTHY.set(int(endpoint.available(now) and not endpoint.lagging), endpoint.name)
+
+    def stats(self):
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+
+def post(endpoint, data, timeout=RPC_TIMEOUT):
+    try:
+        response = endpoint.session.post(
+            endpoint.url, data=data, timeout=timeout, headers={"Content-Type": "application/json"}
+        )
+    except requests.Timeout:
+        raise EndpointError("timeout")
+    except requests.RequestException:
+        raise EndpointError("connection")
+    if response.status_code == 429:
+        raise EndpointError("rate_limited", _retry_after(response.headers))
+    if response.status_code >= 400:
+        raise EndpointError(f"http_{response.status_code}")
+    return response.content
+
+
+async def post_async(session, endpoint, data, timeout=RPC_TIMEOUT):
+    try:
+        async with session.post(endpoint.url, data=data, timeout=aiohttp.ClientTimeout(total=timeout),
+                                headers={"Content-Type": "application/json"}) as response:
+            if response.status == 429:
+                raise EndpointError("rate_limited", _retry_after(response.headers))
+            if response.status >= 400:
+                raise EndpointError(f"http_{response.status}")
+            return await response.read()
+    except asyncio.TimeoutError:
+        raise EndpointError("timeout")
+    except aiohttp.ClientError:
+        raise EndpointError("connection")
+
+
+def _retry_after(headers):
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _check(raw):
+    # Decodes a response body and raises EndpointError for anything another endpoint should retry.
+    try:
+        response = json.loads(raw)
+    except ValueError:
+        raise EndpointError("bad_response")
+    for item in response if isinstance(response, list) else [response]:
+        error = item.get("error") if isinstance(item, dict) else None
+        if isinstance(error, dict) and (error.get("code") in RATE_LIMIT_CODES
+                                        or "rate limit" in str(error.get("message", "")).lower()):
+            raise EndpointError("rate_limited")
+    return response
+
+
+def _already_known(method, params, response):
+    # A raw transaction resent to a second endpoint after a timeout may already be in its pool; the
+    # send succeeded, so answer with the transaction hash.
+    error = response.get("error") if isinstance(response, dict) else None
+    if method != "eth_sendRawTransaction" or not isinstance(error, dict):
+        return response
+    message = str(error.get("message", "")).lower()
+    if "already known" in message or "known transaction" in message:
+        raw = params[0]
+        raw = bytes.fromhex(raw.removeprefix("0x")) if isinstance(raw, str) else bytes(raw)
+        return {"jsonrpc": "2.0", "id": response.get("id"), "result": "0x" + keccak(raw).hex()}
+    return response
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    def __init__(self, pool, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def __str__(self):
+        return f"RPC pool {', '.join(e.name for e in self.pool.endpoints)}"
+
+    def _send(self, data):
+        last_error = None
+        for endpoint in self.pool.candidates():
+            delay = self.pool.begin(endpoint)
+            if delay:
+                time.sleep(delay)
+            started = time.monotonic()
+            try:
+                response = _check(post(endpoint, data))
+            except EndpointError as e:
+                self.pool.failed(endpoint, e)
+                last_error = e
+                continue
+            self.pool.succeeded(endpoint, started)
+            return response
+        raise ConnectionError(f"All RPC endpoints failed (last: {last_error.reason})")
+
+    @handle_request_caching
+    def make_request(self, method, params):
+        return _already_known(method, params, self._send(self.encode_rpc_request(method, params)))
+
+    def make_batch_request(self, batch_requests):
+        response = self._send(self.encode_batch_rpc_request(batch_requests))
+        if not isinstance(response, list):
+            return response
+        return sort_batch_response_by_response_ids(response)
+
+
+class AsyncPooledHTTPProvider(AsyncJSONBaseProvider):
+    # Also coalesces concurrent reads: calls in COALESCE_METHODS wait up to RPC_COALESCE_WINDOW
+    # for company and are sent together as one batch on one keep-alive connection.
+
+    def __init__(self, pool, coalesce_window=RPC_COALESCE_WINDOW, coalesce_max=RPC_COALESCE_MAX, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+        self.coalesce_window = coalesce_window
+        self.coalesce_max = coalesce_max
+        self._sessions = {}
+        self._queue = []
+        self._flush_handle = None
+        self._flushes = set()
+
+    def __str__(self):
+        return f"Async RPC pool {', '.join(e.name for e in self.pool.endpoints)}"
+
+    def _session(self, endpoint):
+        # aiohttp sessions are bound to the loop that created them; web3's default one also closes
+        # the connection after every request, so each endpoint gets a keep-alive session per loop.
+        loop = asyncio.get_running_loop()
+        key = (endpoint.url, id(loop))
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = self._sessions[key] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=RPC_POOL_SIZE, keepalive_timeout=30)
+            )
+        return session
+
+    async def _send(self, data):
+        last_error = None
+        for endpoint in self.pool.candidates():
+            delay = self.pool.begin(endpoint)
+            if delay:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                response = _check(await post_async(self._session(endpoint), endpoint, data))
+            except EndpointError as e:
+                self.pool.failed(endpoint, e)
+                last_error = e
+                continue
+            self.pool.succeeded(endpoint, started)
+            return response
+        raise ConnectionError(f"All RPC endpoints failed (last: {last_error.reason})")
+
+    @async_handle_request_caching
+    async def make_request(self, method, params):
+        if self.coalesce_window and method in COALESCE_METHODS:
+            return await self._coalesced(method, params)
+        return _already_known(method, params, await self._send(self.encode_rpc_request(method, params)))
+
+    async def make_batch_request(self, batch_requests):
+        response = await self._send(self.encode_batch_rpc_request(batch_requests))
+        if not isinstance(response, list):
+            return response
+        return sort_batch_response_by_response_ids(response)
+
+    async def _coalesced(self, method, params):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((self.form_request(method, params), future))
+        if len(self._queue) >= self.coalesce_max:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.coalesce_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        queued, self._queue = self._queue, []
+        if queued:
+            task = asyncio.ensure_future(self._send_coalesced(queued))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _send_coalesced(self, queued):
+        RPC_COALESCED.observe(len(queued))
+        try:
+            if len(queued) == 1:
+                request, future = queued[0]
+                responses = [await self._send(self.encode_rpc_dict(request))]
+            else:
+                responses = await self._send(self.encode_batch_request_dicts([r for r, _ in queued]))
+                if not isinstance(responses, list):
+                    # The node refused the batch as a whole; fall back to one request each.
+                    responses = await asyncio.gather(
+                        *(self._send(self.encode_rpc_dict(r)) for r, _ in queued)
+                    )
+        except Exception as e:
+            for _, future in queued:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_id = {response.get("id"): response for response in responses if isinstance(response, dict)}
+        for request, future in queued:
+            if future.done():
+                continue
+            response = by_id.get(request["id"])
+            if response is None:
+                future.set_exception(ConnectionError(f"No response for JSON-RPC id {request['id']}"))
+            else:
+                future.set_result(response)
+
+    async def disconnect(self):
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            await session.close()
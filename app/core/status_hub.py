@@ -0,0 +1,232 @@
+import asyncio
+import datetime
+import os
+import threading
+from collections import OrderedDict
+from sqlalchemy import and_, or_, select
+from app.database import AsyncSessionLocal
+from app import models
+from app.core.metrics import STREAM_EVICTIONS, STREAM_SUBSCRIBERS
+from app.core.telemetry import get_logger
+
+# Undelivered events per subscriber before it is evicted. Keep it above SEAL_BATCH_SIZE: a whole
+# seal batch turns QUANTUM_SEALED in one go.
+STREAM_BUFFER = int(os.getenv("STREAM_BUFFER", "1024"))
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "10000"))  # per worker
+# Transitions made by other workers reach this one's subscribers through a bunker_records.updated_at
+# poll while anyone is subscribed. 0 disables it (single worker).
+STREAM_RELAY_INTERVAL = float(os.getenv("STREAM_RELAY_INTERVAL", "1"))
+RELAY_OVERLAP = datetime.timedelta(seconds=2)  # re-read window for rows committed after a later poll
+RELAY_PAGE_SIZE = 1000
+LAST_STATUS_SIZE = 50000
+
+EVICTED = object()
+
+log = get_logger(__name__)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscriber:
+    def __init__(self, delivery_id=None, imo_number=None, supplier_id=None, statuses=(), transport="sse"):
+        self.delivery_id = delivery_id
+        self.imo_number = imo_number
+        self.supplier_id = supplier_id
+        self.statuses = frozenset(statuses)
+        self.transport = transport
+        self.queue = asyncio.Queue(maxsize=STREAM_BUFFER)
+        self.evicted = False
+
+    def matches(self, event) -> bool:
+        return ((self.delivery_id is None or event["delivery_id"] == self.delivery_id)
+                and (self.imo_number is None or event["imo_number"] == self.imo_number)
+                and (self.supplier_id is None or event["supplier_id"] == self.supplier_id)
+                and (not self.statuses or event["status"] in self.statuses))
+
+    async def next(self, timeout=STREAM_HEARTBEAT):
+        # The next event, EVICTED, or None when nothing arrived within timeout (time for a heartbeat).
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class StatusHub:
+    # In-process fan-out of bunker_records status transitions to SSE/WebSocket subscribers. Writers
+    # (endpoints, the event watcher thread, background jobs) call publish() after committing. Idle
+    # subscribers cost a queue each; delivery is indexed by delivery id, ship and supplier so an
+    # event only touches the subscribers that can match it. A subscriber whose buffer fills up is
+    # evicted instead of holding events for everyone else.
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = set()
+        self._index = {"delivery_id": {}, "imo_number": {}, "supplier_id": {}, None: set()}
+        # Last published status per delivery: drops repeats, e.g. the relay re-reading our own writes.
+        self._last_status = OrderedDict()
+        self._lock = threading.Lock()
+        self._relay_task = None
+        self.published = 0
+        self.evicted = 0
+
+    def bind(self, loop):
+        self._loop = loop
+
+    def _index_key(self, subscriber):
+        for field in ("delivery_id", "imo_number", "supplier_id"):
+            value = getattr(subscriber, field)
+            if value is not None:
+                return field, value
+        return None, None
+
+    def subscribe(self, transport="sse", **filters) -> Subscriber:
+        if len(self._subscribers) >= STREAM_MAX_SUBSCRIBERS:
+            raise TooManySubscribers(f"{STREAM_MAX_SUBSCRIBERS} stream subscribers already connected")
+        self._loop = self._loop or asyncio.get_running_loop()
+        subscriber = Subscriber(transport=transport, **filters)
+        self._subscribers.add(subscriber)
+        field, value = self._index_key(subscriber)
+        if field is None:
+            self._index[None].add(subscriber)
+        else:
+            self._index[field].setdefault(value, set()).add(subscriber)
+        if STREAM_RELAY_INTERVAL and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        field, value = self._index_key(subscriber)
+        if field is None:
+            self._index[None].discard(subscriber)
+        else:
+            bucket = self._index[field].get(value)
+            if bucket is not None:
+                bucket.discard(subscriber)
+                if not bucket:
+                    del self._index[field][value]
+
+    def publish(self, delivery_id, status, imo_number=None, supplier_id=None, **fields):
+        # Safe from any thread; a no-op until something has subscribed.
+        with self._lock:
+            previous = self._last_status.get(delivery_id)
+            if previous == status:
+                return
+            self._last_status[delivery_id] = status
+            self._last_status.move_to_end(delivery_id)
+            if len(self._last_status) > LAST_STATUS_SIZE:
+                self._last_status.popitem(last=False)
+        if self._loop is None or not self._subscribers:
+            return
+        event = {
+            "delivery_id": delivery_id,
+            "status": status,
+            "previous": previous,
+            "imo_number": imo_number,
+            "supplier_id": supplier_id,
+            "at": datetime.datetime.utcnow().isoformat(),
+            **fields,
+        }
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fan_out(event)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, event)
+
+    def publish_many(self, rows, status, **fields):
+        # rows: (delivery_id, imo_number, supplier_id), e.g. from UPDATE ... RETURNING.
+        for delivery_id, imo_number, supplier_id in rows:
+            self.publish(delivery_id, status, imo_number=imo_number, supplier_id=supplier_id, **fields)
+
+    def _fan_out(self, event):
+        self.published += 1
+        targets = set(self._index[None])
+        for field in ("delivery_id", "imo_number", "supplier_id"):
+            targets.update(self._index[field].get(event[field], ()))
+        for subscriber in targets:
+            if subscriber.evicted or not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber):
+        # Drop the backlog and leave only the eviction notice; the stream handler closes the stream.
+        subscriber.evicted = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(EVICTED)
+        self.unsubscribe(subscriber)
+        self.evicted += 1
+        STREAM_EVICTIONS.inc(subscriber.transport)
+        log.warning("Evicted slow stream subscriber", transport=subscriber.transport, buffer=STREAM_BUFFER)
+
+    async def _relay(self):
+        since = datetime.datetime.utcnow()
+        try:
+            while self._subscribers:
+                await asyncio.sleep(STREAM_RELAY_INTERVAL)
+                try:
+                    since = await self._relay_once(since)
+                except Exception as e:
+                    log.warning("Status relay poll failed", error=str(e))
+        finally:
+            self._relay_task = None
+
+    async def _relay_once(self, since):
+        # Keyset pages on (updated_at, id): a batch update stamps many rows with the same time.
+        Record = models.BunkerRecord
+        after_at, after_id = since - RELAY_OVERLAP, -1
+        newest = since
+        async with AsyncSessionLocal() as db:
+            while True:
+                rows = (await db.execute(
+                    select(Record.id, Record.delivery_id, Record.status, Record.imo_number, Record.supplier_id,
+                           Record.updated_at)
+                    .where(or_(Record.updated_at > after_at,
+                               and_(Record.updated_at == after_at, Record.id > after_id)))
+                    .order_by(Record.updated_at, Record.id)
+                    .limit(RELAY_PAGE_SIZE)
+                )).all()
+                for row in rows:
+                    self.publish(row.delivery_id, row.status, imo_number=row.imo_number, supplier_id=row.supplier_id)
+                if rows:
+                    after_at, after_id = rows[-1].updated_at, rows[-1].id
+                    newest = max(newest, after_at)
+                if len(rows) < RELAY_PAGE_SIZE:
+                    return newest
+
+    def update_gauges(self):
+        counts = {"sse": 0, "websocket": 0}
+        for subscriber in self._subscribers:
+            counts[subscriber.transport] = counts.get(subscriber.transport, 0) + 1
+        for transport, count in counts.items():
+            STREAM_SUBSCRIBERS.set(count, transport)
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "evicted": self.evicted,
+            "relay": self._relay_task is not None,
+        }
+
+
+_hub = StatusHub()
+
+
+def get_status_hub() -> StatusHub:
+    return _hub
+
+
+def publish_status(delivery_id, status, imo_number=None, supplier_id=None, **fields):
+    _hub.publish(delivery_id, status, imo_number=imo_number, supplier_id=supplier_id, **fields)
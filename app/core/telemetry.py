@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import nullcontext
+from app.core.metrics import TELEMETRY_MODE
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+# In lite mode spans are skipped and per-delivery log lines (log.detail) are dropped before any
+# formatting, leaving only the metric updates on hot paths.
+LITE = TELEMETRY_MODE in ("lite", "off")
+
+# Everything under app.* goes through one handler; uvicorn keeps its own loggers.
+ROOT_LOGGER = "app"
+_LOGGING_KWARGS = ("exc_info", "stack_info", "stacklevel", "extra")
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Link, NonRecordingSpan, SpanContext, TraceFlags
+    _tracer = trace.get_tracer("maritime")
+except Exception:  # tracing is optional; without opentelemetry-api spans are no-ops
+    trace = None
+
+
+def _trace_ids():
+    if trace is None:
+        return None
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid:
+        return None
+    return format(context.trace_id, "032x"), format(context.span_id, "016x")
+
+
+class JsonFormatter(logging.Formatter):
+    converter = time.gmtime
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        ids = _trace_ids()
+        if ids is not None:
+            entry["trace_id"], entry["span_id"] = ids
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        line = f"{line} {fields}" if fields else line
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    # log.info("Seal anchored", delivery_id=..., tx_hash=...): keyword arguments become fields.
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _LOGGING_KWARGS}
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+    def detail(self, msg, **fields):
+        # Per-delivery progress lines on hot paths; free in lite mode.
+        if not LITE and self.logger.isEnabledFor(logging.INFO):
+            self.log(logging.INFO, msg, **fields)
+
+
+_configured = False
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+    root = logging.getLogger(ROOT_LOGGER)
+    root.addHandler(handler)
+    root.setLevel(level)
+    root.propagate = False
+
+
+def get_logger(name):
+    configure_logging()
+    return StructuredLogger(logging.getLogger(name), {})
+
+
+def configure_tracing():
+    # Exports spans when the OpenTelemetry SDK and OTLP exporter are installed and an endpoint is
+    # configured; otherwise a provider set up by opentelemetry-instrument (or none) is used as is.
+    if trace is None or LITE or not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except Exception as e:
+        get_logger(__name__).warning("OTLP endpoint set but the OpenTelemetry SDK is missing", error=str(e))
+        return False
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "maritime")}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+def _delivery_bytes(delivery_id):
+    return bytes.fromhex(delivery_id.removeprefix("0x")) if isinstance(delivery_id, str) else bytes(delivery_id)
+
+
+def delivery_context(delivery_id):
+    # Every stage of a delivery (nomination request, approval, finalize tx, event, seal, anchor)
+    # runs in a different request, task or process. Deriving the trace id from the delivery id
+    # puts all of their spans in one trace without passing any context between them.
+    raw = _delivery_bytes(delivery_id)
+    return SpanContext(
+        trace_id=int.from_bytes(raw[:16], "big") or 1,
+        span_id=int.from_bytes(raw[16:24], "big") or 1,
+        is_remote=True,
+        trace_flags=TraceFlags(TraceFlags.SAMPLED),
+    )
+
+
+def delivery_span(name, delivery_id, **attributes):
+    if trace is None or LITE:
+        return nullcontext()
+    parent = trace.set_span_in_context(NonRecordingSpan(delivery_context(delivery_id)))
+    attributes["delivery.id"] = _delivery_bytes(delivery_id).hex()
+    return _tracer.start_as_current_span(name, context=parent, attributes=attributes)
+
+
+def batch_span(name, delivery_ids, **attributes):
+    # One span for work that covers many deliveries, linked into each delivery's trace.
+    if trace is None or LITE:
+        return nullcontext()
+    links = [Link(delivery_context(d)) for d in delivery_ids]
+    attributes["deliveries"] = len(links)
+    return _tracer.start_as_current_span(name, links=links, attributes=attributes)
+
+
+def tracing_active():
+    return trace is not None and not LITE
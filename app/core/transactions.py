@@ -0,0 +1,287 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import Future
+from web3.exceptions import TransactionNotFound
+from app.core.fees import TX_MAX_REPLACEMENTS, TX_REPLACE_AFTER_BLOCKS
+from app.core.metrics import TX_CONFIRMATION, TX_REPLACEMENTS
+from app.core.telemetry import get_logger
+
+log = get_logger(__name__)
+
+
+class TransactionDropped(Exception):
+    # The tx and every replacement of it left the mempool unmined; its nonce is free again.
+    def __init__(self, tx_hash, nonce):
+        super().__init__(f"Transaction {tx_hash.hex()} (nonce {nonce}) was dropped from the mempool")
+        self.tx_hash = tx_hash
+        self.nonce = nonce
+
+
+class TransactionReverted(Exception):
+    def __init__(self, tx_hash, label="Transaction"):
+        super().__init__(f"{label} {tx_hash.hex() if isinstance(tx_hash, bytes) else tx_hash} reverted")
+        self.tx_hash = tx_hash
+
+
+class NonceManager:
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        # Handed out but not yet sent or given up on; the node's pending count does not see them.
+        self._outstanding = set()
+        self._resync_pending = False
+
+    def allocate(self) -> int:
+        # Every allocated nonce has to be settled with settle() once its send succeeded or failed.
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            self._outstanding.add(nonce)
+            return nonce
+
+    async def allocate_async(self, async_w3) -> int:
+        if self._next_nonce is None:
+            seed = await async_w3.eth.get_transaction_count(self.address, "pending")
+            with self._lock:
+                if self._next_nonce is None:
+                    self._next_nonce = seed
+        return self.allocate()
+
+    def settle(self, nonce, sent):
+        # A nonce that never reached the mempool leaves a gap, so the counter is resynced.
+        with self._lock:
+            self._outstanding.discard(nonce)
+            if not sent:
+                self._resync_pending = True
+            self._apply_resync()
+
+    @contextmanager
+    def reserve(self):
+        nonce = self.allocate()
+        try:
+            yield nonce
+        except BaseException:
+            self.settle(nonce, sent=False)
+            raise
+        self.settle(nonce, sent=True)
+
+    @asynccontextmanager
+    async def reserve_async(self, async_w3):
+        nonce = await self.allocate_async(async_w3)
+        try:
+            yield nonce
+        except BaseException:
+            self.settle(nonce, sent=False)
+            raise
+        self.settle(nonce, sent=True)
+
+    def resync(self):
+        # Drop the local view; the next allocate() starts again from the node's pending count,
+        # which fills any gap left by a tx that never reached the mempool. That count misses
+        # nonces still on their way to the node, so while any are outstanding the reset waits
+        # for the last of them to settle.
+        with self._lock:
+            self._resync_pending = True
+            self._apply_resync()
+
+    def _apply_resync(self):
+        if self._resync_pending and not self._outstanding:
+            self._resync_pending = False
+            self._next_nonce = None
+
+    def confirmed_nonce(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, "latest")
+
+
+class PendingTx:
+    def __init__(self, tx_hash, sender, nonce, txn=None, sign=None, label=None, deliveries=1):
+        self.tx_hash = tx_hash
+        self.sender = sender
+        self.nonce = nonce
+        self.submitted_at = time.time()
+        self.first_submitted_at = self.submitted_at  # submitted_at restarts on each replacement
+        self.future = Future()
+        # For the replacement watchdog: the unsigned tx and a callable that signs a copy of it.
+        self.txn = txn
+        self.sign = sign
+        self.hashes = [tx_hash]  # original first, then each replacement; any of them may be mined
+        self.submitted_block = None
+        self.replacements = 0
+        # For the gas ledger.
+        self.label = label
+        self.deliveries = deliveries
+
+
+class ReceiptTracker:
+    def __init__(self, w3, poll_interval=1.0, drop_after=120, fee_oracle=None, ledger=None,
+                 replace_after_blocks=TX_REPLACE_AFTER_BLOCKS, max_replacements=TX_MAX_REPLACEMENTS):
+        self.w3 = w3
+        self.fee_oracle = fee_oracle
+        self.ledger = ledger
+        self.replace_after_blocks = replace_after_blocks
+        self.max_replacements = max_replacements
+        self.poll_interval = poll_interval
+        self.drop_after = drop_after
+        self._pending = {}
+        # Settled futures of replaced txs, by original hash: the hash callers hold is never mined,
+        # so a late wait() must still find the replacement's receipt here.
+        self._replaced = OrderedDict()
+        self._nonce_managers = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._last_block = None
+        self._tracked_since_poll = False
+
+    def track(self, tx_hash, sender, nonce, nonce_manager=None, txn=None, sign=None, label=None,
+              deliveries=1) -> Future:
+        pending = PendingTx(tx_hash, sender, nonce, txn, sign, label, deliveries)
+        with self._lock:
+            self._pending[bytes(tx_hash)] = pending
+            self._tracked_since_poll = True
+            if nonce_manager is not None:
+                self._nonce_managers[sender] = nonce_manager
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return pending.future
+
+    def future(self, tx_hash):
+        with self._lock:
+            pending = self._pending.get(bytes(tx_hash)) or self._replaced.get(bytes(tx_hash))
+        return pending.future if pending is not None else None
+
+    def wait(self, tx_hash, timeout=120):
+        future = self.future(tx_hash)
+        if future is None:
+            return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+        return future.result(timeout=timeout)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                log.warning("Receipt tracker poll failed", error=str(e))
+
+    def poll(self):
+        block_number = self.w3.eth.block_number
+        with self._lock:
+            pending = list(self._pending.values())
+            fresh = self._tracked_since_poll
+            self._tracked_since_poll = False
+
+        # Receipts only change when a block lands, so a single pass per block resolves
+        # every tx that was mined in it.
+        if block_number == self._last_block and not fresh and all(
+            time.time() - p.submitted_at < self.drop_after for p in pending
+        ):
+            return
+        self._last_block = block_number
+
+        resync = set()
+        for p in pending:
+            receipt = self._receipt(p)
+            if receipt is not None:
+                self._resolve(p, receipt=receipt)
+                continue
+
+            if p.submitted_block is None:
+                p.submitted_block = block_number
+            elif self._is_stuck(p, block_number):
+                self._replace(p, block_number)
+                continue
+
+            if time.time() - p.submitted_at >= self.drop_after and self._is_dropped(p):
+                resync.add(p.sender)
+                self._resolve(p, error=TransactionDropped(p.tx_hash, p.nonce))
+
+        for sender in resync:
+            manager = self._nonce_managers.get(sender)
+            if manager is not None:
+                manager.resync()
+
+    def _receipt(self, p):
+        # Newest first: once replaced, the latest hash is the one most likely to be mined.
+        for tx_hash in reversed(p.hashes):
+            try:
+                return self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _is_stuck(self, p, block_number) -> bool:
+        return (
+            p.sign is not None and self.fee_oracle is not None
+            and p.replacements < self.max_replacements
+            and block_number - p.submitted_block >= self.replace_after_blocks
+        )
+
+    def _replace(self, p, block_number):
+        # Same nonce, same call, higher fees: whichever version is mined resolves p.future.
+        p.submitted_block = block_number
+        fees = self.fee_oracle.replacement_fees(self.w3, p.txn)
+        if fees is None:
+            p.replacements = self.max_replacements
+            log.warning("Stuck transaction already at the fee cap; not bumping", tx_hash=p.tx_hash.hex())
+            return
+        txn = {**p.txn, **fees}
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(p.sign(txn))
+        except Exception as e:
+            # Usually "nonce too low": an earlier version was mined and the next poll finds it.
+            log.info("Replacement not sent", tx_hash=p.tx_hash.hex(), nonce=p.nonce, error=str(e))
+            return
+        p.txn = txn
+        p.hashes.append(tx_hash)
+        p.replacements += 1
+        p.submitted_at = time.time()
+        TX_REPLACEMENTS.inc(p.label or "unknown")
+        log.warning(
+            "Replaced stuck transaction", tx_hash=p.tx_hash.hex(), nonce=p.nonce,
+            replacement=tx_hash.hex(), fees=fees
+        )
+
+    def _is_dropped(self, p) -> bool:
+        for tx_hash in p.hashes:
+            try:
+                self.w3.eth.get_transaction(tx_hash)
+                return False
+            except TransactionNotFound:
+                continue
+        return True
+
+    def _resolve(self, p, receipt=None, error=None):
+        with self._lock:
+            self._pending.pop(bytes(p.tx_hash), None)
+            if p.replacements:
+                self._replaced[bytes(p.tx_hash)] = p
+                while len(self._replaced) > 1024:
+                    self._replaced.popitem(last=False)
+        if error is not None:
+            p.future.set_exception(error)
+            return
+        if self.ledger is not None and p.label is not None:
+            try:
+                self.ledger.record(p.label, receipt, p.deliveries, p.replacements)
+            except Exception as e:
+                log.warning("Gas ledger update failed", tx_hash=p.tx_hash.hex(), error=str(e))
+        TX_CONFIRMATION.observe(time.time() - p.first_submitted_at, p.label or "unknown")
+        p.future.set_result(receipt)
@@ -1,24 +1,107 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
+from app.core.metrics import instrument_engine
 
-if not os.path.exists('data'):
-    os.makedirs('data')
+# SQLite (default, single host) or PostgreSQL, e.g. postgresql://maritime:secret@db:5432/maritime
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/maritime.db")
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/maritime.db"
+# SQLite tuning
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# PostgreSQL pool sizing (per engine; the app runs one sync and one async engine per process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+def _sync_url(url):
+    url = make_url(url)
+    if url.drivername in ("postgresql", "postgres"):
+        return url.set(drivername="postgresql+psycopg")
+    return url
+
+
+def _async_url(url):
+    url = make_url(os.getenv("ASYNC_DATABASE_URL", url))
+    if url.drivername == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.drivername in ("postgresql", "postgres"):
+        return url.set(drivername="postgresql+psycopg")
+    return url
+
+
+SQLALCHEMY_DATABASE_URL = _sync_url(DATABASE_URL)
+ASYNC_SQLALCHEMY_DATABASE_URL = _async_url(DATABASE_URL)
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.get_backend_name() == "sqlite"
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets the API, the event watcher and the sealing pipeline read while one of them writes;
+    # busy_timeout makes a second writer wait for the lock instead of failing with "database is locked".
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _engine_options():
+    if IS_SQLITE:
+        return {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **_engine_options())
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
+def ensure_database_dir():
+    # Called by run_migrations() rather than on import, so importing the app touches no files.
+    if IS_SQLITE and SQLALCHEMY_DATABASE_URL.database:
+        os.makedirs(os.path.dirname(os.path.abspath(SQLALCHEMY_DATABASE_URL.database)), exist_ok=True)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,69 +3,153 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from dotenv import load_dotenv
 
-from app.database import engine, Base
-from app.core.blockchain import MaritimeClient
+# Before the app imports: several modules read their settings at import time.
+load_dotenv()
+
+from app.database import engine
+from app.migrations import run_migrations
 from app.api.endpoints import router
-from app.core.events import log_loop
- 
+from app.api.deliveries import router as deliveries_router
+from app.core.boot import BootChecks, ReadinessGate
+from app.core.leader import LeaderElection
+from app.core.status_hub import get_status_hub
+from app.services.zk_prover import shutdown_prover
+from app.core.telemetry import configure_tracing, get_logger
+
 import asyncio
 
-load_dotenv()
+# "1": serve liveness/readiness probes right away and boot in the background (see /readyz).
+# "0": finish booting before serving, and exit if any boot step fails.
+FAST_BOOT = os.getenv("FAST_BOOT", "1") == "1"
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    ship_imo = "IMO9876543"
-    supplier_id = 5500
-    
-    print("Initializing Database...")
-    Base.metadata.create_all(bind=engine)
-
-    print("Connecting to Blockchain...")
-    app.state.maritime_client = MaritimeClient(
+SHIP_IMO = "IMO9876543"
+SUPPLIER_ID = 5500
+
+log = get_logger("app.main")
+boot = BootChecks()
+
+
+def connect_client():
+    # web3 (and eth_account underneath it) is the slowest import in the app; it loads here, on
+    # a worker thread, while the event loop already answers probes.
+    from app.core.blockchain import MaritimeClient
+    return MaritimeClient(
         rpc_url=os.getenv("RPC_URL"),
         contract_address=os.getenv("CONTRACT_ADDRESS"),
         private_key=os.getenv("ADMIN_PRIVATE_KEY")
     )
-    
-    client = app.state.maritime_client
-    event_filter = client.contract.events.BunkerFinalized.create_filter(from_block='latest')
-    bg_task = asyncio.create_task(log_loop(event_filter, 2, client))
-    
-    print(" Quantum Event Listener is running in the background.")
-    
-    yield
 
-    print("Stopping Background Tasks...")
-    bg_task.cancel()
-    try:
-        await bg_task
-    except asyncio.CancelledError:
-        print(" Event Listener stopped successfully.")
-
-    print("Booting Maritime Service...")
-    client = app.state.maritime_client
-    
-    if not client.is_ship_registered(ship_imo):
-        print(f" Setup: Registering ship {ship_imo}...")
-        client.register_ship(ship_imo, os.getenv("CHIEF_ADDRESS"))
+
+def register_defaults(client):
+    client.prefetch_registry(imos=[SHIP_IMO], supplier_ids=[SUPPLIER_ID])
+
+    if not client.is_ship_registered(SHIP_IMO):
+        log.info("Setup: registering ship", imo=SHIP_IMO)
+        client.register_ship(SHIP_IMO, os.getenv("CHIEF_ADDRESS"))
     else:
-        print(f"Ship {ship_imo} already registered.")
-        
-    if not client.is_supplier_registered(supplier_id):
-        print(f"Setup: Registering supplier {supplier_id}...")
-        client.register_supplier(supplier_id, os.getenv("BARGE_ADDRESS"))
+        log.info("Ship already registered", imo=SHIP_IMO)
+
+    if not client.is_supplier_registered(SUPPLIER_ID):
+        log.info("Setup: registering supplier", supplier_id=SUPPLIER_ID)
+        client.register_supplier(SUPPLIER_ID, os.getenv("BARGE_ADDRESS"))
+    else:
+        log.info("Supplier already registered", supplier_id=SUPPLIER_ID)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_tracing()
+    # Status transitions are published from the event watcher thread onto this loop.
+    get_status_hub().bind(asyncio.get_running_loop())
+    app.state.boot = boot
+
+    async def migrate():
+        log.info("Initializing database")
+        await asyncio.to_thread(run_migrations, engine)
+
+    async def connect():
+        log.info("Connecting to blockchain")
+        app.state.maritime_client = await asyncio.to_thread(connect_client)
+
+    async def check_contract():
+        missing = await asyncio.to_thread(app.state.maritime_client.check_deployment)
+        if missing:
+            log.warning("Deployed contract lacks functions in the ABI", functions=missing)
+
+    async def start_services():
+        from app.core.events import log_loop, EVENT_HANDLERS
+        from app.core.indexer import EventIndexer
+        from app.services.finalization import FinalizationJobRunner
+        from app.services.quantum_vault import ensure_master_key
+        from app.services.sealing import SealingPipeline
+
+        # Sealing with a new key would break verification of every earlier seal.
+        await asyncio.to_thread(ensure_master_key)
+        client = app.state.maritime_client
+        indexer = EventIndexer(client, EVENT_HANDLERS)
+        app.state.sealing = SealingPipeline(client)
+        app.state.finalization_jobs = FinalizationJobRunner(client)
+
+        # Every worker serves the API; only the lease holder runs the event watcher, the sealing
+        # pipeline, Telegram polling and finalization jobs, and signs with the admin key.
+        leader = LeaderElection()
+        client.leadership = leader
+        watcher = {}
+
+        async def start_leader_duties():
+            try:
+                await asyncio.to_thread(register_defaults, client)
+            except Exception as e:
+                log.error("Setup registration failed", error=str(e))
+            watcher["task"] = asyncio.create_task(log_loop(indexer, 2))
+            log.info("Event listener running in the background")
+            await app.state.sealing.start()
+            await client.telegram.start()
+            resumed = await app.state.finalization_jobs.activate()
+            if resumed:
+                log.info("Resumed finalization jobs", jobs=resumed)
+
+        async def stop_leader_duties():
+            await app.state.finalization_jobs.stop()
+            await app.state.sealing.stop()
+            await client.telegram.stop()
+            task = watcher.pop("task", None)
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    log.info("Event listener stopped")
+
+        leader.on_elected(start_leader_duties)
+        leader.on_demoted(stop_leader_duties)
+        app.state.leader = leader
+        await leader.start()
+
+    log.info("Booting Maritime Service", fast_boot=FAST_BOOT)
+    steps = [("database", migrate), ("rpc", connect), ("contract", check_contract), ("services", start_services)]
+    if FAST_BOOT:
+        boot.start(steps)
     else:
-        print(f"Supplier {supplier_id} already registered.")
-    
-    print("System Ready & Lifespan Active.")
-    
-    
+        await boot.run(steps, retry=False)
+
     yield
-    print(" Shutting down Maritime Service...")
+
+    log.info("Shutting down Maritime Service")
+    await boot.stop()
+    if hasattr(app.state, "leader"):
+        await app.state.leader.stop()
+    await asyncio.to_thread(shutdown_prover)
+    client = getattr(app.state, "maritime_client", None)
+    if client is not None:
+        client.rpc_pool.stop()
+        await client.async_w3.provider.disconnect()
 
 app = FastAPI(
     title="Maritime Quantum Seal Service",
     lifespan=lifespan
 )
 
-app.include_router(router)
\ No newline at end of file
+app.add_middleware(ReadinessGate, boot=boot)
+app.include_router(router)
+app.include_router(deliveries_router)
@@ -0,0 +1,213 @@
+import datetime
+from sqlalchemy import (
+    Column, DateTime, Float, Index, Integer, LargeBinary, MetaData, String, Table, Text, inspect, select, text,
+)
+from app.database import engine as default_engine, ensure_database_dir
+from app.core.telemetry import get_logger
+
+# Applied versions are recorded here; each migration runs in its own transaction together with
+# its version row, so a crash mid-upgrade resumes from the first unapplied step.
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary constant key for pg_advisory_xact_lock, so replicas booting together upgrade once.
+PG_MIGRATION_LOCK_ID = 0x6D617269
+
+log = get_logger(__name__)
+
+# Migrations spell out their own tables, columns and indexes instead of reading app.models, so a
+# later model change cannot alter what an already-shipped migration does. Change the model, then
+# append a migration that brings existing databases to it.
+_schema = MetaData()
+
+# bunker_records as the service created it before migrations existed.
+_bunker_records = Table(
+    "bunker_records", _schema,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("delivery_id", String, unique=True, index=True),
+    Column("imo_number", String),
+    Column("supplier_id", Integer),
+    Column("status", String),
+    Column("sulphur_content", Float),
+    Column("density", Float),
+    Column("actual_qty", Float),
+    Column("sample_id", String),
+    Column("sig_supplier", LargeBinary),
+    Column("sig_chief", LargeBinary),
+    Column("pdf_blob", LargeBinary),
+    Column("pdf_hash", String),
+    Column("quantum_signature", LargeBinary),
+    Column("anchor_tx_hash", String),
+    Column("created_at", DateTime),
+)
+
+_indexer_checkpoints = Table(
+    "indexer_checkpoints", _schema,
+    Column("name", String, primary_key=True),
+    Column("last_block", Integer, nullable=False),
+    Column("last_block_hash", String),
+    Column("updated_at", DateTime),
+)
+
+_seal_jobs = Table(
+    "seal_jobs", _schema,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("delivery_id", String, unique=True, index=True),
+    Column("stage", String, index=True),
+    Column("attempts", Integer),
+    Column("next_attempt_at", DateTime),
+    Column("last_error", String),
+    Column("anchor_tx_hash", String),
+    Column("batch_root", String, index=True),
+    Column("enqueued_at", DateTime),
+    Column("sealed_at", DateTime),
+    Column("anchored_at", DateTime),
+)
+
+_seal_batches = Table(
+    "seal_batches", _schema,
+    Column("root", String, primary_key=True),
+    Column("leaf_count", Integer, nullable=False),
+    Column("quantum_signature", LargeBinary, nullable=False),
+    Column("status", String, index=True),
+    Column("anchor_tx_hash", String),
+    Column("attempts", Integer),
+    Column("next_attempt_at", DateTime),
+    Column("last_error", String),
+    Column("created_at", DateTime),
+    Column("anchored_at", DateTime),
+)
+
+# Columns later migrations add to existing tables, by table and name.
+_added_columns = {
+    "bunker_records": {column.name: column for column in (
+        Column("job_id", String), Column("job_error", String), Column("finalize_tx_hash", String),
+        Column("seal_batch_root", String), Column("merkle_proof", Text), Column("finalized_at", DateTime),
+        Column("updated_at", DateTime),
+    )},
+}
+
+_leases_table = Table(
+    "leases", _schema,
+    Column("name", String, primary_key=True),
+    Column("holder", String, nullable=False),
+    Column("token", Integer, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Column("updated_at", DateTime),
+)
+
+
+def _columns(conn, table_name):
+    return {c["name"] for c in inspect(conn).get_columns(table_name)}
+
+
+def add_column(conn, table_name, column_name):
+    # Adds a column exactly as declared in _added_columns. Unique/indexed columns get their index
+    # from a separate create_index(), since SQLite cannot add constraints with ALTER TABLE.
+    if column_name in _columns(conn, table_name):
+        return
+    column = _added_columns[table_name][column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}'))
+
+
+def create_index(conn, table_name, name, *columns, unique=False):
+    # Built against the live table, so it only depends on the columns it names.
+    table = Table(table_name, MetaData(), *(Column(c) for c in columns))
+    Index(name, *(table.c[c] for c in columns), unique=unique).create(conn, checkfirst=True)
+
+
+def _baseline(conn):
+    # Databases created by the old create_all() boot already have some of these tables.
+    _schema.create_all(
+        conn, checkfirst=True,
+        tables=[_bunker_records, _indexer_checkpoints, _seal_jobs, _seal_batches],
+    )
+
+
+def _bunker_record_job_and_seal_columns(conn):
+    for column_name in ("job_id", "job_error", "finalize_tx_hash", "seal_batch_root", "merkle_proof",
+                        "finalized_at"):
+        add_column(conn, "bunker_records", column_name)
+
+
+def _query_indexes(conn):
+    create_index(conn, "bunker_records", "ix_bunker_records_job_id", "job_id", unique=True)
+    create_index(conn, "bunker_records", "ix_bunker_records_seal_batch_root", "seal_batch_root")
+    create_index(conn, "bunker_records", "ix_bunker_records_status_created", "status", "created_at")
+    create_index(conn, "bunker_records", "ix_bunker_records_imo_status", "imo_number", "status", "created_at")
+    create_index(conn, "bunker_records", "ix_bunker_records_supplier_status", "supplier_id", "status", "created_at")
+    create_index(conn, "seal_jobs", "ix_seal_jobs_stage_due", "stage", "next_attempt_at")
+    create_index(conn, "seal_batches", "ix_seal_batches_status_due", "status", "next_attempt_at")
+
+
+def _leases(conn):
+    _leases_table.create(conn, checkfirst=True)
+
+
+def _updated_at_index(conn):
+    # Databases from before migrations have no updated_at yet; migration 6 adds it and the index.
+    if "updated_at" in _columns(conn, "bunker_records"):
+        create_index(conn, "bunker_records", "ix_bunker_records_updated", "updated_at", "id")
+
+
+def _bunker_record_updated_at(conn):
+    # Migration 2 left out updated_at, which the model has always had, so databases created before
+    # migrations never got it. Existing rows count as last changed when created.
+    if "updated_at" not in _columns(conn, "bunker_records"):
+        add_column(conn, "bunker_records", "updated_at")
+        conn.execute(text("UPDATE bunker_records SET updated_at = created_at WHERE updated_at IS NULL"))
+    create_index(conn, "bunker_records", "ix_bunker_records_updated", "updated_at", "id")
+
+
+# Append only. Never edit or reorder a migration that has shipped.
+MIGRATIONS = [
+    (1, "baseline tables", _baseline),
+    (2, "bunker_records job, batch seal and finalized_at columns", _bunker_record_job_and_seal_columns),
+    (3, "status/ship/supplier and work-queue indexes", _query_indexes),
+    (4, "leader election leases", _leases),
+    (5, "bunker_records updated_at index", _updated_at_index),
+    (6, "bunker_records updated_at column", _bunker_record_updated_at),
+]
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine=default_engine):
+    ensure_database_dir()
+    # Usual boot: everything is applied already, so skip the per-migration write locks.
+    with engine.connect() as conn:
+        if (inspect(conn).has_table("schema_migrations")
+                and applied_versions(conn) >= {version for version, _, _ in MIGRATIONS}):
+            return []
+
+    applied = []
+    for version, name, upgrade in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": PG_MIGRATION_LOCK_ID})
+            elif conn.dialect.name == "sqlite":
+                # Workers sharing the file: take the write lock before reading the applied versions.
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if version in applied_versions(conn):
+                continue
+            upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.datetime.utcnow()
+            ))
+            applied.append(version)
+            log.info("Applied migration", version=version, name=name)
+    return applied
+
+
+def current_version(engine=default_engine):
+    with engine.begin() as conn:
+        return max(applied_versions(conn), default=0)
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, LargeBinary, DateTime
 from app.database import Base
 import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary
+from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, Text, Index
+from sqlalchemy.orm import deferred
 from app.database import Base
 
 class BunkerRecord(Base):
@@ -12,22 +13,110 @@ class BunkerRecord(Base):
     imo_number = Column(String)
     supplier_id = Column(Integer)
     
-    # Statuses: PENDING, NOMINATED, FINALIZING, FINALIZED, QUANTUM_SEALED
+    # Statuses: PENDING, NOMINATED, FINALIZING, AWAITING_APPROVAL, APPROVED, SUBMITTED,
+    #           FINALIZED, QUANTUM_SEALED, FAILED
     status = Column(String, default="PENDING")
+
+    # Finalization job (driven in the background by app.services.finalization)
+    job_id = Column(String, unique=True, index=True, nullable=True)
+    job_error = Column(String, nullable=True)
+    finalize_tx_hash = Column(String, nullable=True)
     
     sulphur_content = Column(Float)
     density = Column(Float, nullable=True)
     actual_qty = Column(Float, nullable=True)
     sample_id = Column(String, nullable=True)
+    finalized_at = Column(DateTime, nullable=True)  # On-chain block time of BunkerFinalized
 
     # Traditional Signatures (from Event)
     sig_supplier = Column(LargeBinary, nullable=True)
     sig_chief = Column(LargeBinary, nullable=True)
 
     # Quantum Seal Data
-    pdf_blob = Column(LargeBinary, nullable=True)      
+    # PDFs live in the content-addressed blob store under pdf_hash; pdf_blob only holds legacy
+    # inline copies and is deferred so ordinary queries never load it.
+    pdf_blob = deferred(Column(LargeBinary, nullable=True))
     pdf_hash = Column(String, nullable=True)           
     quantum_signature = Column(LargeBinary, nullable=True) 
     anchor_tx_hash = Column(String, nullable=True)     
+
+    # Batch anchoring: the Merkle root this eBDN was sealed under and its inclusion proof (JSON)
+    seal_batch_root = Column(String, nullable=True, index=True)
+    merkle_proof = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    # Deliveries are listed per status, per ship and per supplier, newest first.
+    __table_args__ = (
+        Index("ix_bunker_records_status_created", "status", "created_at"),
+        Index("ix_bunker_records_imo_status", "imo_number", "status", "created_at"),
+        Index("ix_bunker_records_supplier_status", "supplier_id", "status", "created_at"),
+        # Status stream relay: rows changed since the last poll.
+        Index("ix_bunker_records_updated", "updated_at", "id"),
+    )
+
+class IndexerCheckpoint(Base):
+    __tablename__ = "indexer_checkpoints"
+
+    name = Column(String, primary_key=True)
+    last_block = Column(Integer, nullable=False)
+    last_block_hash = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class SealJob(Base):
+    __tablename__ = "seal_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    delivery_id = Column(String, unique=True, index=True)  # Idempotency key
+
+    # Stages: PENDING_SEAL, SEALING, PENDING_ANCHOR, ANCHORING, DONE, FAILED
+    stage = Column(String, default="PENDING_SEAL", index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    anchor_tx_hash = Column(String, nullable=True)
+    batch_root = Column(String, nullable=True, index=True)
+
+    enqueued_at = Column(DateTime, default=datetime.datetime.utcnow)
+    sealed_at = Column(DateTime, nullable=True)
+    anchored_at = Column(DateTime, nullable=True)
+
+    # The sealing pipeline claims due jobs with "stage = ? AND next_attempt_at <= now".
+    __table_args__ = (
+        Index("ix_seal_jobs_stage_due", "stage", "next_attempt_at"),
+    )
+
+
+class SealBatch(Base):
+    __tablename__ = "seal_batches"
+
+    root = Column(String, primary_key=True)  # SHA3-256 Merkle root, hex
+    leaf_count = Column(Integer, nullable=False)
+    quantum_signature = Column(LargeBinary, nullable=False)  # ML-DSA signature over the root
+
+    # Statuses: SIGNED, ANCHORED, FAILED
+    status = Column(String, default="SIGNED", index=True)
+    anchor_tx_hash = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    anchored_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_seal_batches_status_due", "status", "next_attempt_at"),
+    )
+
+
+class Lease(Base):
+    __tablename__ = "leases"
+
+    # One row per singleton role; see app.core.leader.
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    token = Column(Integer, nullable=False)  # Fencing token, bumped on every change of holder
+    expires_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
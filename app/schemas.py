@@ -1,14 +1,32 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 class NominationCreate(BaseModel):
     delivery_id: str
     imo_number: str
     supplier_id: int
     expected_sulphur: float
-    
+
+
+class NominationBatch(BaseModel):
+    nominations: List[NominationCreate] = Field(..., min_length=1, max_length=1000)
+
     
 class FinalizeDelivery(BaseModel):
     delivery_id: str
     actual_qty: float
     density: float
-    sample_id: str
\ No newline at end of file
+    sample_id: str
+
+
+class VerifyBatch(BaseModel):
+    delivery_ids: Optional[List[str]] = Field(None, max_length=100000)  # text ids or keccak hex
+    statuses: List[str] = ["QUANTUM_SEALED"]  # used when delivery_ids is not given
+    limit: Optional[int] = Field(None, ge=1)
+    check_chain: bool = True
+
+
+class SulphurProofRequest(BaseModel):
+    sulphur_content: int = Field(..., ge=0)  # same scale as the threshold, e.g. % m/m x 100
+    threshold: int = Field(..., ge=0)
+    salt: Optional[str] = None  # decimal or 0x hex field element; random when omitted
@@ -0,0 +1,110 @@
+import abc
+import hashlib
+import os
+import tempfile
+
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "./data/blobs")
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobIntegrityError(Exception):
+    pass
+
+
+class BlobStore(abc.ABC):
+    # Blobs are addressed by the SHA3-512 hex digest of their content (BunkerRecord.pdf_hash).
+
+    @abc.abstractmethod
+    def put(self, digest: str, data: bytes):
+        pass
+
+    @abc.abstractmethod
+    def open(self, digest: str):
+        pass
+
+    @abc.abstractmethod
+    def exists(self, digest: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def delete(self, digest: str):
+        pass
+
+    def local_path(self, digest: str):
+        # Backends that keep blobs on local disk return a path so they can be served with sendfile.
+        return None
+
+    def get(self, digest: str, verify=True) -> bytes:
+        with self.open(digest) as f:
+            data = f.read()
+        if verify and hashlib.sha3_512(data).hexdigest() != digest:
+            raise BlobIntegrityError(f"Blob {digest[:16]}... does not match its hash")
+        return data
+
+    def verify(self, digest: str) -> bool:
+        with self.open(digest) as f:
+            return hashlib.file_digest(f, "sha3_512").hexdigest() == digest
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root=BLOB_STORE_DIR):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, digest):
+        digest = digest.lower().removeprefix("0x")
+        if len(digest) != 128 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Not a SHA3-512 hex digest: {digest[:16]}...")
+        # Two levels of 256-way sharding keep directories small at millions of blobs.
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, digest, data):
+        path = self._path(digest)
+        if os.path.exists(path):
+            return path
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file in the same directory and rename, so readers never see a partial blob.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return path
+
+    def open(self, digest):
+        return open(self._path(digest), "rb")
+
+    def exists(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def delete(self, digest):
+        try:
+            os.unlink(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, digest):
+        return self._path(digest)
+
+
+BACKENDS = {
+    "local": LocalBlobStore,
+}
+
+_store = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = BACKENDS[BLOB_STORE_BACKEND]()
+    return _store
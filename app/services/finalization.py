@@ -0,0 +1,231 @@
+import asyncio
+import datetime
+import os
+import time
+import aiohttp
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from app.database import AsyncSessionLocal
+from app import models
+from app.core.leader import NotLeader
+from app.core.metrics import APPROVAL_WAIT, record_transition
+from app.core.status_hub import publish_status
+from app.core.telemetry import delivery_span, get_logger
+
+# Record statuses owned by a finalization job, in the order a job moves through them.
+JOB_STATES = ("FINALIZING", "AWAITING_APPROVAL", "APPROVED", "SUBMITTED")
+
+# MaritimeRegistry.BunkerStatus.Finalized
+NOTE_FINALIZED = 2
+
+APPROVAL_TIMEOUT = int(os.getenv("APPROVAL_TIMEOUT", "600"))
+RECEIPT_TIMEOUT = int(os.getenv("RECEIPT_TIMEOUT", "300"))
+# How often the leader looks for jobs queued by other workers.
+JOB_SCAN_INTERVAL = float(os.getenv("JOB_SCAN_INTERVAL", "2"))
+# Cap on the backoff between retries of a step that hit a transient error.
+JOB_RETRY_MAX_BACKOFF = float(os.getenv("JOB_RETRY_MAX_BACKOFF", "60"))
+# RPC endpoints, Telegram or the database briefly unreachable (the RPC pool raises ConnectionError
+# once every endpoint failed): the step is retried and the job keeps its state. Anything else
+# fails the job.
+TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError, aiohttp.ClientError, OperationalError)
+
+log = get_logger(__name__)
+
+
+class FinalizationJobRunner:
+    # Jobs submit with the admin key, so they only run in the leader process (see app.core.leader).
+    # Any worker may queue one by moving a record to FINALIZING; the leader picks it up right away
+    # if it queued it itself, otherwise on its next scan.
+
+    def __init__(self, maritime_client):
+        self.client = maritime_client
+        self._tasks = {}
+        self._active = False
+        self._scan_task = None
+
+    async def activate(self):
+        self._active = True
+        resumed = await self.resume()
+        self._scan_task = asyncio.create_task(self._scan())
+        return resumed
+
+    async def _scan(self):
+        while True:
+            await asyncio.sleep(JOB_SCAN_INTERVAL)
+            try:
+                await self.resume()
+            except Exception as e:
+                log.warning("Finalization job scan failed", error=str(e))
+
+    def start(self, record_id):
+        if not self._active:
+            return
+        task = self._tasks.get(record_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._run(record_id))
+        self._tasks[record_id] = task
+        task.add_done_callback(lambda t: self._tasks.pop(record_id, None))
+
+    async def resume(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.BunkerRecord.id, models.BunkerRecord.delivery_id)
+                .where(models.BunkerRecord.status.in_(JOB_STATES))
+            )
+            rows = [row for row in result.all() if row[0] not in self._tasks]
+        record_ids = [record_id for record_id, _ in rows]
+        if rows:
+            # Warm the note cache for every resumed job with one batched RPC round-trip.
+            try:
+                await self.client.prefetch_notes([bytes.fromhex(d.removeprefix("0x")) for _, d in rows])
+            except Exception as e:
+                log.warning("Note prefetch failed", error=str(e))
+        for record_id in record_ids:
+            self.start(record_id)
+        return len(record_ids)
+
+    async def stop(self):
+        self._active = False
+        if self._scan_task is not None:
+            self._scan_task.cancel()
+            await asyncio.gather(self._scan_task, return_exceptions=True)
+            self._scan_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def active_jobs(self) -> int:
+        return len(self._tasks)
+
+    async def _run(self, record_id):
+        failures = 0
+        while True:
+            record = None
+            try:
+                async with AsyncSessionLocal() as db:
+                    record = await db.get(models.BunkerRecord, record_id)
+                if record is None or record.status not in JOB_STATES:
+                    return
+
+                handler = getattr(self, f"_on_{record.status.lower()}")
+                with delivery_span(f"finalization.{record.status.lower()}", record.delivery_id, job_id=record.job_id):
+                    await handler(record)
+                failures = 0
+            except asyncio.CancelledError:
+                self._cancel_approval(record)
+                raise
+            except NotLeader as e:
+                # Demoted mid-step; the new leader resumes the job from its current state.
+                log.info("Finalization job handed over", record_id=record_id, error=str(e))
+                self._cancel_approval(record)
+                return
+            except TRANSIENT_ERRORS as e:
+                failures += 1
+                delay = min(2 ** failures, JOB_RETRY_MAX_BACKOFF)
+                log.warning(
+                    "Finalization job error; retrying", record_id=record_id,
+                    status=record.status if record is not None else None, retry_in=delay, error=str(e)
+                )
+                await asyncio.sleep(delay)
+            except Exception as e:
+                log.error(
+                    "Finalization job failed", delivery_id=record.delivery_id, status=record.status, error=str(e)
+                )
+                self._cancel_approval(record)
+                await self._transition(record, "FAILED", job_error=str(e))
+
+    def _cancel_approval(self, record):
+        # The approval request registered a Telegram waiter; one left behind would keep counting as
+        # pending and make a bare "SIGN" reply ambiguous.
+        if record is not None and record.status in ("FINALIZING", "AWAITING_APPROVAL"):
+            self.client.cancel_finalization_approval(self._delivery_id(record))
+
+    async def _transition(self, record, status, **fields):
+        # Compare-and-set on the current status so a job never overwrites a newer state,
+        # e.g. FINALIZED / QUANTUM_SEALED written by the event watcher.
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(models.BunkerRecord)
+                .where(models.BunkerRecord.id == record.id, models.BunkerRecord.status == record.status)
+                .values(status=status, **fields)
+            )
+            await db.commit()
+        record_transition(record.status, status, result.rowcount)
+        if result.rowcount:
+            publish_status(record.delivery_id, status, record.imo_number, record.supplier_id)
+
+    def _delivery_id(self, record):
+        return bytes.fromhex(record.delivery_id.removeprefix("0x"))
+
+    async def _on_finalizing(self, record):
+        await self.client.request_finalization_approval(
+            self._delivery_id(record), int(record.density), int(record.actual_qty), record.sample_id
+        )
+        await self._transition(record, "AWAITING_APPROVAL")
+
+    async def _on_awaiting_approval(self, record):
+        started = time.perf_counter()
+        # The record entered AWAITING_APPROVAL right after the request went out; a job resumed
+        # after a restart still accepts a reply sent since then.
+        requested_at = None
+        if record.updated_at is not None:
+            requested_at = record.updated_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+        approved = await self.client.await_finalization_approval(
+            self._delivery_id(record), timeout=APPROVAL_TIMEOUT, requested_at=requested_at
+        )
+        APPROVAL_WAIT.observe(time.perf_counter() - started, "approved" if approved else "timeout")
+        if not approved:
+            await self._transition(record, "FAILED", job_error="Telegram approval timed out.")
+            return
+        await self._transition(record, "APPROVED")
+
+    async def _on_approved(self, record):
+        delivery_id = self._delivery_id(record)
+
+        # A restart between submission and bookkeeping may already have finalized the note.
+        if await self.client.get_note_status(delivery_id, minimum=NOTE_FINALIZED) >= NOTE_FINALIZED:
+            await self._transition(record, "FINALIZED")
+            return
+
+        tx_hash = await self.client.submit_finalization(
+            delivery_id,
+            int(record.density),
+            int(record.actual_qty),
+            record.sample_id,
+            supplier_key=os.getenv("BARGE_PRIVATE_KEY"),
+            chief_key=os.getenv("CHIEF_PRIVATE_KEY"),
+        )
+        await self._transition(record, "SUBMITTED", finalize_tx_hash=tx_hash.hex())
+
+    async def _on_submitted(self, record):
+        # Imported here so the API (which reads JOB_STATES) does not load web3 at import time.
+        from web3.exceptions import TimeExhausted
+        from app.core.transactions import TransactionDropped
+
+        delivery_id = self._delivery_id(record)
+        try:
+            receipt = await self.client.wait_for_receipt_async(
+                bytes.fromhex(record.finalize_tx_hash.removeprefix("0x")), timeout=RECEIPT_TIMEOUT
+            )
+        except (TimeExhausted, asyncio.TimeoutError, TransactionDropped):
+            receipt = None
+
+        if receipt is None:
+            # Dropped or stuck: trust the chain, and resubmit if the note was never finalized.
+            if await self.client.get_note_status(delivery_id, minimum=NOTE_FINALIZED) >= NOTE_FINALIZED:
+                await self._transition(record, "FINALIZED")
+            else:
+                await self._transition(record, "APPROVED", finalize_tx_hash=None)
+            return
+
+        if receipt.status != 1:
+            await self._transition(record, "FAILED", job_error="Finalization transaction reverted.")
+            return
+
+        # Records the mined hash, which differs from the submitted one after a fee replacement.
+        await self._transition(record, "FINALIZED", finalize_tx_hash=receipt.transactionHash.hex())
+        await self.client.notify_telegram_success(
+            delivery_id.hex(), receipt.transactionHash.hex(), int(record.actual_qty)
+        )
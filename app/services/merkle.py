@@ -0,0 +1,59 @@
+import hashlib
+
+# Domain-separated SHA3-256 tree: leaves and inner nodes can never be confused for each other.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def _hex_bytes(value):
+    return bytes.fromhex(value.removeprefix("0x")) if isinstance(value, str) else bytes(value)
+
+
+def leaf_hash(delivery_id, pdf_hash) -> bytes:
+    return hashlib.sha3_256(LEAF_PREFIX + _hex_bytes(delivery_id) + _hex_bytes(pdf_hash)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha3_256(NODE_PREFIX + left + right).digest()
+
+
+def build_tree(leaves):
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            # An odd node is carried up unchanged rather than paired with itself.
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+
+def merkle_root(levels) -> bytes:
+    return levels[-1][0]
+
+
+def merkle_proof(levels, index):
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"position": "left" if sibling < index else "right", "hash": level[sibling].hex()})
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof, root) -> bool:
+    node = leaf
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        node = node_hash(sibling, node) if step["position"] == "left" else node_hash(node, sibling)
+    return node == _hex_bytes(root)
+
+
+def verify_ebdn(pdf_bytes, delivery_id, pdf_hash, proof, root) -> bool:
+    if hashlib.sha3_512(pdf_bytes).hexdigest() != pdf_hash.removeprefix("0x"):
+        return False
+    return verify_proof(leaf_hash(delivery_id, pdf_hash), proof, root)
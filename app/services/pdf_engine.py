@@ -1,34 +1,183 @@
-from fpdf import FPDF
-import datetime
+import codecs
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# The eBDN is a single A4 page using only the standard Helvetica/Courier fonts, so the whole
+# document except the variable text can be laid out once and reused. Layout matches the original
+# FPDF receipt: 10 mm margins, 10 mm cells, 1 mm cell padding.
+PAGE_W_MM, PAGE_H_MM = 210, 297
+MARGIN_MM = 10
+CELL_PAD_MM = 1
+K = 72 / 25.4  # points per mm
+
+TITLE = "ELECTRONIC BUNKER DELIVERY NOTE (eBDN)"
+TITLE_SIZE = 16
+# Advance widths (1/1000 em) from the Adobe Helvetica-Bold AFM, for the characters of TITLE.
+HELVETICA_BOLD_WIDTHS = {
+    " ": 278, "(": 333, ")": 333, "B": 722, "C": 722, "D": 722, "E": 667, "I": 278, "K": 722,
+    "L": 611, "N": 722, "O": 778, "R": 722, "T": 611, "U": 722, "V": 667, "Y": 667, "e": 556,
+}
+TITLE_WIDTH_MM = sum(HELVETICA_BOLD_WIDTHS[c] for c in TITLE) * TITLE_SIZE / 1000 / K  # for centring
+SIG_HEX_CHARS = 130  # 65-byte ECDSA signature
+COURIER_CHAR_MM = 0.6 * 8 / K
+SIG_CHARS_PER_LINE = int((PAGE_W_MM - 2 * MARGIN_MM - 2 * CELL_PAD_MM) / COURIER_CHAR_MM)
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold", "F3": "Courier"}
+
+
+def _spell_codepoints(error):
+    return "".join(f"<U+{ord(c):04X}>" for c in error.object[error.start:error.end]), error.end
+
+
+# The standard fonts are set up with WinAnsiEncoding, i.e. CP1252 (Latin-1 plus the euro sign,
+# curly quotes, dashes, ...). Characters outside it are spelled out as <U+20BD> instead of being
+# replaced with "?", so the sealed document never silently differs from the record.
+codecs.register_error("ebdn_codepoint", _spell_codepoints)
+
+
+def _escape(text):
+    text = str(text).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("cp1252", "ebdn_codepoint")
+
+
+def _text_op(font, size, x_mm, baseline_mm, text):
+    return b"BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n" % (
+        font.encode(), size, x_mm * K, (PAGE_H_MM - baseline_mm) * K, _escape(text)
+    )
+
+
+class EbdnTemplate:
+    def __init__(self):
+        self.ops = []  # (font, size, x_mm, baseline_mm, static text | field name, is_field)
+        y = MARGIN_MM
+
+        def cell(font, size, text, height=10, field=False, x=MARGIN_MM + CELL_PAD_MM):
+            nonlocal y
+            baseline = y + 0.5 * height + 0.3 * size / K
+            self.ops.append((font, size, x, baseline, text, field))
+            y += height
+
+        content_w = PAGE_W_MM - 2 * MARGIN_MM
+        cell("F2", TITLE_SIZE, TITLE, x=MARGIN_MM + (content_w - TITLE_WIDTH_MM) / 2)
+        y += 10
+        cell("F1", 12, "delivery_id_line", field=True)
+        cell("F1", 12, "imo_line", field=True)
+        cell("F1", 12, "date_line", field=True)
+        y += 5
+        cell("F2", 12, "Bunker Specifications:")
+        for name in ("qty_line", "density_line", "sulphur_line", "sample_line"):
+            cell("F1", 12, name, field=True)
+        y += 10
+        cell("F2", 10, "Blockchain Proofs (ECDSA):")
+
+        # Signatures are wrapped at a fixed width (Courier is monospaced), so every slot is a line.
+        self.sig_top = {}
+        for name in ("sig_supplier", "sig_chief"):
+            self.sig_top[name] = y
+            y += 5 * (1 + -(-SIG_HEX_CHARS // SIG_CHARS_PER_LINE))
+            y += 2
+
+        self.header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self.static_objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources << /Font << %s >> >> "
+            b"/Contents 4 0 R >>" % (
+                PAGE_W_MM * K, PAGE_H_MM * K,
+                b" ".join(b"/%s %d 0 R" % (f.encode(), 5 + i) for i, f in enumerate(FONTS)),
+            ),
+        ]
+        self.font_objects = [
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode()
+            for base in FONTS.values()
+        ]
+
+        # Everything before object 4 is identical for every eBDN and can be emitted verbatim.
+        self.prefix = bytearray(self.header)
+        self.prefix_offsets = []
+        for number, body in enumerate(self.static_objects, start=1):
+            self.prefix_offsets.append(len(self.prefix))
+            self.prefix += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        self.prefix = bytes(self.prefix)
+
+    def _signature_ops(self, name, label, signature):
+        top = self.sig_top[name]
+        x = MARGIN_MM + CELL_PAD_MM
+        # The label on its own line and the value below it, whether the value is a signature or N/A.
+        value = signature.hex() if signature else "N/A"
+        lines = [label] + [value[i:i + SIG_CHARS_PER_LINE] for i in range(0, len(value), SIG_CHARS_PER_LINE)]
+        return b"".join(
+            _text_op("F3", 8, x, top + 5 * i + 2.5 + 0.3 * 8 / K, line) for i, line in enumerate(lines)
+        )
+
+    def render(self, record):
+        finalized_at = getattr(record, "finalized_at", None)
+        fields = {
+            "delivery_id_line": f"Delivery ID: {record.delivery_id}",
+            "imo_line": f"IMO Number: {record.imo_number}",
+            "date_line": "Date: " + (
+                finalized_at.strftime('%Y-%m-%d %H:%M:%S') + " UTC" if finalized_at else "N/A"
+            ),
+            "qty_line": f" - Actual Quantity: {record.actual_qty} MT",
+            "density_line": f" - Density @ 15C: {record.density} kg/m3",
+            "sulphur_line": f" - Sulphur Content: {record.sulphur_content}%",
+            "sample_line": f" - Sample Seal ID: {record.sample_id}",
+        }
+
+        content = bytearray()
+        for font, size, x, baseline, text, is_field in self.ops:
+            content += _text_op(font, size, x, baseline, fields[text] if is_field else text)
+        content += self._signature_ops("sig_supplier", "Supplier Signature:", record.sig_supplier)
+        content += self._signature_ops("sig_chief", "Chief Eng Signature:", record.sig_chief)
+
+        out = bytearray(self.prefix)
+        offsets = list(self.prefix_offsets)
+        offsets.append(len(out))
+        out += b"4 0 obj\n<< /Length %d >>\nstream\n%s\nendstream\nendobj\n" % (len(content), bytes(content))
+        for number, body in enumerate(self.font_objects, start=5):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+        # No /CreationDate or /ID: the same record always produces the same bytes (and pdf_hash).
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+        out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref)
+        return bytes(out)
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def get_template() -> EbdnTemplate:
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = EbdnTemplate()
+    return _template
+
 
 def generate_ebdn_receipt(record):
-    pdf = FPDF()
-    pdf.add_page()
-    
-    pdf.set_font("Helvetica", "B", 16)
-    pdf.cell(0, 10, "ELECTRONIC BUNKER DELIVERY NOTE (eBDN)", ln=True, align="C")
-    pdf.ln(10)
-    
-    pdf.set_font("Helvetica", "", 12)
-    pdf.cell(0, 10, f"Delivery ID: {record.delivery_id}", ln=True)
-    pdf.cell(0, 10, f"IMO Number: {record.imo_number}", ln=True)
-    pdf.cell(0, 10, f"Date: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC", ln=True)
-    pdf.ln(5)
-    
-    pdf.set_font("Helvetica", "B", 12)
-    pdf.cell(0, 10, "Bunker Specifications:", ln=True)
-    pdf.set_font("Helvetica", "", 12)
-    pdf.cell(0, 10, f" - Actual Quantity: {record.actual_qty} MT", ln=True)
-    pdf.cell(0, 10, f" - Density @ 15C: {record.density} kg/m3", ln=True)
-    pdf.cell(0, 10, f" - Sulphur Content: {record.sulphur_content}%", ln=True)
-    pdf.cell(0, 10, f" - Sample Seal ID: {record.sample_id}", ln=True)
-    pdf.ln(10)
-
-    pdf.set_font("Helvetica", "B", 10)
-    pdf.cell(0, 10, "Blockchain Proofs (ECDSA):", ln=True)
-    pdf.set_font("Courier", "", 8)
-    pdf.multi_cell(0, 5, f"Supplier Signature: {record.sig_supplier.hex() if record.sig_supplier else 'N/A'}")
-    pdf.ln(2)
-    pdf.multi_cell(0, 5, f"Chief Eng Signature: {record.sig_chief.hex() if record.sig_chief else 'N/A'}")
-    
-    return pdf.output(dest='S')
\ No newline at end of file
+    return get_template().render(record)
+
+
+def _render_chunk(records):
+    template = get_template()
+    return [template.render(record) for record in records]
+
+
+def render_many(records, workers=None, chunk_size=64):
+    # Records must be picklable (e.g. SimpleNamespace snapshots, not live ORM rows) when workers > 1.
+    records = list(records)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1 or len(records) <= chunk_size:
+        return _render_chunk(records)
+
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    # Spawned, since callers may be threaded (the template cache has a lock a fork could copy held).
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return [pdf for chunk in pool.map(_render_chunk, chunks) for pdf in chunk]
@@ -1,28 +1,182 @@
-import oqs
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.telemetry import get_logger
 
-KEY_PATH = "../../keys/master_quantum.key"
+# Resolved against the repository root, not the CWD the service happens to be started from.
+DEFAULT_KEY_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "keys", "master_quantum.key")
+)
+# Where earlier releases kept the key: relative to the CWD the service was started from.
+LEGACY_KEY_PATH = os.path.abspath(os.path.join("..", "..", "keys", "master_quantum.key"))
+# "1": generate a master key when there is none (first setup, benchmarks). Otherwise a missing key
+# stops the service: a new key would sign seals that do not verify against the published one.
+QUANTUM_KEY_CREATE = os.getenv("QUANTUM_KEY_CREATE", "0") == "1"
 ALG_NAME = "ML-DSA-65"
 
-def get_or_create_master_key():
-    if os.path.exists(KEY_PATH):
-        with open(KEY_PATH, "rb") as f:
-            print(f"Loaded Persistent {ALG_NAME} Master Key.")
+log = get_logger(__name__)
+
+
+def resolve_key_path():
+    if os.getenv("QUANTUM_KEY_PATH"):
+        return os.getenv("QUANTUM_KEY_PATH")
+    if not os.path.exists(DEFAULT_KEY_PATH) and os.path.exists(LEGACY_KEY_PATH):
+        log.warning("Using master key from legacy path", path=LEGACY_KEY_PATH, move_to=DEFAULT_KEY_PATH)
+        return LEGACY_KEY_PATH
+    return DEFAULT_KEY_PATH
+
+
+KEY_PATH = resolve_key_path()
+
+
+def _oqs():
+    # liboqs-python loads the native library on import (and tries to build it when missing), so
+    # only processes that sign or verify pay for it.
+    import oqs
+    return oqs
+
+
+def public_key_path(key_path=KEY_PATH):
+    return os.path.splitext(key_path)[0] + ".pub"
+
+
+def get_or_create_master_key(key_path=KEY_PATH, create=QUANTUM_KEY_CREATE):
+    if os.path.exists(key_path):
+        with open(key_path, "rb") as f:
+            log.info("Loaded persistent master key", algorithm=ALG_NAME)
             return f.read()
+    elif not create:
+        raise Exception(
+            f"No {ALG_NAME} master key at {key_path}; restore it, point QUANTUM_KEY_PATH at it, "
+            f"or set QUANTUM_KEY_CREATE=1 to generate a new one."
+        )
     else:
-        with oqs.Signature(ALG_NAME) as signer:
-            signer.generate_keypair()
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        with _oqs().Signature(ALG_NAME) as signer:
+            public_key = signer.generate_keypair()
             private_key = signer.export_secret_key()
-            with open(KEY_PATH, "wb") as f:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
                 f.write(private_key)
-            print(f"Generated and Saved New {ALG_NAME} Master Key.")
+            with open(public_key_path(key_path), "wb") as f:
+                f.write(public_key)
+            log.info("Generated and saved new master key", algorithm=ALG_NAME)
             return private_key
 
+
+def load_public_key(key_path=KEY_PATH, alg_name=ALG_NAME):
+    # Written next to the master key when it is generated. liboqs cannot derive it from the secret
+    # key, so a key without one (made by an earlier release, or whose .pub got lost) cannot verify.
+    path = public_key_path(key_path)
+    if not os.path.exists(path):
+        raise Exception(f"No {alg_name} public key at {path}; restore it next to the master key.")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def ensure_master_key(key_path=KEY_PATH):
+    # Boot check: fails when there is no master key (unless QUANTUM_KEY_CREATE=1) or no public key
+    # to verify its seals with.
+    get_or_create_master_key(key_path)
+    load_public_key(key_path)
+
+
+class QuantumSigner:
+    def __init__(self, key_path=KEY_PATH, alg_name=ALG_NAME):
+        self.key_path = key_path
+        self.alg_name = alg_name
+        self._secret_key = bytearray(get_or_create_master_key(key_path))
+        self._public_key = None
+        self._local = threading.local()
+
+    @property
+    def public_key(self):
+        if self._public_key is None:
+            self._public_key = load_public_key(self.key_path, self.alg_name)
+        return self._public_key
+
+    def _signer(self):
+        # liboqs contexts are not thread-safe, so each thread keeps and reuses its own.
+        ctx = getattr(self._local, "signer", None)
+        if ctx is None:
+            ctx = _oqs().Signature(self.alg_name, secret_key=bytes(self._secret_key))
+            self._local.signer = ctx
+        return ctx
+
+    def _verifier(self):
+        ctx = getattr(self._local, "verifier", None)
+        if ctx is None:
+            ctx = _oqs().Signature(self.alg_name)
+            self._local.verifier = ctx
+        return ctx
+
+    def sign(self, data_hash: bytes) -> bytes:
+        return self._signer().sign(data_hash)
+
+    def verify(self, data_hash: bytes, signature: bytes) -> bool:
+        return self._verifier().verify(data_hash, signature, self.public_key)
+
+    def sign_many(self, hashes, workers=None):
+        if workers is None or workers <= 1:
+            ctx = self._signer()
+            return [ctx.sign(h) for h in hashes]
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(self.sign, hashes))
+
+    def verify_many(self, hashes, signatures, workers=None):
+        if workers is None or workers <= 1:
+            ctx, public_key = self._verifier(), self.public_key
+            return [ctx.verify(h, s, public_key) for h, s in zip(hashes, signatures)]
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(self.verify, hashes, signatures))
+
+    def close(self):
+        for i in range(len(self._secret_key)):
+            self._secret_key[i] = 0
+        self._local = threading.local()
+
+
+class QuantumVerifier:
+    # Public key only: auditors and verification workers never need (or create) the master key.
+    def __init__(self, key_path=KEY_PATH, alg_name=ALG_NAME):
+        self.alg_name = alg_name
+        self.public_key = load_public_key(key_path, alg_name)
+        self._local = threading.local()
+
+    def verify(self, data_hash: bytes, signature: bytes) -> bool:
+        ctx = getattr(self._local, "verifier", None)
+        if ctx is None:
+            ctx = _oqs().Signature(self.alg_name)
+            self._local.verifier = ctx
+        return ctx.verify(data_hash, signature, self.public_key)
+
+
+_signer = None
+_signer_lock = threading.Lock()
+_verifier = None
+
+
+def get_signer() -> QuantumSigner:
+    global _signer
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                _signer = QuantumSigner()
+    return _signer
+
+
+def get_verifier() -> QuantumVerifier:
+    global _verifier
+    if _verifier is None:
+        with _signer_lock:
+            if _verifier is None:
+                _verifier = QuantumVerifier()
+    return _verifier
+
+
 def sign_with_mldsa(data_hash: bytes):
-    secret_key = get_or_create_master_key()
-    
-    with oqs.Signature(ALG_NAME, secret_key=secret_key) as signer:
-        signature = signer.sign(data_hash)
-        
-        print(f"Document signed with {ALG_NAME} Master Key.")
-        return signature, ALG_NAME
\ No newline at end of file
+    return get_signer().sign(data_hash), ALG_NAME
+
+
+def verify_mldsa(data_hash: bytes, signature: bytes) -> bool:
+    return get_verifier().verify(data_hash, signature)
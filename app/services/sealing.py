@@ -0,0 +1,565 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+from sqlalchemy import select, update, func
+from web3 import Web3
+from web3.exceptions import TimeExhausted
+from app.database import AsyncSessionLocal
+from app import models
+from app.core.metrics import EVENT_TO_SEAL, MLDSA_SIGN, PDF_RENDER, record_transition
+from app.core.status_hub import get_status_hub, publish_status
+from app.core.telemetry import batch_span, delivery_span, get_logger, tracing_active
+from app.core.transactions import TransactionDropped, TransactionReverted
+from app.services.pdf_engine import generate_ebdn_receipt
+from app.services.quantum_vault import sign_with_mldsa
+from app.services.blob_store import get_blob_store
+from app.services.merkle import leaf_hash, build_tree, merkle_root, merkle_proof
+
+# MaritimeRegistry.BunkerStatus.QuantumSealed
+NOTE_QUANTUM_SEALED = 3
+
+SEAL_WORKERS = int(os.getenv("SEAL_WORKERS", str(os.cpu_count() or 2)))
+SEAL_EXECUTOR = os.getenv("SEAL_EXECUTOR", "process")
+ANCHOR_CONCURRENCY = int(os.getenv("ANCHOR_CONCURRENCY", "16"))
+MAX_ATTEMPTS = int(os.getenv("SEAL_MAX_ATTEMPTS", "8"))
+MAX_BACKOFF = 300
+
+# "single": one ML-DSA signature and one anchorQuantumSeal tx per delivery.
+# "batch": PDFs are only hashed; a Merkle root over up to SEAL_BATCH_SIZE of them is signed once
+#          and anchored with anchorQuantumSealBatch after at most SEAL_BATCH_WINDOW seconds.
+SEAL_ANCHOR_MODE = os.getenv("SEAL_ANCHOR_MODE", "single")
+SEAL_BATCH_SIZE = int(os.getenv("SEAL_BATCH_SIZE", "256"))
+SEAL_BATCH_WINDOW = int(os.getenv("SEAL_BATCH_WINDOW", "30"))
+
+# Everything the eBDN template reads; copied out of the ORM row so it can cross a process boundary.
+RECORD_FIELDS = (
+    "delivery_id", "imo_number", "supplier_id", "actual_qty", "density",
+    "sulphur_content", "sample_id", "sig_supplier", "sig_chief", "finalized_at",
+)
+
+log = get_logger(__name__)
+
+
+def render_and_store(fields):
+    # Runs in the worker: the PDF goes straight to the blob store and never crosses back.
+    started = time.perf_counter()
+    pdf_bytes = bytes(generate_ebdn_receipt(SimpleNamespace(**fields)))
+    render_seconds = time.perf_counter() - started
+    sha3_obj = hashlib.sha3_512(pdf_bytes)
+    get_blob_store().put(sha3_obj.hexdigest(), pdf_bytes)
+    return sha3_obj, render_seconds
+
+
+# Workers time their own stages (metrics live in the parent process) and return the timings.
+def render_and_sign(fields):
+    sha3_obj, render_seconds = render_and_store(fields)
+    quantum_sig, sign_seconds = sign_timed(sha3_obj.digest())
+    return sha3_obj.hexdigest(), quantum_sig, {"render": render_seconds, "sign": sign_seconds}
+
+
+def render_and_hash(fields):
+    sha3_obj, render_seconds = render_and_store(fields)
+    return sha3_obj.hexdigest(), None, {"render": render_seconds}
+
+
+def sign_timed(data_hash):
+    started = time.perf_counter()
+    signature, _ = sign_with_mldsa(data_hash)
+    return signature, time.perf_counter() - started
+
+
+def _utcnow():
+    return datetime.datetime.utcnow()
+
+
+def _sealed_locally(record):
+    return record.status == "QUANTUM_SEALED" or record.anchor_tx_hash is not None
+
+
+class SealingPipeline:
+    def __init__(self, maritime_client, workers=SEAL_WORKERS, anchor_concurrency=ANCHOR_CONCURRENCY,
+                 executor=SEAL_EXECUTOR, poll_interval=1.0, anchor_mode=SEAL_ANCHOR_MODE,
+                 batch_size=SEAL_BATCH_SIZE, batch_window=SEAL_BATCH_WINDOW):
+        self.client = maritime_client
+        self.workers = workers
+        self.anchor_concurrency = anchor_concurrency
+        self.anchor_mode = anchor_mode
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.poll_interval = poll_interval
+        self.executor_kind = executor
+        self.executor = None
+
+        self._sealing = set()
+        self._anchoring = set()
+        self._tasks = set()
+        self._loop_task = None
+        self._batch_task = None
+        self.latency = {stage: deque(maxlen=1000) for stage in ("seal", "anchor", "end_to_end")}
+
+    async def start(self):
+        # Started and stopped with leadership, so a process may run the pipeline several times.
+        if self.executor is None:
+            # Spawned, not forked: the server has threads (the receipt tracker, the event loop's
+            # pools) whose locks a forked child could inherit mid-acquire.
+            self.executor = (ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                             if self.executor_kind == "process"
+                             else ThreadPoolExecutor(self.workers))
+        await self._recover()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+        tasks = [t for t in [self._batch_task, *self._tasks] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*[t for t in [self._loop_task, *tasks] if t is not None], return_exceptions=True)
+        self._loop_task = None
+        self._batch_task = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _recover(self):
+        # Jobs claimed by a previous process never finished; hand them back to their queue.
+        # ANCHORING keeps its anchor_tx_hash so the receipt is awaited before anything is resent.
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.SealJob).where(models.SealJob.stage == "SEALING").values(stage="PENDING_SEAL")
+            )
+            # Jobs already bound to a signed batch stay with it; the batch itself is resumed.
+            await db.execute(
+                update(models.SealJob)
+                .where(models.SealJob.stage == "ANCHORING", models.SealJob.batch_root.is_(None))
+                .values(stage="PENDING_ANCHOR")
+            )
+            await db.commit()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._dispatch("PENDING_SEAL", "SEALING", self._sealing, self.workers, self._seal)
+                if self.anchor_mode == "batch":
+                    await self._dispatch_batch()
+                else:
+                    await self._dispatch("PENDING_ANCHOR", "ANCHORING", self._anchoring,
+                                         self.anchor_concurrency, self._anchor)
+            except Exception as e:
+                log.error("Sealing dispatcher failed", error=str(e))
+            await asyncio.sleep(self.poll_interval)
+
+    async def _dispatch(self, queued_stage, running_stage, in_flight, limit, worker):
+        free = limit - len(in_flight)
+        if free <= 0:
+            return
+
+        claimed_ids = []
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.SealJob.id)
+                .where(models.SealJob.stage == queued_stage, models.SealJob.next_attempt_at <= _utcnow())
+                .order_by(models.SealJob.next_attempt_at)
+                .limit(free)
+            )
+            for job_id in result.scalars().all():
+                claimed = await db.execute(
+                    update(models.SealJob)
+                    .where(models.SealJob.id == job_id, models.SealJob.stage == queued_stage)
+                    .values(stage=running_stage)
+                )
+                if claimed.rowcount == 1:
+                    claimed_ids.append(job_id)
+            await db.commit()
+
+        for job_id in claimed_ids:
+            in_flight.add(job_id)
+            task = asyncio.create_task(worker(job_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda t, job_id=job_id: in_flight.discard(job_id))
+
+    async def _load(self, db, job_id):
+        job = await db.get(models.SealJob, job_id)
+        result = await db.execute(
+            select(models.BunkerRecord).where(models.BunkerRecord.delivery_id == job.delivery_id)
+        )
+        return job, result.scalars().first()
+
+    async def _seal(self, job_id):
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                job, record = await self._load(db, job_id)
+                if record is None:
+                    raise Exception(f"Delivery ID {job.delivery_id} not found in DB.")
+                fields = {name: getattr(record, name) for name in RECORD_FIELDS}
+
+            # A replayed event or a previous leader may have sealed the delivery already; the hash
+            # and signature on chain are then final and must not be replaced.
+            if _sealed_locally(record) or await self.client.get_note_status(
+                Web3.to_bytes(hexstr=job.delivery_id), minimum=NOTE_QUANTUM_SEALED
+            ) >= NOTE_QUANTUM_SEALED:
+                await self._complete(job_id, None, started)
+                return
+
+            log.detail("Rendering eBDN and applying post-quantum seal", delivery_id=fields["delivery_id"])
+            loop = asyncio.get_running_loop()
+            with delivery_span("seal.render", fields["delivery_id"], mode=self.anchor_mode):
+                pdf_hash_hex, quantum_sig, timings = await loop.run_in_executor(
+                    self.executor, render_and_hash if self.anchor_mode == "batch" else render_and_sign, fields
+                )
+            PDF_RENDER.observe(timings["render"])
+            if "sign" in timings:
+                MLDSA_SIGN.observe(timings["sign"], "record")
+
+            async with AsyncSessionLocal() as db:
+                job, record = await self._load(db, job_id)
+                # The event watcher may have indexed an anchor while the seal was rendering.
+                sealed = _sealed_locally(record)
+                if not sealed:
+                    record.pdf_hash = pdf_hash_hex
+                    record.quantum_signature = quantum_sig
+                    job.stage = "PENDING_ANCHOR"
+                    job.sealed_at = _utcnow()
+                    job.next_attempt_at = job.sealed_at
+                    job.attempts = 0
+                    job.last_error = None
+                    await db.commit()
+            if sealed:
+                await self._complete(job_id, None, started)
+                return
+
+            self.latency["seal"].append(time.perf_counter() - started)
+            log.detail("Quantum seal created", delivery_id=fields["delivery_id"], pdf_hash=pdf_hash_hex[:16])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._retry(job_id, "PENDING_SEAL", e)
+
+    async def _anchor(self, job_id):
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                job, record = await self._load(db, job_id)
+            delivery_id = Web3.to_bytes(hexstr=job.delivery_id)
+
+            if job.anchor_tx_hash is None:
+                # A delivery is anchored at most once: the watcher may already have indexed an anchor
+                # sent by a previous leader, and the chain may know one the watcher has not seen yet.
+                if record is not None and record.status == "QUANTUM_SEALED":
+                    await self._complete(job_id, None, started)
+                    return
+                if await self.client.get_note_status(delivery_id, minimum=NOTE_QUANTUM_SEALED) >= NOTE_QUANTUM_SEALED:
+                    await self._complete(job_id, None, started)
+                    return
+
+                log.detail("Anchoring quantum seal", delivery_id=job.delivery_id)
+                with delivery_span("seal.anchor.submit", delivery_id):
+                    tx_hash = await self.client.submit_quantum_seal(
+                        delivery_id, record.pdf_hash, record.quantum_signature
+                    )
+                async with AsyncSessionLocal() as db:
+                    job = await db.get(models.SealJob, job_id)
+                    job.anchor_tx_hash = tx_hash.hex()
+                    await db.commit()
+
+            with delivery_span("seal.anchor.confirm", delivery_id, tx_hash=job.anchor_tx_hash):
+                try:
+                    receipt = await self.client.wait_for_receipt_async(Web3.to_bytes(hexstr=job.anchor_tx_hash))
+                except (TimeExhausted, asyncio.TimeoutError, TransactionDropped) as e:
+                    receipt, wait_error = None, e
+            if receipt is None or receipt.status != 1:
+                # Dropped, stuck or reverted: trust the chain, and resend if the seal never landed.
+                if await self.client.get_note_status(delivery_id, minimum=NOTE_QUANTUM_SEALED) >= NOTE_QUANTUM_SEALED:
+                    await self._complete(job_id, None, started)
+                    return
+                if receipt is None:
+                    await self._retry(job_id, "PENDING_ANCHOR", wait_error, clear_tx=True)
+                    return
+                raise TransactionReverted(job.anchor_tx_hash, "Anchor transaction")
+
+            # The hash that was mined, which differs from the submitted one if the fee watchdog
+            # replaced a stuck tx.
+            anchor_tx_hash = receipt.transactionHash.hex()
+            await self._complete(job_id, anchor_tx_hash, started)
+            log.info("Quantum seal anchored", delivery_id=job.delivery_id, tx_hash=anchor_tx_hash)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A reverted or dropped tx has to be resent; anything else waits on the same hash again.
+            await self._retry(job_id, "PENDING_ANCHOR", e,
+                              clear_tx=isinstance(e, (TransactionReverted, TransactionDropped)))
+
+    async def _dispatch_batch(self):
+        if self._batch_task is not None and not self._batch_task.done():
+            return
+
+        now = _utcnow()
+        async with AsyncSessionLocal() as db:
+            # A signed batch that has not been anchored yet (retry or restart) goes first.
+            result = await db.execute(
+                select(models.SealBatch.root)
+                .where(models.SealBatch.status == "SIGNED", models.SealBatch.next_attempt_at <= now)
+                .order_by(models.SealBatch.created_at)
+                .limit(1)
+            )
+            root = result.scalars().first()
+            if root is not None:
+                self._batch_task = asyncio.create_task(self._anchor_batch(root))
+                return
+
+            result = await db.execute(
+                select(models.SealJob)
+                .where(models.SealJob.stage == "PENDING_ANCHOR", models.SealJob.next_attempt_at <= now)
+                .order_by(models.SealJob.sealed_at)
+                .limit(self.batch_size)
+            )
+            jobs = result.scalars().all()
+            if not jobs:
+                return
+            if len(jobs) < self.batch_size and (now - jobs[0].sealed_at).total_seconds() < self.batch_window:
+                return
+
+            claimed_ids = []
+            for job in jobs:
+                claimed = await db.execute(
+                    update(models.SealJob)
+                    .where(models.SealJob.id == job.id, models.SealJob.stage == "PENDING_ANCHOR")
+                    .values(stage="ANCHORING")
+                )
+                if claimed.rowcount == 1:
+                    claimed_ids.append(job.id)
+            await db.commit()
+
+        if claimed_ids:
+            self._anchoring.update(claimed_ids)
+            self._batch_task = asyncio.create_task(self._build_batch(claimed_ids))
+            self._batch_task.add_done_callback(lambda t: self._anchoring.difference_update(claimed_ids))
+
+    async def _build_batch(self, job_ids):
+        try:
+            async with AsyncSessionLocal() as db:
+                jobs = (await db.execute(
+                    select(models.SealJob).where(models.SealJob.id.in_(job_ids)).order_by(models.SealJob.id)
+                )).scalars().all()
+                records = {r.delivery_id: r for r in (await db.execute(
+                    select(models.BunkerRecord)
+                    .where(models.BunkerRecord.delivery_id.in_([j.delivery_id for j in jobs]))
+                )).scalars().all()}
+
+                # Deliveries already anchored (e.g. singly, before a switch to batch mode) are done,
+                # not anchored a second time inside the batch.
+                now = _utcnow()
+                for job in jobs:
+                    if records[job.delivery_id].status == "QUANTUM_SEALED":
+                        job.stage = "DONE"
+                        job.anchored_at = now
+                        job.anchor_tx_hash = job.anchor_tx_hash or records[job.delivery_id].anchor_tx_hash
+                jobs = [j for j in jobs if j.stage != "DONE"]
+                if not jobs:
+                    await db.commit()
+                    return
+
+                levels = build_tree([leaf_hash(j.delivery_id, records[j.delivery_id].pdf_hash) for j in jobs])
+                root = merkle_root(levels)
+
+                loop = asyncio.get_running_loop()
+                with batch_span("seal.batch.sign", [j.delivery_id for j in jobs], root=root.hex()):
+                    signature, sign_seconds = await loop.run_in_executor(self.executor, sign_timed, root)
+                MLDSA_SIGN.observe(sign_seconds, "batch")
+
+                db.add(models.SealBatch(root=root.hex(), leaf_count=len(jobs), quantum_signature=signature))
+                for index, job in enumerate(jobs):
+                    record = records[job.delivery_id]
+                    job.batch_root = root.hex()
+                    record.seal_batch_root = root.hex()
+                    record.merkle_proof = json.dumps(merkle_proof(levels, index))
+                await db.commit()
+
+            log.info("Signed seal batch", root=root.hex(), deliveries=len(jobs))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            for job_id in job_ids:
+                await self._retry(job_id, "PENDING_ANCHOR", e)
+            return
+
+        await self._anchor_batch(root.hex())
+
+    async def _anchor_batch(self, root_hex):
+        started = time.perf_counter()
+        root = bytes.fromhex(root_hex)
+        try:
+            async with AsyncSessionLocal() as db:
+                batch = await db.get(models.SealBatch, root_hex)
+                delivery_ids = []
+                if tracing_active():
+                    delivery_ids = (await db.execute(
+                        select(models.SealJob.delivery_id).where(models.SealJob.batch_root == root_hex)
+                    )).scalars().all()
+
+            with batch_span("seal.batch.anchor", delivery_ids, root=root_hex):
+                if batch.anchor_tx_hash is None:
+                    if not await self.client.is_seal_batch_anchored(root):
+                        log.info("Anchoring seal batch", root=root_hex, deliveries=batch.leaf_count)
+                        tx_hash = await self.client.submit_quantum_seal_batch(
+                            root, batch.leaf_count, batch.quantum_signature
+                        )
+                        async with AsyncSessionLocal() as db:
+                            batch = await db.get(models.SealBatch, root_hex)
+                            batch.anchor_tx_hash = tx_hash.hex()
+                            await db.commit()
+
+                anchor_tx_hash = batch.anchor_tx_hash
+                if anchor_tx_hash is not None:
+                    try:
+                        receipt = await self.client.wait_for_receipt_async(Web3.to_bytes(hexstr=anchor_tx_hash))
+                    except (TimeExhausted, asyncio.TimeoutError, TransactionDropped):
+                        # Dropped or stuck: trust the chain; the handler below resends otherwise.
+                        if not await self.client.is_seal_batch_anchored(root):
+                            raise
+                        receipt = None
+                    if receipt is not None:
+                        if receipt.status != 1 and not await self.client.is_seal_batch_anchored(root):
+                            raise TransactionReverted(anchor_tx_hash, "Batch anchor transaction")
+                        anchor_tx_hash = receipt.transactionHash.hex()
+
+            await self._complete_batch(root_hex, started, anchor_tx_hash)
+            log.info("Quantum seal batch anchored", root=root_hex, tx_hash=anchor_tx_hash)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            async with AsyncSessionLocal() as db:
+                batch = await db.get(models.SealBatch, root_hex)
+                batch.attempts += 1
+                batch.last_error = str(e)
+                if isinstance(e, (TransactionReverted, TransactionDropped, TimeExhausted, asyncio.TimeoutError)):
+                    batch.anchor_tx_hash = None
+                if batch.attempts >= MAX_ATTEMPTS:
+                    batch.status = "FAILED"
+                    await db.execute(
+                        update(models.SealJob).where(models.SealJob.batch_root == root_hex)
+                        .values(stage="FAILED", last_error=str(e))
+                    )
+                    log.error("Seal batch failed permanently", root=root_hex, error=str(e))
+                else:
+                    delay = min(2 ** batch.attempts, MAX_BACKOFF)
+                    batch.next_attempt_at = _utcnow() + datetime.timedelta(seconds=delay)
+                    log.warning("Seal batch error; retrying", root=root_hex, retry_in=delay, error=str(e))
+                await db.commit()
+
+    async def _complete_batch(self, root_hex, started, anchor_tx_hash=None):
+        now = _utcnow()
+        async with AsyncSessionLocal() as db:
+            batch = await db.get(models.SealBatch, root_hex)
+            batch.status = "ANCHORED"
+            if anchor_tx_hash is not None:
+                batch.anchor_tx_hash = anchor_tx_hash
+            batch.anchored_at = now
+            batch.last_error = None
+
+            jobs = (await db.execute(
+                select(models.SealJob).where(models.SealJob.batch_root == root_hex)
+            )).scalars().all()
+            for job in jobs:
+                job.stage = "DONE"
+                job.anchored_at = now
+                job.anchor_tx_hash = batch.anchor_tx_hash
+                lag = (now - job.enqueued_at).total_seconds()
+                self.latency["end_to_end"].append(lag)
+                EVENT_TO_SEAL.observe(lag, "batch")
+
+            # Records the event watcher already sealed keep their status; the rest were FINALIZED.
+            await db.execute(
+                update(models.BunkerRecord)
+                .where(models.BunkerRecord.seal_batch_root == root_hex)
+                .values(anchor_tx_hash=batch.anchor_tx_hash)
+            )
+            sealed = (await db.execute(
+                update(models.BunkerRecord)
+                .where(models.BunkerRecord.seal_batch_root == root_hex,
+                       models.BunkerRecord.status != "QUANTUM_SEALED")
+                .values(status="QUANTUM_SEALED")
+                .returning(models.BunkerRecord.delivery_id, models.BunkerRecord.imo_number,
+                           models.BunkerRecord.supplier_id)
+            )).all()
+            await db.commit()
+        record_transition("FINALIZED", "QUANTUM_SEALED", len(sealed))
+        get_status_hub().publish_many(sealed, "QUANTUM_SEALED")
+
+        self.latency["anchor"].append(time.perf_counter() - started)
+
+    async def _complete(self, job_id, anchor_tx_hash, started):
+        async with AsyncSessionLocal() as db:
+            job, record = await self._load(db, job_id)
+            job.stage = "DONE"
+            job.anchored_at = _utcnow()
+            job.last_error = None
+            if anchor_tx_hash is not None:
+                job.anchor_tx_hash = anchor_tx_hash
+            previous = record.status if record is not None else "QUANTUM_SEALED"
+            if record is not None:
+                record.anchor_tx_hash = record.anchor_tx_hash or job.anchor_tx_hash
+                record.status = "QUANTUM_SEALED"
+            await db.commit()
+        if previous != "QUANTUM_SEALED":
+            record_transition(previous, "QUANTUM_SEALED")
+            publish_status(record.delivery_id, "QUANTUM_SEALED", record.imo_number, record.supplier_id)
+
+        lag = (job.anchored_at - job.enqueued_at).total_seconds()
+        self.latency["anchor"].append(time.perf_counter() - started)
+        self.latency["end_to_end"].append(lag)
+        EVENT_TO_SEAL.observe(lag, "single")
+
+    async def _retry(self, job_id, stage, error, clear_tx=False):
+        async with AsyncSessionLocal() as db:
+            job = await db.get(models.SealJob, job_id)
+            job.attempts += 1
+            job.last_error = str(error)
+            if clear_tx:
+                job.anchor_tx_hash = None
+            if job.attempts >= MAX_ATTEMPTS:
+                job.stage = "FAILED"
+                log.error("Seal job failed permanently", delivery_id=job.delivery_id, error=str(error))
+            else:
+                delay = min(2 ** job.attempts, MAX_BACKOFF)
+                job.stage = stage
+                job.next_attempt_at = _utcnow() + datetime.timedelta(seconds=delay)
+                log.warning("Seal job error; retrying", delivery_id=job.delivery_id, retry_in=delay, error=str(error))
+            await db.commit()
+
+    async def stats(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.SealJob.stage, func.count()).group_by(models.SealJob.stage)
+            )
+            queue = dict(result.all())
+
+        latency = {}
+        for stage, samples in self.latency.items():
+            ordered = sorted(samples)
+            latency[stage] = {
+                "count": len(ordered),
+                "avg": sum(ordered) / len(ordered) if ordered else None,
+                "p50": ordered[len(ordered) // 2] if ordered else None,
+                "p95": ordered[int(len(ordered) * 0.95)] if ordered else None,
+            }
+
+        return {
+            "queue_depth": {
+                "seal": queue.get("PENDING_SEAL", 0),
+                "anchor": queue.get("PENDING_ANCHOR", 0),
+            },
+            "in_flight": {"seal": len(self._sealing), "anchor": len(self._anchoring)},
+            "done": queue.get("DONE", 0),
+            "failed": queue.get("FAILED", 0),
+            "latency_seconds": latency,
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+import aiohttp
+from app.core.telemetry import get_logger
+
+# Hex characters of the delivery id a chief engineer has to quote ("SIGN 6b582bd8").
+ID_PREFIX_LEN = 8
+MAX_EARLY_APPROVALS = 1000
+# Seconds Telegram's clock may lag ours before a reply counts as sent before the request.
+CLOCK_SKEW = int(os.getenv("TELEGRAM_CLOCK_SKEW", "5"))
+
+log = get_logger(__name__)
+
+
+def _normalize(delivery_id_hex):
+    return delivery_id_hex.lower().removeprefix("0x")
+
+
+class ApprovalWaiter:
+    def __init__(self, delivery_id_hex, requested_at=None):
+        self.delivery_id_hex = delivery_id_hex
+        # Unix seconds, like Telegram's message dates; a reply from before this is not an answer.
+        self.requested_at = int(time.time() if requested_at is None else requested_at)
+        self.future = asyncio.get_running_loop().create_future()
+
+    def answered_by(self, sent_at):
+        return sent_at + CLOCK_SKEW >= self.requested_at
+
+
+class TelegramApprovalDispatcher:
+    def __init__(self, token, chat_id, api_url="https://api.telegram.org", poll_timeout=30, sender_ids=None):
+        self.token = token
+        self.chat_id = chat_id
+        # Who may approve: only these users, and only in chat_id. In a private chat with the bot
+        # the chat id is the chief's user id, hence the default.
+        self.sender_ids = {str(i) for i in sender_ids} if sender_ids else {str(chat_id)}
+        self.api_url = api_url.rstrip("/")
+        self.poll_timeout = poll_timeout
+        self.offset = None
+        self._waiters = {}
+        self._early_approvals = {}
+        self._session = None
+        self._task = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token=os.getenv("TELEGRAM_TOKEN"),
+            chat_id=os.getenv("CHIEF_CHAT_ID"),
+            api_url=os.getenv("TELEGRAM_API_URL", "https://api.telegram.org"),
+            poll_timeout=int(os.getenv("TELEGRAM_POLL_TIMEOUT", "30")),
+            sender_ids=[i.strip() for i in os.getenv("CHIEF_USER_IDS", "").split(",") if i.strip()],
+        )
+
+    def _method_url(self, method):
+        return f"{self.api_url}/bot{self.token}/{method}"
+
+    async def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.poll_timeout + 10)
+            )
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def send_message(self, text, reply_markup=None):
+        await self.start()
+        payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}
+        if reply_markup is not None:
+            payload["reply_markup"] = reply_markup
+        async with self._session.post(self._method_url("sendMessage"), json=payload) as resp:
+            return await resp.json()
+
+    async def request_approval(self, delivery_id_hex, text):
+        delivery_id_hex = _normalize(delivery_id_hex)
+        prefix = delivery_id_hex[:ID_PREFIX_LEN]
+        self._register(delivery_id_hex)
+        await self.send_message(
+            f"{text}\n\nReply *'SIGN {prefix}'* or tap the button to authorize this record.",
+            reply_markup={"inline_keyboard": [[{"text": f"SIGN {prefix}", "callback_data": f"SIGN:{prefix}"}]]},
+        )
+
+    async def wait_for_approval(self, delivery_id_hex, timeout, requested_at=None):
+        # requested_at: when the request went out, if that was before this process started waiting
+        # (a job resumed after a restart); replies received in between still count.
+        await self.start()
+        delivery_id_hex = _normalize(delivery_id_hex)
+        waiter = self._register(delivery_id_hex, requested_at)
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.pop(delivery_id_hex, None)
+
+    def cancel_approval(self, delivery_id_hex):
+        # For a job that gave up: a waiter still parked on the future gets False, like a timeout.
+        waiter = self._waiters.pop(_normalize(delivery_id_hex), None)
+        if waiter is not None and not waiter.future.done():
+            waiter.future.set_result(False)
+
+    def pending_approvals(self) -> int:
+        return len(self._waiters)
+
+    def _register(self, delivery_id_hex, requested_at=None):
+        waiter = self._waiters.get(delivery_id_hex)
+        if waiter is None:
+            waiter = ApprovalWaiter(delivery_id_hex, requested_at)
+            self._waiters[delivery_id_hex] = waiter
+            # The reply may have been processed before this job (re)started waiting; one sent
+            # before the request went out answers an earlier request and is dropped.
+            sent_at = self._early_approvals.pop(delivery_id_hex[:ID_PREFIX_LEN], None)
+            if sent_at is not None and waiter.answered_by(sent_at):
+                waiter.future.set_result(True)
+        return waiter
+
+    async def _poll_loop(self):
+        backoff = 1
+        while True:
+            try:
+                params = {"timeout": self.poll_timeout, "allowed_updates": '["message","callback_query"]'}
+                if self.offset is not None:
+                    params["offset"] = self.offset
+                async with self._session.get(self._method_url("getUpdates"), params=params) as resp:
+                    updates = await resp.json()
+
+                for update in updates.get("result", []):
+                    # Advancing the offset acknowledges the update so Telegram stops resending it.
+                    self.offset = update["update_id"] + 1
+                    await self._handle_update(update)
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Telegram polling failed", retry_in=backoff, error=str(e))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _from_chief(self, message, sender):
+        return (str(message.get("chat", {}).get("id")) == str(self.chat_id)
+                and str(sender.get("id")) in self.sender_ids)
+
+    async def _handle_update(self, update):
+        if "callback_query" in update:
+            query = update["callback_query"]
+            data = query.get("data", "")
+            # A button press carries no date of its own; the request message it sits under does,
+            # so a button left over from an earlier request for the same delivery does not count.
+            prompt = query.get("message", {})
+            if data.upper().startswith("SIGN:") and self._from_chief(prompt, query.get("from", {})):
+                self._approve(data[5:], sent_at=prompt.get("date", 0))
+            async with self._session.post(
+                self._method_url("answerCallbackQuery"), json={"callback_query_id": query["id"]}
+            ):
+                pass
+            return
+
+        message = update.get("message", {})
+        words = message.get("text", "").strip().split()
+        if not words or words[0].upper() != "SIGN" or not self._from_chief(message, message.get("from", {})):
+            return
+        self._approve(words[1] if len(words) > 1 else None, sent_at=message.get("date", 0))
+
+    def _approve(self, prefix, sent_at):
+        # Every approval has to be sent after the request it answers went out.
+        if prefix is None:
+            # A bare "SIGN" is only unambiguous while exactly one delivery is waiting.
+            if len(self._waiters) != 1:
+                return
+            matches = list(self._waiters.values())
+        else:
+            prefix = _normalize(prefix)
+            if len(prefix) < ID_PREFIX_LEN:
+                return
+            matches = [w for w in self._waiters.values() if w.delivery_id_hex.startswith(prefix)]
+            if not matches:
+                self._early_approvals[prefix[:ID_PREFIX_LEN]] = sent_at
+                while len(self._early_approvals) > MAX_EARLY_APPROVALS:
+                    self._early_approvals.pop(next(iter(self._early_approvals)))
+                return
+
+        if len(matches) != 1:
+            return
+        waiter = matches[0]
+        if not waiter.answered_by(sent_at):
+            log.detail("Ignoring approval sent before the request", delivery_id=waiter.delivery_id_hex)
+            return
+        if not waiter.future.done():
+            log.detail("Approval received via Telegram", delivery_id=waiter.delivery_id_hex)
+            waiter.future.set_result(True)
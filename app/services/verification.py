@@ -0,0 +1,266 @@
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from sqlalchemy import select
+from web3 import Web3
+from app.database import SessionLocal
+from app import models
+from app.core.blockchain import (
+    NOTE_PDF_HASH, NOTE_QUANTUM_SIGNATURE_HASH, NOTE_SIGNATURES_HASH, NOTE_STATUS, finalization_message_hash,
+    signatures_hash,
+)
+from app.services.blob_store import get_blob_store
+from app.services.merkle import leaf_hash, verify_proof
+
+VERIFY_WORKERS = int(os.getenv("VERIFY_WORKERS", str(os.cpu_count() or 2)))
+VERIFY_CHUNK_SIZE = int(os.getenv("VERIFY_CHUNK_SIZE", "2000"))
+VERIFY_TASK_SIZE = 250  # records per worker task
+VERIFY_RPC_BATCH = 500  # eth_calls per JSON-RPC batch
+MAX_CHUNKS_IN_FLIGHT = 2
+
+# MaritimeRegistry.BunkerStatus.QuantumSealed
+NOTE_QUANTUM_SEALED = 3
+
+CHECKS = ("pdf_hash", "mldsa", "merkle_proof", "ecdsa_supplier", "ecdsa_chief", "anchor")
+
+# Copied out of bunker_records for each record; plain values so they can cross a process boundary.
+VERIFY_COLUMNS = (
+    models.BunkerRecord.id, models.BunkerRecord.delivery_id, models.BunkerRecord.status,
+    models.BunkerRecord.imo_number, models.BunkerRecord.supplier_id, models.BunkerRecord.density,
+    models.BunkerRecord.actual_qty, models.BunkerRecord.sulphur_content, models.BunkerRecord.sample_id,
+    models.BunkerRecord.sig_supplier, models.BunkerRecord.sig_chief, models.BunkerRecord.pdf_hash,
+    models.BunkerRecord.quantum_signature, models.BunkerRecord.seal_batch_root,
+    models.BunkerRecord.merkle_proof, models.BunkerRecord.anchor_tx_hash,
+)
+
+
+def _mldsa_verifier():
+    # oqs is optional for auditors without liboqs; the check is then reported as not run.
+    try:
+        from app.services.quantum_vault import get_verifier
+        return get_verifier(), None
+    except Exception as e:
+        return None, f"ML-DSA unavailable: {e}"
+
+
+def verify_offchain(items):
+    # Runs in a worker process: hashing, ML-DSA and ECDSA recovery are all CPU-bound.
+    store = get_blob_store()
+    verifier, verifier_error = _mldsa_verifier()
+    results = []
+    for item in items:
+        checks, errors, recovered = {}, [], {}
+
+        if item["pdf_hash"]:
+            try:
+                checks["pdf_hash"] = store.verify(item["pdf_hash"])
+            except FileNotFoundError:
+                checks["pdf_hash"] = False
+                errors.append("PDF missing from blob store (run Helper/migrate_pdf_blobs.py for inline PDFs)")
+
+            if item["seal_batch_root"]:
+                proof = json.loads(item["merkle_proof"] or "[]")
+                checks["merkle_proof"] = verify_proof(
+                    leaf_hash(item["delivery_id"], item["pdf_hash"]), proof, item["seal_batch_root"]
+                )
+            elif item["quantum_signature"]:
+                if verifier is None:
+                    errors.append(verifier_error)
+                else:
+                    checks["mldsa"] = verifier.verify(bytes.fromhex(item["pdf_hash"]), item["quantum_signature"])
+
+        if item["sig_supplier"] and item["sig_chief"]:
+            if None in (item["imo_number"], item["supplier_id"], item["density"], item["actual_qty"],
+                        item["sulphur_content"], item["sample_id"]):
+                errors.append("Record lacks the fields needed to rebuild the signed message")
+            else:
+                message = encode_defunct(finalization_message_hash(
+                    bytes.fromhex(item["delivery_id"]), item["imo_number"], item["supplier_id"],
+                    int(item["density"]), int(item["sulphur_content"] * 100), int(item["actual_qty"]),
+                    item["sample_id"]
+                ))
+                for role in ("supplier", "chief"):
+                    try:
+                        recovered[role] = Account.recover_message(message, signature=item[f"sig_{role}"])
+                    except Exception as e:
+                        recovered[role] = None
+                        errors.append(f"sig_{role} is not a valid signature: {e}")
+
+        results.append({"checks": checks, "errors": errors, "recovered": recovered})
+    return results
+
+
+def verify_batch_roots(roots):
+    # [(root_hex, signature)] -> {root_hex: bool | None}; each batch signature is checked once.
+    verifier, _ = _mldsa_verifier()
+    if verifier is None:
+        return {root: None for root, _ in roots}
+    return {root: verifier.verify(bytes.fromhex(root), signature) for root, signature in roots}
+
+
+class BatchVerifier:
+    def __init__(self, maritime_client=None, workers=VERIFY_WORKERS, chunk_size=VERIFY_CHUNK_SIZE):
+        # Without a client only the off-chain checks run (hashes, ML-DSA, Merkle proofs, signatures).
+        self.client = maritime_client
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._batch_roots = {}  # root_hex -> {"signature_ok", "anchored", "error"}
+        self.summary = None
+
+    def _chunks(self, delivery_ids=None, statuses=("QUANTUM_SEALED",), limit=None):
+        # Keyset walk over bunker_records by id, one short session per chunk.
+        last_id, remaining = 0, limit
+        while remaining is None or remaining > 0:
+            size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+            query = select(*VERIFY_COLUMNS).where(models.BunkerRecord.id > last_id)
+            if delivery_ids is not None:
+                query = query.where(models.BunkerRecord.delivery_id.in_(delivery_ids))
+            elif statuses:
+                query = query.where(models.BunkerRecord.status.in_(statuses))
+            query = query.order_by(models.BunkerRecord.id).limit(size)
+
+            db = SessionLocal()
+            try:
+                rows = [dict(row._mapping) for row in db.execute(query)]
+            finally:
+                db.close()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                return
+
+    def _load_batch_roots(self, rows):
+        roots = {r["seal_batch_root"] for r in rows if r["seal_batch_root"]} - self._batch_roots.keys()
+        if not roots:
+            return
+        db = SessionLocal()
+        try:
+            batches = db.execute(
+                select(models.SealBatch.root, models.SealBatch.quantum_signature)
+                .where(models.SealBatch.root.in_(roots))
+            ).all()
+        finally:
+            db.close()
+
+        # A handful of roots per chunk: cheap enough to verify here rather than queue behind the workers.
+        signatures = dict(batches)
+        signature_ok = verify_batch_roots(list(signatures.items()))
+        for root in roots:
+            self._batch_roots[root] = {"signature_ok": signature_ok.get(root), "anchored": None, "error": None}
+            if root not in signatures:
+                self._batch_roots[root]["error"] = "Seal batch missing from seal_batches"
+
+        if self.client is not None and signatures:
+            try:
+                calls = [self.client.contract.functions.sealBatches(bytes.fromhex(root)) for root in signatures]
+                for root, (timestamp, _, sig_hash) in zip(signatures, self._rpc_batches(calls)):
+                    self._batch_roots[root]["anchored"] = (
+                        timestamp != 0 and bytes(sig_hash) == Web3.keccak(signatures[root])
+                    )
+            except Exception as e:
+                for root in signatures:
+                    self._batch_roots[root]["error"] = f"On-chain batch lookup failed: {e}"
+
+    def _rpc_batches(self, calls):
+        for i in range(0, len(calls), VERIFY_RPC_BATCH):
+            yield from self.client.batch_call(calls[i:i + VERIFY_RPC_BATCH])
+
+    def _chain_lookups(self, rows):
+        # Registry addresses and single-seal notes for a whole chunk, as a few JSON-RPC batches.
+        if self.client is None:
+            return {"error": None, "notes": {}}
+        try:
+            self.client.prefetch_registry(
+                imos={r["imo_number"] for r in rows if r["imo_number"]},
+                supplier_ids={r["supplier_id"] for r in rows if r["supplier_id"] is not None},
+            )
+            anchored = [r["delivery_id"] for r in rows
+                        if r["status"] == "QUANTUM_SEALED" and not r["seal_batch_root"]]
+            calls = [self.client.contract.functions.getNote(bytes.fromhex(d)) for d in anchored]
+            return {"error": None, "notes": dict(zip(anchored, self._rpc_batches(calls)))}
+        except Exception as e:
+            return {"error": f"On-chain lookup failed: {e}", "notes": {}}
+
+    def _finish(self, rows, futures, chain):
+        offchain = [result for future in futures for result in future.result()]
+        for row, result in zip(rows, offchain):
+            checks, errors = result["checks"], result["errors"]
+
+            if chain["error"]:
+                errors.append(chain["error"])
+            elif self.client is not None and result["recovered"]:
+                checks["ecdsa_supplier"] = result["recovered"]["supplier"] == self.client.barge(row["supplier_id"])
+                checks["ecdsa_chief"] = result["recovered"]["chief"] == self.client.chief_engineer(row["imo_number"])
+
+            root = row["seal_batch_root"]
+            if root:
+                batch = self._batch_roots[root]
+                checks["mldsa"] = batch["signature_ok"]
+                if self.client is not None:
+                    checks["anchor"] = batch["anchored"]
+                if batch["error"]:
+                    errors.append(batch["error"])
+            elif row["delivery_id"] in chain["notes"]:
+                note = chain["notes"][row["delivery_id"]]
+                # The note stores keccak256 commitments; compare them with the local copies.
+                checks["anchor"] = (
+                    note[NOTE_STATUS] == NOTE_QUANTUM_SEALED
+                    and bytes(note[NOTE_PDF_HASH]) == Web3.keccak(bytes.fromhex(row["pdf_hash"]))
+                    and bytes(note[NOTE_QUANTUM_SIGNATURE_HASH]) == Web3.keccak(row["quantum_signature"] or b"")
+                    and bytes(note[NOTE_SIGNATURES_HASH]) == signatures_hash(row["sig_supplier"] or b"",
+                                                                              row["sig_chief"] or b"")
+                )
+
+            checks = {name: checks[name] for name in CHECKS if checks.get(name) is not None}
+            yield {
+                "delivery_id": row["delivery_id"],
+                "status": row["status"],
+                "ok": bool(checks) and all(checks.values()) and not errors,
+                "checks": checks,
+                "signers": result["recovered"],
+                "errors": errors,
+            }
+
+    def run(self, delivery_ids=None, statuses=("QUANTUM_SEALED",), limit=None):
+        # Yields one report per record as soon as its chunk is done; self.summary is set at the end.
+        started = time.perf_counter()
+        totals = {"records": 0, "passed": 0, "failed": 0, "failed_checks": {name: 0 for name in CHECKS}}
+        pending = deque()
+
+        def drain(entry):
+            for report in self._finish(*entry):
+                totals["records"] += 1
+                totals["passed" if report["ok"] else "failed"] += 1
+                for name, ok in report["checks"].items():
+                    if not ok:
+                        totals["failed_checks"][name] += 1
+                yield report
+
+        # Spawned: this runs on a threadpool thread of the server, and a forked worker could
+        # inherit a lock another thread holds.
+        with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for rows in self._chunks(delivery_ids, statuses, limit):
+                futures = [pool.submit(verify_offchain, rows[i:i + VERIFY_TASK_SIZE])
+                           for i in range(0, len(rows), VERIFY_TASK_SIZE)]
+                # The workers hash and verify while this thread does the RPC round-trips.
+                self._load_batch_roots(rows)
+                pending.append((rows, futures, self._chain_lookups(rows)))
+                while len(pending) >= MAX_CHUNKS_IN_FLIGHT:
+                    yield from drain(pending.popleft())
+            while pending:
+                yield from drain(pending.popleft())
+
+        elapsed = time.perf_counter() - started
+        totals["elapsed_seconds"] = round(elapsed, 3)
+        totals["records_per_second"] = round(totals["records"] / elapsed, 1) if elapsed else None
+        totals["chain_checks"] = self.client is not None
+        self.summary = totals
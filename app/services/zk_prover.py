@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from app.core.telemetry import get_logger
+
+BLOCKCHAIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "blockchain")
+CIRCUIT_PATH = os.getenv("ZK_CIRCUIT_PATH", os.path.join(BLOCKCHAIN_DIR, "circuits", "target", "circuits.json"))
+WORKER_SCRIPT = os.path.join(BLOCKCHAIN_DIR, "js-script", "prover_worker.ts")
+ZK_PROVER_CMD = os.getenv("ZK_PROVER_CMD", f"npx tsx {WORKER_SCRIPT}")
+ZK_PROVER_THREADS = int(os.getenv("ZK_PROVER_THREADS", "1"))  # bb.js threads per worker
+ZK_PROVER_WORKERS = int(os.getenv("ZK_PROVER_WORKERS", str(max(1, (os.cpu_count() or 2) // ZK_PROVER_THREADS))))
+ZK_PROVER_QUEUE = int(os.getenv("ZK_PROVER_QUEUE", "256"))
+ZK_PROOF_TIMEOUT = float(os.getenv("ZK_PROOF_TIMEOUT", "120"))
+ZK_VK_CACHE_DIR = os.getenv("ZK_VK_CACHE_DIR", os.path.join(BLOCKCHAIN_DIR, "..", "data", "zk"))
+
+# BN254 scalar field; every circuit input must be below it.
+FIELD_MODULUS = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+# main.nr casts sulphur_content and threshold to u32, so anything wider would be truncated.
+MAX_U32 = 2**32 - 1
+
+log = get_logger(__name__)
+
+
+class ProverBusy(Exception):
+    pass
+
+
+class ProofError(Exception):
+    pass
+
+
+def circuit_digest(circuit_path=CIRCUIT_PATH):
+    # Keys the cached verification key; a recompiled circuit gets a new one.
+    with open(circuit_path, "rb") as f:
+        return hashlib.sha256(json.loads(f.read())["bytecode"].encode()).hexdigest()
+
+
+def _field(value, name):
+    if isinstance(value, str):
+        value = int(value, 16) if value.startswith("0x") else int(value)
+    if not 0 <= value < FIELD_MODULUS:
+        raise ValueError(f"{name} is outside the BN254 scalar field")
+    return value
+
+
+def proof_inputs(sulphur_content, threshold, salt):
+    sulphur_content, threshold = _field(sulphur_content, "sulphur_content"), _field(threshold, "threshold")
+    if sulphur_content > MAX_U32 or threshold > MAX_U32:
+        raise ValueError("sulphur_content and threshold must fit in a u32")
+    # Checked here so a non-compliant value never occupies a prover.
+    if sulphur_content > threshold:
+        raise ValueError("sulphur_content exceeds threshold; no proof exists")
+    return {"sulphur_content": str(sulphur_content), "threshold": str(threshold), "salt": str(_field(salt, "salt"))}
+
+
+class _Worker:
+    # One Node process plus the thread that feeds it. Each worker proves one input at a time, so
+    # the number of workers is the concurrency limit.
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.proc = None
+        self.ready = False
+        self.startup_ms = None
+        self.thread = threading.Thread(target=self._run, name=f"zk-prover-{index}", daemon=True)
+
+    def _spawn(self):
+        started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            self.pool.command + [self.pool.circuit_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+            env={**os.environ, "ZK_PROVER_THREADS": str(self.pool.threads)},
+        )
+        hello = self.proc.stdout.readline()
+        if not hello or not json.loads(hello).get("ready"):
+            self.proc.kill()
+            raise ProofError(f"Prover worker {self.index} exited during startup")
+        self.startup_ms = round((time.perf_counter() - started) * 1000)
+        self.ready = True
+        self.pool._worker_ready(self)
+
+    def _request(self, request):
+        # A hung proof is killed, which ends the readline below and fails just that job.
+        timer = threading.Timer(self.pool.timeout, self.proc.kill)
+        timer.start()
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            line = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError):
+            line = ""
+        finally:
+            timer.cancel()
+        if not line:
+            self.proc.kill()
+            self.proc, self.ready = None, False
+            raise ProofError("Prover worker died or timed out")
+        response = json.loads(line)
+        if "error" in response:
+            raise ProofError(response["error"])
+        return response
+
+    def _run(self):
+        while not self.pool._closed.is_set():
+            if self.proc is None:
+                try:
+                    self._spawn()
+                except Exception as e:
+                    log.error("ZK prover worker failed to start", worker=self.index, error=str(e))
+                    self.pool._closed.wait(5)
+                    continue
+
+            job = self.pool._jobs.get()
+            if job is None:
+                break
+            request, future, queued_at = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                response = self._request(request)
+                self.pool._record(time.perf_counter() - queued_at, response.get("ms"))
+                future.set_result(response)
+            except Exception as e:
+                self.pool._record_failure()
+                future.set_exception(e)
+
+        if self.proc is not None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class ProverPool:
+    # Warm Noir/UltraHonk provers for the sulphur range circuit (blockchain/circuits/src/main.nr).
+    # Submissions go through a bounded queue; when it is full submit() raises ProverBusy instead
+    # of letting latency grow without bound.
+
+    def __init__(self, workers=ZK_PROVER_WORKERS, max_queue=ZK_PROVER_QUEUE, circuit_path=CIRCUIT_PATH,
+                 command=ZK_PROVER_CMD, threads=ZK_PROVER_THREADS, timeout=ZK_PROOF_TIMEOUT,
+                 vk_cache_dir=ZK_VK_CACHE_DIR):
+        self.workers = workers
+        self.circuit_path = os.path.abspath(circuit_path)
+        self.command = shlex.split(command)
+        self.threads = threads
+        self.timeout = timeout
+        self.vk_cache_dir = vk_cache_dir
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._closed = threading.Event()
+        self._ready = threading.Semaphore(0)
+        self._workers = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._vk = None
+        self.completed = 0
+        self.failed = 0
+        self._latency_total = 0.0
+        self._prove_ms_total = 0
+
+    def start(self):
+        for index in range(self.workers):
+            worker = _Worker(self, index)
+            self._workers.append(worker)
+            worker.thread.start()
+        return self
+
+    def wait_ready(self, timeout=None, count=None):
+        # Blocks until `count` workers (default: all) have loaded the circuit and run their warm-up.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in range(count or self.workers):
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            if not self._ready.acquire(timeout=remaining):
+                return False
+        return True
+
+    def _worker_ready(self, worker):
+        log.info("ZK prover worker ready", worker=worker.index, startup_ms=worker.startup_ms)
+        self._ready.release()
+
+    def _record(self, latency, prove_ms):
+        with self._lock:
+            self.completed += 1
+            self._latency_total += latency
+            self._prove_ms_total += prove_ms or 0
+
+    def _record_failure(self):
+        with self._lock:
+            self.failed += 1
+
+    def _submit(self, request):
+        if self._closed.is_set():
+            raise ProofError("Prover pool is stopped")
+        with self._lock:
+            self._next_id += 1
+            request["id"] = self._next_id
+        future = Future()
+        try:
+            self._jobs.put_nowait((request, future, time.perf_counter()))
+        except queue.Full:
+            raise ProverBusy(f"{self._jobs.maxsize} proofs already queued")
+        return future
+
+    def submit(self, sulphur_content, threshold, salt):
+        # -> Future of {"proof", "public_inputs", "commitment", "threshold"}
+        inputs = proof_inputs(sulphur_content, threshold, salt)
+        raw = self._submit({"op": "prove", "inputs": inputs})
+        future = Future()
+
+        def done(f):
+            if f.exception() is not None:
+                future.set_exception(f.exception())
+                return
+            response = f.result()
+            future.set_result({
+                "proof": bytes.fromhex(response["proof"][2:]),
+                # [threshold, commitment], as bytes32 values for the verifier
+                "public_inputs": [bytes.fromhex(p[2:]) for p in response["public_inputs"]],
+                "commitment": bytes.fromhex(response["commitment"][2:].rjust(64, "0")),
+                "threshold": int(inputs["threshold"]),
+            })
+
+        raw.add_done_callback(done)
+        return future
+
+    def prove(self, sulphur_content, threshold, salt, timeout=None):
+        return self.submit(sulphur_content, threshold, salt).result(timeout)
+
+    def verification_key(self):
+        # Deterministic for a given circuit, so it is computed by a worker once and then served from
+        # ZK_VK_CACHE_DIR across restarts, keyed by the circuit bytecode digest.
+        if self._vk is not None:
+            return self._vk
+        digest = circuit_digest(self.circuit_path)
+        path = os.path.join(self.vk_cache_dir, f"{digest}.vk")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self._vk = f.read()
+            return self._vk
+
+        response = self._submit({"op": "vk"}).result(self.timeout)
+        vk = bytes.fromhex(response["vk"][2:])
+        os.makedirs(self.vk_cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(vk)
+        os.replace(tmp_path, path)
+        self._vk = vk
+        return vk
+
+    def stop(self):
+        self._closed.set()
+        # Fail whatever is still queued, then wake each worker thread so it can exit.
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None and job[1].set_running_or_notify_cancel():
+                job[1].set_exception(ProofError("Prover pool is stopped"))
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.thread.join(10)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "ready": sum(1 for w in self._workers if w.ready),
+                "queued": self._jobs.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_latency_ms": round(self._latency_total * 1000 / self.completed, 1) if self.completed else None,
+                "avg_prove_ms": round(self._prove_ms_total / self.completed, 1) if self.completed else None,
+                "worker_startup_ms": [w.startup_ms for w in self._workers],
+            }
+
+
+_prover = None
+_prover_lock = threading.Lock()
+
+
+def get_prover() -> ProverPool:
+    # Started on first use: services that never prove never spawn Node.
+    global _prover
+    if _prover is None:
+        with _prover_lock:
+            if _prover is None:
+                _prover = ProverPool().start()
+    return _prover
+
+
+def prover_stats():
+    return _prover.stats() if _prover is not None else {"workers": 0, "started": False}
+
+
+def shutdown_prover():
+    global _prover
+    with _prover_lock:
+        if _prover is not None:
+            _prover.stop()
+            _prover = None
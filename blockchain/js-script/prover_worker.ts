@@ -0,0 +1,71 @@
+import { UltraHonkBackend } from "@aztec/bb.js";
+import { Noir } from "@noir-lang/noir_js";
+import path from 'path';
+import fs from 'fs';
+import readline from 'readline';
+
+// Long-lived prover for app/services/zk_prover.py. The circuit and UltraHonk backend are loaded
+// once; requests arrive as one JSON object per line on stdin and each gets one JSON line back on
+// stdout, in order:
+//   {"id": 1, "op": "prove", "inputs": {"sulphur_content": "...", "threshold": "...", "salt": "..."}}
+//   {"id": 2, "op": "vk"}
+// stdout carries only protocol lines, so bb.js console output is dropped (or sent to stderr).
+
+const circuitPath = process.argv[2] || path.resolve(__dirname, '../circuits/target/circuits.json');
+const threads = parseInt(process.env.ZK_PROVER_THREADS || "1", 10);
+const debug = process.env.ZK_PROVER_DEBUG === "1";
+
+const circuit = JSON.parse(fs.readFileSync(circuitPath, 'utf8'));
+console.log = debug ? (...args: any[]) => console.error(...args) : () => {};
+
+const toHex = (bytes: Uint8Array) => "0x" + Buffer.from(bytes).toString("hex");
+
+function reply(message: object) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+async function prove(noir: Noir, honk: UltraHonkBackend, inputs: Record<string, string>) {
+    const { witness, returnValue } = await noir.execute(inputs);
+    // keccak transcript, matching the on-chain HonkVerifier in src/Verifier.sol
+    const { proof, publicInputs } = await honk.generateProof(witness, { keccak: true });
+    return { proof: toHex(proof), public_inputs: publicInputs, commitment: returnValue };
+}
+
+async function main() {
+    const started = Date.now();
+    const noir = new Noir(circuit);
+    const honk = new UltraHonkBackend(circuit.bytecode, { threads });
+
+    // One throwaway proof pays for WASM instantiation and the CRS download before the pool
+    // reports this worker as ready.
+    if (process.env.ZK_PROVER_WARMUP !== "0") {
+        await prove(noir, honk, { sulphur_content: "0", threshold: "0", salt: "0" });
+    }
+    reply({ ready: true, pid: process.pid, startup_ms: Date.now() - started });
+
+    const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+    for await (const line of lines) {
+        if (!line.trim()) continue;
+        let request: any = {};
+        const t0 = Date.now();
+        try {
+            request = JSON.parse(line);
+            if (request.op === "vk") {
+                const vk = await honk.getVerificationKey({ keccak: true });
+                reply({ id: request.id, vk: toHex(vk), ms: Date.now() - t0 });
+            } else {
+                const result = await prove(noir, honk, request.inputs);
+                reply({ id: request.id, ...result, ms: Date.now() - t0 });
+            }
+        } catch (error: any) {
+            reply({ id: request.id, error: String(error?.message || error) });
+        }
+    }
+    await honk.destroy();
+    process.exit(0);
+}
+
+main().catch((error) => {
+    console.error("Prover worker failed to start:", error);
+    process.exit(1);
+});
@@ -6,6 +6,7 @@ import {
     MessageHashUtils
 } from "@openzeppelin/contracts/utils/cryptography/MessageHashUtils.sol";
 import {Ownable} from "@openzeppelin/contracts/access/Ownable.sol";
+import {SafeCast} from "@openzeppelin/contracts/utils/math/SafeCast.sol";
 
 contract MaritimeRegistry is Ownable {
     using ECDSA for bytes32;
@@ -18,25 +19,43 @@ contract MaritimeRegistry is Ownable {
         QuantumSealed
     }
 
+    // The numeric fields and the status share one slot. Signatures are only kept in calldata and
+    // events; storage holds keccak256 commitments to them and to the SHA3-512 PDF digest.
     struct BunkerNote {
+        uint64 supplierId;
+        uint32 densityAt15C;
+        uint32 sulphurContent;
+        uint64 quantityMT;
+        uint48 timestamp;
+        BunkerStatus status;
         string imoNumber;
-        uint256 supplierId;
-        uint256 densityAt15C;
-        uint256 sulphurContent;
-        uint256 quantityMT;
         string sampleId;
-        uint256 timestamp;
-        BunkerStatus status;
-        bytes signatureSupplier;
-        bytes signatureChiefEng;
-        string pdfHash;
-        bytes quantumSignature;
+        bytes32 signaturesHash; // keccak256(abi.encode(sigSupplier, sigChiefEng))
+        bytes32 pdfHash; // keccak256 of the 64-byte SHA3-512 digest
+        bytes32 quantumSignatureHash;
     }
 
     mapping(string => address) public shipToChiefEng;
     mapping(uint256 => address) public supplierToBarge;
     mapping(bytes32 => BunkerNote) public bunkerNotes;
 
+    struct SealBatch {
+        uint64 timestamp;
+        uint32 leafCount;
+        bytes32 quantumSignatureHash;
+    }
+
+    mapping(bytes32 => SealBatch) public sealBatches;
+
+    struct Nomination {
+        bytes32 deliveryId;
+        string imo;
+        uint256 supplierId;
+        uint256 expectedSulphur;
+    }
+
+    event ShipRegistered(string imo, address chiefEng);
+    event SupplierRegistered(uint256 indexed supplierId, address barge);
     event BunkerNominated(
         bytes32 indexed deliveryId,
         string imo,
@@ -49,7 +68,9 @@ contract MaritimeRegistry is Ownable {
         bytes sigSupplier,
         bytes sigChiefEng
     );
-    event QuantumSealAnchored(bytes32 indexed deliveryId, string pdfHash);
+    event BunkerNominationRejected(bytes32 indexed deliveryId, string reason);
+    event QuantumSealAnchored(bytes32 indexed deliveryId, bytes pdfHash, bytes32 quantumSignatureHash);
+    event QuantumSealBatchAnchored(bytes32 indexed merkleRoot, uint32 leafCount, bytes32 quantumSignatureHash);
 
     constructor() Ownable(msg.sender) {}
 
@@ -58,6 +79,7 @@ contract MaritimeRegistry is Ownable {
         address _chiefEng
     ) external onlyOwner {
         shipToChiefEng[_imo] = _chiefEng;
+        emit ShipRegistered(_imo, _chiefEng);
     }
 
     function registerSupplier(
@@ -65,6 +87,7 @@ contract MaritimeRegistry is Ownable {
         address _barge
     ) external onlyOwner {
         supplierToBarge[_supplierId] = _barge;
+        emit SupplierRegistered(_supplierId, _barge);
     }
 
     function nominateBunker(
@@ -82,10 +105,40 @@ contract MaritimeRegistry is Ownable {
             "Delivery ID exists"
         );
 
-        bunkerNotes[_deliveryId].imoNumber = _imo;
-        bunkerNotes[_deliveryId].supplierId = _supplierId;
-        bunkerNotes[_deliveryId].sulphurContent = _expectedSulphur;
-        bunkerNotes[_deliveryId].status = BunkerStatus.Nominated;
+        _nominate(_deliveryId, _imo, _supplierId, _expectedSulphur);
+    }
+
+    // Day-ahead schedules: one transaction for many stems. An invalid item is skipped with a
+    // BunkerNominationRejected event instead of reverting the whole batch.
+    function nominateBunkerBatch(
+        Nomination[] calldata _nominations
+    ) external returns (uint256 nominated) {
+        require(_nominations.length > 0, "Empty batch");
+
+        for (uint256 i = 0; i < _nominations.length; i++) {
+            Nomination calldata n = _nominations[i];
+            if (msg.sender != supplierToBarge[n.supplierId]) {
+                emit BunkerNominationRejected(n.deliveryId, "Only authorized barge can nominate");
+            } else if (bunkerNotes[n.deliveryId].status != BunkerStatus.None) {
+                emit BunkerNominationRejected(n.deliveryId, "Delivery ID exists");
+            } else {
+                _nominate(n.deliveryId, n.imo, n.supplierId, n.expectedSulphur);
+                nominated++;
+            }
+        }
+    }
+
+    function _nominate(
+        bytes32 _deliveryId,
+        string calldata _imo,
+        uint256 _supplierId,
+        uint256 _expectedSulphur
+    ) internal {
+        BunkerNote storage note = bunkerNotes[_deliveryId];
+        note.supplierId = SafeCast.toUint64(_supplierId);
+        note.sulphurContent = SafeCast.toUint32(_expectedSulphur);
+        note.status = BunkerStatus.Nominated;
+        note.imoNumber = _imo;
 
         emit BunkerNominated(_deliveryId, _imo, _supplierId);
     }
@@ -122,13 +175,12 @@ contract MaritimeRegistry is Ownable {
         require(recoveredSupplier == supplierToBarge[note.supplierId], "Invalid Supplier Signature");
         require(recoveredChief == shipToChiefEng[note.imoNumber], "Invalid Chief Engineer Signature");
 
-        note.densityAt15C = _finalDensity;
-        note.quantityMT = _finalQty;
-        note.sampleId = _sampleId;
-        note.signatureSupplier = _sigSupplier;
-        note.signatureChiefEng = _sigChiefEng;
-        note.timestamp = block.timestamp;
+        note.densityAt15C = SafeCast.toUint32(_finalDensity);
+        note.quantityMT = SafeCast.toUint64(_finalQty);
+        note.timestamp = uint48(block.timestamp);
         note.status = BunkerStatus.Finalized;
+        note.sampleId = _sampleId;
+        note.signaturesHash = keccak256(abi.encode(_sigSupplier, _sigChiefEng));
 
         emit BunkerFinalized(
             _deliveryId,
@@ -139,19 +191,40 @@ contract MaritimeRegistry is Ownable {
         );
     }
 
+    // _pdfHash is the raw SHA3-512 digest of the eBDN PDF; the ML-DSA signature stays in calldata.
     function anchorQuantumSeal(
         bytes32 _deliveryId,
-        string calldata _pdfHash,
-        bytes calldata _quantumSig //update this as the bytes32 hash of the signature
+        bytes calldata _pdfHash,
+        bytes calldata _quantumSig
     ) external onlyOwner {
         BunkerNote storage note = bunkerNotes[_deliveryId];
         require(note.status == BunkerStatus.Finalized, "Bunker not finalized");
 
-        note.pdfHash = _pdfHash;
-        note.quantumSignature = _quantumSig;
+        bytes32 sigHash = keccak256(_quantumSig);
         note.status = BunkerStatus.QuantumSealed;
+        note.pdfHash = keccak256(_pdfHash);
+        note.quantumSignatureHash = sigHash;
+
+        emit QuantumSealAnchored(_deliveryId, _pdfHash, sigHash);
+    }
+
+    // One SHA3-256 Merkle root covers many sealed eBDNs; only the ML-DSA signature hash is stored.
+    function anchorQuantumSealBatch(
+        bytes32 _merkleRoot,
+        uint32 _leafCount,
+        bytes calldata _quantumSig
+    ) external onlyOwner {
+        require(_leafCount > 0, "Empty batch");
+        require(sealBatches[_merkleRoot].timestamp == 0, "Batch already anchored");
+
+        bytes32 sigHash = keccak256(_quantumSig);
+        sealBatches[_merkleRoot] = SealBatch({
+            timestamp: uint64(block.timestamp),
+            leafCount: _leafCount,
+            quantumSignatureHash: sigHash
+        });
 
-        emit QuantumSealAnchored(_deliveryId, _pdfHash);
+        emit QuantumSealBatchAnchored(_merkleRoot, _leafCount, sigHash);
     }
 
     function getNote(
@@ -160,8 +233,12 @@ contract MaritimeRegistry is Ownable {
         return bunkerNotes[_deliveryId];
     }
 
+    // The signatures are not stored: pass the ones from the BunkerFinalized event (or the
+    // finalizeBunker calldata); they must match the stored commitment.
     function verifyStoredNote(
-        bytes32 _deliveryId
+        bytes32 _deliveryId,
+        bytes calldata _sigSupplier,
+        bytes calldata _sigChiefEng
     )
         external
         view
@@ -177,6 +254,10 @@ contract MaritimeRegistry is Ownable {
             note.status >= BunkerStatus.Finalized,
             "Bunker note not finalized"
         );
+        require(
+            keccak256(abi.encode(_sigSupplier, _sigChiefEng)) == note.signaturesHash,
+            "Signatures do not match note"
+        );
 
         bytes32 messageHash = keccak256(
             abi.encode(
@@ -190,8 +271,8 @@ contract MaritimeRegistry is Ownable {
             )
         ).toEthSignedMessageHash();
 
-        address actualBarge = messageHash.recover(note.signatureSupplier);
-        address actualChief = messageHash.recover(note.signatureChiefEng);
+        address actualBarge = messageHash.recover(_sigSupplier);
+        address actualChief = messageHash.recover(_sigChiefEng);
 
         bool supplierMatch = (actualBarge == supplierToBarge[note.supplierId]);
         bool shipMatch = (actualChief == shipToChiefEng[note.imoNumber]);
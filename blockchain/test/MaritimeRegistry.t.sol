@@ -16,7 +16,8 @@ contract MaritimeRegistryTest is Test {
     bytes32 constant DELIVERY_ID = keccak256("Bunker_Job_001");
     uint256 constant EXPECTED_SULPHUR = 49;
 
-    string constant MOCK_PDF_HASH = "af2bdbe1aa9b6ec1e2ade1d694f41fc71a831d02621ec82097a1";
+    bytes MOCK_PDF_HASH =
+        hex"85c322dfe5d8b730a62512e8c939dea22fd9f96d7ee1c6cf038c0a387a7cf5db017c028ea00e5df06509a5cbee3a5624db943bdfd99296a324dac78889333db2";
     bytes MOCK_QUANTUM_SIG = hex"aabbccddeeff11223344556677889900aabbccddeeff";
 
     function setUp() public {
@@ -28,7 +29,7 @@ contract MaritimeRegistryTest is Test {
         registry = new MaritimeRegistry();
     }
 
-    function _reachFinalizedState() internal {
+    function _reachFinalizedState() internal returns (bytes memory sigSupplier, bytes memory sigChief) {
         vm.startPrank(admin.addr);
         registry.registerShip(IMO, chiefEng.addr);
         registry.registerSupplier(SUPPLIER_ID, supplier.addr);
@@ -46,10 +47,10 @@ contract MaritimeRegistryTest is Test {
         bytes32 ethSignedHash = MessageHashUtils.toEthSignedMessageHash(messageHash);
 
         (uint8 vS, bytes32 rS, bytes32 sS) = vm.sign(supplier.privateKey, ethSignedHash);
-        bytes memory sigSupplier = abi.encodePacked(rS, sS, vS);
+        sigSupplier = abi.encodePacked(rS, sS, vS);
 
         (uint8 vC, bytes32 rC, bytes32 sC) = vm.sign(chiefEng.privateKey, ethSignedHash);
-        bytes memory sigChief = abi.encodePacked(rC, sC, vC);
+        sigChief = abi.encodePacked(rC, sC, vC);
 
         vm.prank(admin.addr);
         registry.finalizeBunker(DELIVERY_ID, finalDensity, finalQty, sampleId, sigSupplier, sigChief);
@@ -67,14 +68,53 @@ contract MaritimeRegistryTest is Test {
 
         vm.prank(admin.addr);
         vm.expectEmit(true, false, false, true);
-        emit MaritimeRegistry.QuantumSealAnchored(DELIVERY_ID, MOCK_PDF_HASH);
+        emit MaritimeRegistry.QuantumSealAnchored(DELIVERY_ID, MOCK_PDF_HASH, keccak256(MOCK_QUANTUM_SIG));
 
         registry.anchorQuantumSeal(DELIVERY_ID, MOCK_PDF_HASH, MOCK_QUANTUM_SIG);
 
         MaritimeRegistry.BunkerNote memory noteAfter = registry.getNote(DELIVERY_ID);
         assertEq(uint256(noteAfter.status), uint256(MaritimeRegistry.BunkerStatus.QuantumSealed));
-        assertEq(noteAfter.pdfHash, MOCK_PDF_HASH);
-        assertEq(noteAfter.quantumSignature, MOCK_QUANTUM_SIG);
+        assertEq(noteAfter.pdfHash, keccak256(MOCK_PDF_HASH));
+        assertEq(noteAfter.quantumSignatureHash, keccak256(MOCK_QUANTUM_SIG));
+    }
+
+    function test_FinalizedNoteIsPacked() public {
+        (bytes memory sigSupplier, bytes memory sigChief) = _reachFinalizedState();
+
+        MaritimeRegistry.BunkerNote memory note = registry.getNote(DELIVERY_ID);
+        assertEq(note.imoNumber, IMO);
+        assertEq(uint256(note.supplierId), SUPPLIER_ID);
+        assertEq(uint256(note.densityAt15C), 991);
+        assertEq(uint256(note.sulphurContent), EXPECTED_SULPHUR);
+        assertEq(uint256(note.quantityMT), 500);
+        assertEq(note.sampleId, "SEAL-2026");
+        assertEq(uint256(note.timestamp), block.timestamp);
+        assertEq(note.signaturesHash, keccak256(abi.encode(sigSupplier, sigChief)));
+    }
+
+    function test_VerifyStoredNote() public {
+        (bytes memory sigSupplier, bytes memory sigChief) = _reachFinalizedState();
+
+        (bool valid, string memory imo, address chief, address barge) =
+            registry.verifyStoredNote(DELIVERY_ID, sigSupplier, sigChief);
+        assertTrue(valid);
+        assertEq(imo, IMO);
+        assertEq(chief, chiefEng.addr);
+        assertEq(barge, supplier.addr);
+
+        vm.expectRevert("Signatures do not match note");
+        registry.verifyStoredNote(DELIVERY_ID, sigChief, sigSupplier);
+    }
+
+    function test_NominationOverflowReverts() public {
+        vm.startPrank(admin.addr);
+        registry.registerShip(IMO, chiefEng.addr);
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopPrank();
+
+        vm.prank(supplier.addr);
+        vm.expectRevert();
+        registry.nominateBunker(DELIVERY_ID, IMO, SUPPLIER_ID, uint256(type(uint32).max) + 1);
     }
 
     function test_AnchorWithoutFinalization() public {
@@ -90,4 +130,118 @@ contract MaritimeRegistryTest is Test {
         vm.expectRevert("Bunker not finalized");
         registry.anchorQuantumSeal(DELIVERY_ID, MOCK_PDF_HASH, MOCK_QUANTUM_SIG);
     }
+
+    function test_QuantumSealBatchAnchoring() public {
+        bytes32 root = keccak256("merkle_root");
+
+        vm.expectRevert();
+        vm.prank(chiefEng.addr);
+        registry.anchorQuantumSealBatch(root, 3, MOCK_QUANTUM_SIG);
+
+        vm.prank(admin.addr);
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.QuantumSealBatchAnchored(root, 3, keccak256(MOCK_QUANTUM_SIG));
+        registry.anchorQuantumSealBatch(root, 3, MOCK_QUANTUM_SIG);
+
+        (uint64 timestamp, uint32 leafCount, bytes32 sigHash) = registry.sealBatches(root);
+        assertEq(uint256(timestamp), block.timestamp);
+        assertEq(uint256(leafCount), 3);
+        assertEq(sigHash, keccak256(MOCK_QUANTUM_SIG));
+
+        vm.prank(admin.addr);
+        vm.expectRevert("Batch already anchored");
+        registry.anchorQuantumSealBatch(root, 3, MOCK_QUANTUM_SIG);
+    }
+
+    function test_EmptyBatchReverts() public {
+        vm.prank(admin.addr);
+        vm.expectRevert("Empty batch");
+        registry.anchorQuantumSealBatch(keccak256("merkle_root"), 0, MOCK_QUANTUM_SIG);
+    }
+
+    function _nomination(bytes32 deliveryId, uint256 supplierId)
+        internal
+        pure
+        returns (MaritimeRegistry.Nomination memory)
+    {
+        return MaritimeRegistry.Nomination(deliveryId, IMO, supplierId, EXPECTED_SULPHUR);
+    }
+
+    function test_NominateBunkerBatch() public {
+        vm.startPrank(admin.addr);
+        registry.registerShip(IMO, chiefEng.addr);
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopPrank();
+
+        MaritimeRegistry.Nomination[] memory batch = new MaritimeRegistry.Nomination[](3);
+        for (uint256 i = 0; i < batch.length; i++) {
+            batch[i] = _nomination(keccak256(abi.encode("Bunker_Job_Batch", i)), SUPPLIER_ID);
+        }
+
+        vm.prank(supplier.addr);
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.BunkerNominated(batch[0].deliveryId, IMO, SUPPLIER_ID);
+        uint256 nominated = registry.nominateBunkerBatch(batch);
+        assertEq(nominated, 3);
+
+        for (uint256 i = 0; i < batch.length; i++) {
+            MaritimeRegistry.BunkerNote memory note = registry.getNote(batch[i].deliveryId);
+            assertEq(uint256(note.status), uint256(MaritimeRegistry.BunkerStatus.Nominated));
+            assertEq(note.imoNumber, IMO);
+            assertEq(uint256(note.supplierId), SUPPLIER_ID);
+            assertEq(uint256(note.sulphurContent), EXPECTED_SULPHUR);
+        }
+    }
+
+    function test_NominateBunkerBatchSkipsInvalidItems() public {
+        vm.startPrank(admin.addr);
+        registry.registerShip(IMO, chiefEng.addr);
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopPrank();
+
+        vm.prank(supplier.addr);
+        registry.nominateBunker(DELIVERY_ID, IMO, SUPPLIER_ID, EXPECTED_SULPHUR);
+
+        bytes32 freshId = keccak256("Bunker_Job_002");
+        bytes32 otherSupplierId = keccak256("Bunker_Job_003");
+        MaritimeRegistry.Nomination[] memory batch = new MaritimeRegistry.Nomination[](3);
+        batch[0] = _nomination(DELIVERY_ID, SUPPLIER_ID);
+        batch[1] = _nomination(freshId, SUPPLIER_ID);
+        batch[2] = _nomination(otherSupplierId, 7700);
+
+        vm.prank(supplier.addr);
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.BunkerNominationRejected(DELIVERY_ID, "Delivery ID exists");
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.BunkerNominated(freshId, IMO, SUPPLIER_ID);
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.BunkerNominationRejected(otherSupplierId, "Only authorized barge can nominate");
+        uint256 nominated = registry.nominateBunkerBatch(batch);
+        assertEq(nominated, 1);
+
+        assertEq(uint256(registry.getNote(freshId).status), uint256(MaritimeRegistry.BunkerStatus.Nominated));
+        assertEq(uint256(registry.getNote(otherSupplierId).status), uint256(MaritimeRegistry.BunkerStatus.None));
+    }
+
+    function test_EmptyNominationBatchReverts() public {
+        MaritimeRegistry.Nomination[] memory batch = new MaritimeRegistry.Nomination[](0);
+        vm.prank(supplier.addr);
+        vm.expectRevert("Empty batch");
+        registry.nominateBunkerBatch(batch);
+    }
+
+    function test_RegistrationEmitsEvents() public {
+        vm.startPrank(admin.addr);
+        vm.expectEmit(false, false, false, true);
+        emit MaritimeRegistry.ShipRegistered(IMO, chiefEng.addr);
+        registry.registerShip(IMO, chiefEng.addr);
+
+        vm.expectEmit(true, false, false, true);
+        emit MaritimeRegistry.SupplierRegistered(SUPPLIER_ID, supplier.addr);
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopPrank();
+
+        assertEq(registry.shipToChiefEng(IMO), chiefEng.addr);
+        assertEq(registry.supplierToBarge(SUPPLIER_ID), supplier.addr);
+    }
 }
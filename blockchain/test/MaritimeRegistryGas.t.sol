@@ -0,0 +1,170 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import {Test, Vm} from "forge-std/Test.sol";
+import {MaritimeRegistry, MessageHashUtils} from "../src/MaritimeRegistry.sol";
+
+// Gas per lifecycle step, written to snapshots/MaritimeRegistry.json by `forge test`:
+//   forge test --match-contract MaritimeRegistryGasTest --isolate
+// `forge snapshot --diff` or the JSON diff in review shows what a layout change costs.
+contract MaritimeRegistryGasTest is Test {
+    string constant GROUP = "MaritimeRegistry";
+
+    MaritimeRegistry public registry;
+
+    Vm.Wallet public admin;
+    Vm.Wallet public supplier;
+    Vm.Wallet public chiefEng;
+
+    string constant IMO = "IMO9876543";
+    uint256 constant SUPPLIER_ID = 5500;
+    bytes32 constant DELIVERY_ID = keccak256("Bunker_Job_001");
+    uint256 constant EXPECTED_SULPHUR = 49;
+    uint256 constant FINAL_DENSITY = 991;
+    uint256 constant FINAL_QTY = 500;
+    string constant SAMPLE_ID = "SEAL-2026";
+    uint256 constant BATCH_SIZE = 10;
+    uint256 constant MLDSA65_SIGNATURE_BYTES = 3309;
+
+    bytes pdfHash;
+    bytes quantumSig;
+    bytes sigSupplier;
+    bytes sigChief;
+
+    function setUp() public {
+        admin = vm.createWallet("admin_wallet");
+        supplier = vm.createWallet("supplier_wallet");
+        chiefEng = vm.createWallet("chief_engineer_wallet");
+
+        vm.prank(admin.addr);
+        registry = new MaritimeRegistry();
+
+        // Same sizes as production: a SHA3-512 digest and an ML-DSA-65 signature.
+        pdfHash = abi.encodePacked(keccak256("pdf"), keccak256("pdf2"));
+        quantumSig = new bytes(MLDSA65_SIGNATURE_BYTES);
+        for (uint256 i = 0; i < quantumSig.length; i++) {
+            quantumSig[i] = bytes1(uint8(i * 7 + 1));
+        }
+
+        bytes32 ethSignedHash = MessageHashUtils.toEthSignedMessageHash(
+            keccak256(
+                abi.encode(DELIVERY_ID, IMO, SUPPLIER_ID, FINAL_DENSITY, EXPECTED_SULPHUR, FINAL_QTY, SAMPLE_ID)
+            )
+        );
+        (uint8 vS, bytes32 rS, bytes32 sS) = vm.sign(supplier.privateKey, ethSignedHash);
+        sigSupplier = abi.encodePacked(rS, sS, vS);
+        (uint8 vC, bytes32 rC, bytes32 sC) = vm.sign(chiefEng.privateKey, ethSignedHash);
+        sigChief = abi.encodePacked(rC, sC, vC);
+    }
+
+    function _register() internal {
+        vm.startPrank(admin.addr);
+        registry.registerShip(IMO, chiefEng.addr);
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopPrank();
+    }
+
+    function _nominate() internal {
+        vm.prank(supplier.addr);
+        registry.nominateBunker(DELIVERY_ID, IMO, SUPPLIER_ID, EXPECTED_SULPHUR);
+    }
+
+    function _finalize() internal {
+        vm.prank(admin.addr);
+        registry.finalizeBunker(DELIVERY_ID, FINAL_DENSITY, FINAL_QTY, SAMPLE_ID, sigSupplier, sigChief);
+    }
+
+    function test_Gas_Register() public {
+        vm.startPrank(admin.addr);
+        vm.startSnapshotGas(GROUP, "registerShip");
+        registry.registerShip(IMO, chiefEng.addr);
+        vm.stopSnapshotGas();
+
+        vm.startSnapshotGas(GROUP, "registerSupplier");
+        registry.registerSupplier(SUPPLIER_ID, supplier.addr);
+        vm.stopSnapshotGas();
+        vm.stopPrank();
+    }
+
+    function test_Gas_Nominate() public {
+        _register();
+
+        vm.prank(supplier.addr);
+        vm.startSnapshotGas(GROUP, "nominateBunker");
+        registry.nominateBunker(DELIVERY_ID, IMO, SUPPLIER_ID, EXPECTED_SULPHUR);
+        vm.stopSnapshotGas();
+    }
+
+    function test_Gas_NominateBatch() public {
+        _register();
+
+        MaritimeRegistry.Nomination[] memory batch = new MaritimeRegistry.Nomination[](BATCH_SIZE);
+        for (uint256 i = 0; i < BATCH_SIZE; i++) {
+            batch[i] = MaritimeRegistry.Nomination(
+                keccak256(abi.encode("Bunker_Job_Batch", i)), IMO, SUPPLIER_ID, EXPECTED_SULPHUR
+            );
+        }
+
+        vm.prank(supplier.addr);
+        vm.startSnapshotGas(GROUP, "nominateBunkerBatch_10");
+        registry.nominateBunkerBatch(batch);
+        uint256 used = vm.stopSnapshotGas();
+        vm.snapshotValue(GROUP, "nominateBunkerBatch_perItem", used / BATCH_SIZE);
+    }
+
+    function test_Gas_Finalize() public {
+        _register();
+        _nominate();
+
+        vm.prank(admin.addr);
+        vm.startSnapshotGas(GROUP, "finalizeBunker");
+        registry.finalizeBunker(DELIVERY_ID, FINAL_DENSITY, FINAL_QTY, SAMPLE_ID, sigSupplier, sigChief);
+        vm.stopSnapshotGas();
+    }
+
+    function test_Gas_AnchorQuantumSeal() public {
+        _register();
+        _nominate();
+        _finalize();
+
+        vm.prank(admin.addr);
+        vm.startSnapshotGas(GROUP, "anchorQuantumSeal");
+        registry.anchorQuantumSeal(DELIVERY_ID, pdfHash, quantumSig);
+        vm.stopSnapshotGas();
+    }
+
+    function test_Gas_AnchorQuantumSealBatch() public {
+        vm.prank(admin.addr);
+        vm.startSnapshotGas(GROUP, "anchorQuantumSealBatch");
+        registry.anchorQuantumSealBatch(keccak256("merkle_root"), uint32(BATCH_SIZE), quantumSig);
+        vm.stopSnapshotGas();
+    }
+
+    function test_Gas_Reads() public {
+        _register();
+        _nominate();
+        _finalize();
+
+        vm.startSnapshotGas(GROUP, "getNote");
+        registry.getNote(DELIVERY_ID);
+        vm.stopSnapshotGas();
+
+        vm.startSnapshotGas(GROUP, "verifyStoredNote");
+        (bool valid,,,) = registry.verifyStoredNote(DELIVERY_ID, sigSupplier, sigChief);
+        vm.stopSnapshotGas();
+        assertTrue(valid);
+    }
+
+    function test_Gas_FullLifecycle() public {
+        _register();
+
+        vm.startSnapshotGas(GROUP, "lifecycle_nominate_finalize_anchor");
+        _nominate();
+        _finalize();
+        vm.prank(admin.addr);
+        registry.anchorQuantumSeal(DELIVERY_ID, pdfHash, quantumSig);
+        vm.stopSnapshotGas();
+
+        assertEq(uint256(registry.getNote(DELIVERY_ID).status), uint256(MaritimeRegistry.BunkerStatus.QuantumSealed));
+    }
+}
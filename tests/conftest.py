@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Settings are read when the app modules are imported, so the test database and blob store are
+# chosen here, before any test module imports them.
+WORKDIR = tempfile.mkdtemp(prefix="maritime-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/test.db"
+os.environ["BLOB_STORE_DIR"] = os.path.join(WORKDIR, "blobs")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from app import models
+from app.core.leader import NotLeader
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.services import finalization
+from app.services.finalization import FinalizationJobRunner
+
+DELIVERY_ID = "0x" + "ab" * 32
+
+
+class FakeClient:
+    # `errors` are raised, in order, by the approval request before it goes through.
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.requests = 0
+        self.cancelled = []
+
+    async def request_finalization_approval(self, delivery_id, density, qty, sample_id):
+        self.requests += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def await_finalization_approval(self, delivery_id, timeout=60, requested_at=None):
+        raise ValueError("Telegram bot token revoked")
+
+    def cancel_finalization_approval(self, delivery_id):
+        self.cancelled.append(delivery_id)
+
+
+@pytest.fixture
+def record_id(monkeypatch):
+    monkeypatch.setattr(finalization, "JOB_RETRY_MAX_BACKOFF", 0)
+    run_migrations(engine)
+    with SessionLocal() as db:
+        db.execute(delete(models.BunkerRecord))
+        record = models.BunkerRecord(delivery_id=DELIVERY_ID, imo_number="IMO9876543", supplier_id=5500,
+                                     status="FINALIZING", density=991, actual_qty=500, sample_id="S-1")
+        db.add(record)
+        db.commit()
+        return record.id
+
+
+def stored(record_id):
+    with SessionLocal() as db:
+        record = db.get(models.BunkerRecord, record_id)
+        return record.status, record.job_error
+
+
+def test_transient_errors_are_retried_in_place(record_id):
+    client = FakeClient([ConnectionError("All RPC endpoints failed"), asyncio.TimeoutError()])
+
+    asyncio.run(FinalizationJobRunner(client)._run(record_id))
+
+    # Two retries of the request, then the approval wait fails for good.
+    assert client.requests == 3
+    assert stored(record_id) == ("FAILED", "Telegram bot token revoked")
+    assert client.cancelled == [bytes.fromhex("ab" * 32)]
+
+
+def test_terminal_error_fails_the_job_and_drops_the_waiter(record_id):
+    client = FakeClient([ValueError("sample_id missing")])
+
+    asyncio.run(FinalizationJobRunner(client)._run(record_id))
+
+    assert client.requests == 1
+    assert stored(record_id) == ("FAILED", "sample_id missing")
+    assert client.cancelled == [bytes.fromhex("ab" * 32)]
+
+
+def test_demotion_keeps_the_job_state(record_id):
+    client = FakeClient([NotLeader("lease lost")])
+
+    asyncio.run(FinalizationJobRunner(client)._run(record_id))
+
+    # The new leader picks the job up where it stopped; only this process's waiter goes.
+    assert stored(record_id) == ("FINALIZING", None)
+    assert client.cancelled == [bytes.fromhex("ab" * 32)]
@@ -0,0 +1,161 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select
+
+from app import models
+from app.core import leader
+from app.core.leader import LeaderElection, NotLeader
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+
+TTL = 15
+RENEW = 5
+
+
+class Clock:
+    # Drives both the wall clock written to the lease row and the monotonic clock behind the
+    # local validity window.
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def utcnow(self):
+        return datetime.datetime(2026, 1, 1) + datetime.timedelta(seconds=self.now)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(leader, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(leader, "_utcnow", clock.utcnow)
+    run_migrations(engine)
+    with SessionLocal() as db:
+        db.execute(delete(models.Lease))
+        db.commit()
+    return clock
+
+
+def election(events=None, name="test-lease"):
+    node = LeaderElection(name=name, ttl=TTL, renew_interval=RENEW, eligible=True)
+    if events is not None:
+        async def elected():
+            events.append(("elected", node.token))
+
+        async def demoted():
+            events.append(("demoted", node.token))
+
+        node.on_elected(elected)
+        node.on_demoted(demoted)
+    return node
+
+
+def stored_lease():
+    with SessionLocal() as db:
+        lease = db.scalar(select(models.Lease).where(models.Lease.name == "test-lease"))
+        return lease.holder, lease.token, lease.expires_at
+
+
+def test_first_contender_acquires_and_the_other_waits(clock):
+    events = []
+    a, b = election(events), election()
+
+    async def scenario():
+        await a._step()
+        await b._step()
+
+    asyncio.run(scenario())
+    assert a.is_leader and a.token == 1
+    assert not b.is_leader and b.token is None
+    assert events == [("elected", 1)]
+    assert stored_lease()[:2] == (a.holder, 1)
+    with pytest.raises(NotLeader):
+        b.check()
+
+
+def test_renewal_extends_the_lease_and_keeps_the_token(clock):
+    a, b = election(), election()
+
+    async def scenario():
+        await a._step()
+        for _ in range(5):
+            clock.advance(RENEW)
+            await a._step()
+            await b._step()
+
+    asyncio.run(scenario())
+    a.check()
+    assert a.token == 1 and b.token is None
+    assert stored_lease()[2] == clock.utcnow() + datetime.timedelta(seconds=TTL)
+
+
+def test_expired_lease_is_taken_over_with_a_new_fencing_token(clock):
+    events = []
+    a, b = election(events), election()
+
+    async def scenario():
+        await a._step()
+        # a stalls (GC pause, partition) past the TTL without renewing.
+        clock.advance(TTL + 1)
+        assert not a.is_leader
+        await b._step()
+        await a._step()
+
+    asyncio.run(scenario())
+    assert b.is_leader and b.token == 2
+    assert not a.is_leader and a.token is None
+    assert events == [("elected", 1), ("demoted", None)]
+    assert stored_lease()[:2] == (b.holder, 2)
+
+
+def test_local_validity_ends_before_the_lease_expires(clock):
+    a, b = election(), election()
+
+    async def scenario():
+        await a._step()
+        # Past ttl - renew_interval a stops trusting its lease, while the row still blocks b.
+        clock.advance(TTL - RENEW + 0.1)
+        assert not a.is_leader
+        await b._step()
+        assert not b.is_leader
+
+    asyncio.run(scenario())
+
+
+def test_failed_renewal_keeps_the_remaining_validity(clock, monkeypatch):
+    a = election()
+    asyncio.run(a._step())
+
+    async def unreachable():
+        raise ConnectionError("database unreachable")
+
+    monkeypatch.setattr(a, "_acquire_or_renew", unreachable)
+    clock.advance(RENEW)
+    asyncio.run(a._step())
+    assert a.is_leader
+    clock.advance(RENEW)
+    asyncio.run(a._step())
+    assert not a.is_leader
+
+
+def test_stop_releases_the_lease_to_a_standby(clock):
+    events = []
+    a, b = election(events), election()
+
+    async def scenario():
+        await a._step()
+        await a.stop()
+        await b._step()
+
+    asyncio.run(scenario())
+    assert events == [("elected", 1), ("demoted", 1)]
+    assert a.token is None
+    assert b.is_leader and b.token == 2
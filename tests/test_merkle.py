@@ -0,0 +1,67 @@
+import hashlib
+
+import pytest
+
+from app.services.merkle import build_tree, leaf_hash, merkle_proof, merkle_root, node_hash, verify_ebdn, verify_proof
+
+
+def leaves(n):
+    return [leaf_hash(f"0x{i:064x}", hashlib.sha3_512(bytes([i])).hexdigest()) for i in range(n)]
+
+
+@pytest.mark.parametrize("size", range(1, 34))
+def test_every_proof_verifies_against_the_root(size):
+    items = leaves(size)
+    levels = build_tree(items)
+    root = merkle_root(levels)
+
+    for index, leaf in enumerate(items):
+        proof = merkle_proof(levels, index)
+        assert verify_proof(leaf, proof, root)
+        assert verify_proof(leaf, proof, "0x" + root.hex())
+
+
+def test_odd_node_is_carried_up_unpaired():
+    a, b, c = leaves(3)
+    assert merkle_root(build_tree([a, b, c])) == node_hash(node_hash(a, b), c)
+    assert merkle_proof(build_tree([a, b, c]), 2) == [{"position": "left", "hash": node_hash(a, b).hex()}]
+
+
+def test_empty_tree_is_rejected():
+    with pytest.raises(ValueError):
+        build_tree([])
+
+
+@pytest.mark.parametrize("size", [2, 5, 8, 13])
+def test_tampered_proofs_are_rejected(size):
+    items = leaves(size)
+    levels = build_tree(items)
+    root = merkle_root(levels)
+    index = size // 2
+    proof = merkle_proof(levels, index)
+
+    # Another leaf with this leaf's proof.
+    assert not verify_proof(items[index - 1], proof, root)
+    # A flipped bit in a sibling hash.
+    flipped = bytearray.fromhex(proof[0]["hash"])
+    flipped[0] ^= 1
+    assert not verify_proof(items[index], [{**proof[0], "hash": flipped.hex()}, *proof[1:]], root)
+    # A sibling on the wrong side.
+    swapped = {"left": "right", "right": "left"}
+    assert not verify_proof(items[index], [{**proof[0], "position": swapped[proof[0]["position"]]}, *proof[1:]], root)
+    # A step dropped or the root of another tree.
+    assert not verify_proof(items[index], proof[1:], root)
+    assert not verify_proof(items[index], proof, merkle_root(build_tree(leaves(size + 1))))
+
+
+def test_verify_ebdn_checks_the_pdf_and_the_proof():
+    pdfs = [b"%%PDF-1.4 delivery %d" % i for i in range(3)]
+    hashes = [hashlib.sha3_512(pdf).hexdigest() for pdf in pdfs]
+    ids = [f"0x{i:064x}" for i in range(3)]
+    levels = build_tree([leaf_hash(d, h) for d, h in zip(ids, hashes)])
+    root = merkle_root(levels).hex()
+    proof = merkle_proof(levels, 1)
+
+    assert verify_ebdn(pdfs[1], ids[1], hashes[1], proof, root)
+    assert not verify_ebdn(pdfs[1] + b" ", ids[1], hashes[1], proof, root)
+    assert not verify_ebdn(pdfs[1], ids[2], hashes[1], proof, root)
@@ -0,0 +1,261 @@
+import asyncio
+
+import pytest
+from eth_abi import encode as abi_encode
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from hexbytes import HexBytes
+from pydantic import ValidationError
+from sqlalchemy import delete, event, insert, select
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+from app import models, schemas
+from app.api.endpoints import router
+from app.core.blockchain import NOMINATION_BASE_GAS, NOMINATION_ITEM_GAS, MaritimeClient
+from app.core.transactions import TransactionDropped
+from app.database import AsyncSessionLocal, SessionLocal, engine
+from app.migrations import run_migrations
+
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+# The two MaritimeRegistry entries nominate_bunker_batch uses.
+ABI = [
+    {
+        "type": "function", "name": "nominateBunkerBatch", "stateMutability": "nonpayable",
+        "inputs": [{"name": "_nominations", "type": "tuple[]", "internalType": "struct MaritimeRegistry.Nomination[]",
+                    "components": [{"name": "deliveryId", "type": "bytes32"}, {"name": "imo", "type": "string"},
+                                   {"name": "supplierId", "type": "uint256"},
+                                   {"name": "expectedSulphur", "type": "uint256"}]}],
+        "outputs": [{"name": "nominated", "type": "uint256"}],
+    },
+    {
+        "type": "event", "name": "BunkerNominationRejected", "anonymous": False,
+        "inputs": [{"name": "deliveryId", "type": "bytes32", "indexed": True},
+                   {"name": "reason", "type": "string", "indexed": False}],
+    },
+]
+REJECTED_TOPIC = Web3.keccak(text="BunkerNominationRejected(bytes32,string)")
+
+
+def delivery_id(n):
+    return Web3.keccak(text=f"batch-{n}")
+
+
+def nominations(count):
+    return [(delivery_id(i), "IMO9876543", 5500, 49) for i in range(count)]
+
+
+def receipt(tx_hash, status=1, rejected=()):
+    logs = [
+        AttributeDict({
+            "address": CONTRACT_ADDRESS, "topics": [REJECTED_TOPIC, HexBytes(did)],
+            "data": HexBytes(abi_encode(["string"], [reason])), "logIndex": i, "transactionIndex": 0,
+            "transactionHash": tx_hash, "blockHash": HexBytes(b"\x01" * 32), "blockNumber": 1,
+        })
+        for i, (did, reason) in enumerate(rejected)
+    ]
+    return AttributeDict({"status": status, "transactionHash": tx_hash, "logs": logs})
+
+
+class FakeChain:
+    # Stands in for the submission and receipt side of MaritimeClient; `outcomes` holds, per
+    # submitted chunk in order, an exception to raise on submit, or a callable (tx_hash, chunk)
+    # returning the receipt or the exception the receipt wait resolves with.
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.submitted = []
+        self.remembered = []
+        self.receipts = {}
+
+    def client(self):
+        client = MaritimeClient.__new__(MaritimeClient)
+        client.contract = Web3().eth.contract(address=CONTRACT_ADDRESS, abi=ABI)
+        client.submit_transaction_async = self.submit
+        client.wait_for_receipt_async = self.wait
+        client.remember_nomination = lambda *n: self.remembered.append(n)
+        return client
+
+    async def submit(self, contract_function, private_key, tx_params=None, deliveries=1):
+        outcome = self.outcomes[len(self.submitted)]
+        chunk = contract_function.args[0]
+        self.submitted.append((chunk, tx_params, deliveries))
+        if isinstance(outcome, Exception):
+            raise outcome
+        tx_hash = HexBytes(bytes([len(self.submitted)]) * 32)
+        self.receipts[bytes(tx_hash)] = outcome(tx_hash, chunk)
+        return tx_hash
+
+    async def wait(self, tx_hash, timeout=120):
+        result = self.receipts[bytes(tx_hash)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_nominate_bunker_batch_chunks_and_maps_results():
+    items = nominations(5)
+    chain = FakeChain([
+        lambda tx_hash, chunk: receipt(tx_hash, rejected=[(chunk[1][0], "Delivery ID exists")]),
+        RuntimeError("nonce too low"),
+        lambda tx_hash, chunk: receipt(tx_hash, status=0),
+    ])
+
+    results = asyncio.run(chain.client().nominate_bunker_batch(items, "0xkey", chunk_size=2))
+
+    assert [len(chunk) for chunk, _, _ in chain.submitted] == [2, 2, 1]
+    assert [deliveries for _, _, deliveries in chain.submitted] == [2, 2, 1]
+    assert chain.submitted[0][1] == {"gas": NOMINATION_BASE_GAS + 2 * NOMINATION_ITEM_GAS}
+    assert chain.submitted[0][0][0] == items[0]
+
+    first_tx = (b"\x01" * 32).hex()
+    assert results[items[0][0]] == (True, first_tx, None)
+    assert results[items[1][0]] == (False, first_tx, "Delivery ID exists")
+    assert results[items[2][0]] == (False, None, "nonce too low")
+    assert results[items[3][0]] == (False, None, "nonce too low")
+    nominated, tx_hash, error = results[items[4][0]]
+    assert not nominated and tx_hash == (b"\x03" * 32).hex() and "reverted" in error
+    assert chain.remembered == [items[0]]
+
+
+def test_nominate_bunker_batch_receipt_error_fails_only_its_chunk():
+    items = nominations(3)
+    dropped = TransactionDropped(HexBytes(b"\x01" * 32), 7)
+    chain = FakeChain([lambda tx_hash, chunk: dropped, lambda tx_hash, chunk: receipt(tx_hash)])
+
+    results = asyncio.run(chain.client().nominate_bunker_batch(items, "0xkey", chunk_size=2))
+
+    assert results[items[0][0]] == (False, (b"\x01" * 32).hex(), str(dropped))
+    assert results[items[1][0]][0] is False
+    assert results[items[2][0]] == (True, (b"\x02" * 32).hex(), None)
+    assert chain.remembered == [items[2]]
+
+
+def test_nomination_batch_size_limits():
+    item = {"delivery_id": "d", "imo_number": "IMO9876543", "supplier_id": 5500, "expected_sulphur": 0.49}
+    with pytest.raises(ValidationError):
+        schemas.NominationBatch(nominations=[])
+    with pytest.raises(ValidationError):
+        schemas.NominationBatch(nominations=[item] * 1001)
+    assert len(schemas.NominationBatch(nominations=[item] * 1000).nominations) == 1000
+
+
+class FakeClient:
+    w3 = Web3()
+
+    def __init__(self, reject=(), error=None):
+        self.reject = set(reject)
+        self.error = error
+        self.calls = []
+
+    async def nominate_bunker_batch(self, nominations, barge_private_key):
+        self.calls.append(nominations)
+        if self.error is not None:
+            raise self.error
+        return {
+            n[0]: (False, "0xabc", "Only authorized barge can nominate") if n[0] in self.reject
+            else (True, "0xabc", None)
+            for n in nominations
+        }
+
+
+def stem(name):
+    return {"delivery_id": name, "imo_number": "IMO9876543", "supplier_id": 5500, "expected_sulphur": 0.49}
+
+
+def stored_ids():
+    with SessionLocal() as db:
+        return set(db.scalars(select(models.BunkerRecord.delivery_id)))
+
+
+def key(name):
+    return Web3.keccak(text=name).hex()
+
+
+@pytest.fixture
+def api():
+    run_migrations(engine)
+    with SessionLocal() as db:
+        db.execute(delete(models.BunkerRecord))
+        db.commit()
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as http:
+        yield app, http
+
+
+def test_batch_endpoint_all_nominated(api):
+    app, http = api
+    app.state.maritime_client = FakeClient()
+
+    body = http.post("/nominate/batch", json={"nominations": [stem("a"), stem("b")]}).json()
+
+    assert body["status"] == "success" and body["nominated"] == 2 and body["rejected"] == 0
+    assert [r["status"] for r in body["results"]] == ["nominated", "nominated"]
+    assert stored_ids() == {key("a"), key("b")}
+    # Sulphur goes on chain in hundredths.
+    assert app.state.maritime_client.calls[0][0][3] == 49
+
+
+def test_batch_endpoint_duplicates_and_chain_rejections(api):
+    app, http = api
+    with SessionLocal() as db:
+        db.add(models.BunkerRecord(delivery_id=key("old"), imo_number="IMO9876543", supplier_id=5500,
+                                   status="FINALIZED"))
+        db.commit()
+    app.state.maritime_client = FakeClient(reject=[Web3.keccak(text="c")])
+
+    body = http.post("/nominate/batch", json={"nominations": [stem("old"), stem("b"), stem("b"), stem("c")]}).json()
+
+    assert body["status"] == "partial" and body["nominated"] == 1 and body["rejected"] == 3
+    assert [(r["status"], r["error"]) for r in body["results"]] == [
+        ("rejected", "Delivery ID already exists"),
+        ("nominated", None),
+        ("rejected", "Delivery ID already exists"),
+        ("rejected", "Only authorized barge can nominate"),
+    ]
+    # Only the new, accepted ids reach the chain; the rejected stem's row is removed again and
+    # the pre-existing record is left alone.
+    assert [n[0] for n in app.state.maritime_client.calls[0]] == [Web3.keccak(text="b"), Web3.keccak(text="c")]
+    assert stored_ids() == {key("old"), key("b")}
+
+
+def test_batch_endpoint_chain_failure_rolls_back(api):
+    app, http = api
+    app.state.maritime_client = FakeClient(error=ConnectionError("RPC unreachable"))
+
+    body = http.post("/nominate/batch", json={"nominations": [stem("a"), stem("b")]}).json()
+
+    assert body["status"] == "failed" and body["nominated"] == 0
+    assert all(r["error"] == "Blockchain Nomination Failed: RPC unreachable" for r in body["results"])
+    assert stored_ids() == set()
+
+
+def test_batch_endpoint_falls_back_to_savepoints_on_race(api):
+    app, http = api
+    app.state.maritime_client = FakeClient()
+    raced = {"done": False}
+
+    # Another request inserts "b" after the duplicate check but before this one commits.
+    def insert_racing_row(session):
+        if not raced["done"]:
+            raced["done"] = True
+            with engine.begin() as conn:
+                conn.execute(insert(models.BunkerRecord).values(
+                    delivery_id=key("b"), imo_number="IMO9876543", supplier_id=5500, status="NOMINATED"
+                ))
+
+    event.listen(AsyncSessionLocal.class_.sync_session_class, "before_commit", insert_racing_row)
+    try:
+        body = http.post("/nominate/batch", json={"nominations": [stem("a"), stem("b"), stem("c")]}).json()
+    finally:
+        event.remove(AsyncSessionLocal.class_.sync_session_class, "before_commit", insert_racing_row)
+
+    assert raced["done"]
+    assert [(r["status"], r["error"]) for r in body["results"]] == [
+        ("nominated", None),
+        ("rejected", "Delivery ID already exists"),
+        ("nominated", None),
+    ]
+    assert [n[0] for n in app.state.maritime_client.calls[0]] == [Web3.keccak(text="a"), Web3.keccak(text="c")]
+    assert stored_ids() == {key("a"), key("b"), key("c")}
@@ -0,0 +1,153 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from eth_utils import keccak
+
+from app.core import rpc_pool
+from app.core.rpc_pool import AsyncPooledHTTPProvider, EndpointError, PooledHTTPProvider, RpcPool
+
+PRIMARY = "http://primary:8545"
+BACKUP = "http://backup:8545"
+RAW_TX = "0x02f86c0180843b9aca00"
+
+
+class StubNodes:
+    # Replaces the HTTP layer: `script[url]` lists, per request to that endpoint, an EndpointError to
+    # raise or a callable (request) returning the JSON-RPC response.
+
+    def __init__(self, monkeypatch, script):
+        self.script = {url: list(steps) for url, steps in script.items()}
+        self.sent = []
+
+        def post(endpoint, data, timeout=None):
+            return self.answer(endpoint, data)
+
+        async def post_async(session, endpoint, data, timeout=None):
+            return self.answer(endpoint, data)
+
+        monkeypatch.setattr(rpc_pool, "post", post)
+        monkeypatch.setattr(rpc_pool, "post_async", post_async)
+        monkeypatch.setattr(rpc_pool.random, "uniform", lambda low, high: 1.0)
+
+    def answer(self, endpoint, data):
+        request = json.loads(data)
+        self.sent.append((endpoint.url, request.get("method")))
+        step = self.script[endpoint.url].pop(0)
+        if isinstance(step, EndpointError):
+            raise step
+        return json.dumps(step(request)).encode()
+
+
+def result(value):
+    return lambda request: {"jsonrpc": "2.0", "id": request["id"], "result": value}
+
+
+def error(code, message):
+    return lambda request: {"jsonrpc": "2.0", "id": request["id"], "error": {"code": code, "message": message}}
+
+
+def providers(pool):
+    return PooledHTTPProvider(pool), AsyncPooledHTTPProvider(pool, coalesce_window=0)
+
+
+def test_failover_moves_on_and_ranks_the_failed_endpoint_last(monkeypatch):
+    nodes = StubNodes(monkeypatch, {PRIMARY: [EndpointError("timeout")], BACKUP: [result("0x10"), result("0x11")]})
+    pool = RpcPool([PRIMARY, BACKUP])
+    provider = PooledHTTPProvider(pool)
+
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x10"
+    assert [url for url, _ in nodes.sent] == [PRIMARY, BACKUP]
+
+    # The primary is in backoff, so the next request starts at the backup.
+    assert [e.url for e in pool.candidates()] == [BACKUP, PRIMARY]
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x11"
+    assert nodes.sent[-1] == (BACKUP, "eth_blockNumber")
+    assert pool.endpoints[0].failures == 1 and pool.endpoints[1].failures == 0
+
+
+def test_throttling_error_in_the_body_fails_over(monkeypatch):
+    StubNodes(monkeypatch, {PRIMARY: [error(-32005, "daily request count exceeded")], BACKUP: [result("0x1")]})
+    provider = PooledHTTPProvider(RpcPool([PRIMARY, BACKUP]))
+
+    assert provider.make_request("eth_chainId", [])["result"] == "0x1"
+
+
+def test_async_provider_fails_over(monkeypatch):
+    nodes = StubNodes(monkeypatch, {PRIMARY: [EndpointError("http_502")], BACKUP: [result("0x2a")]})
+    _, provider = providers(RpcPool([PRIMARY, BACKUP]))
+
+    assert asyncio.run(provider.make_request("eth_blockNumber", []))["result"] == "0x2a"
+    assert [url for url, _ in nodes.sent] == [PRIMARY, BACKUP]
+
+
+def test_every_endpoint_failing_raises_connection_error(monkeypatch):
+    StubNodes(monkeypatch, {PRIMARY: [EndpointError("connection")], BACKUP: [EndpointError("timeout")]})
+    provider = PooledHTTPProvider(RpcPool([PRIMARY, BACKUP]))
+
+    with pytest.raises(ConnectionError, match="last: timeout"):
+        provider.make_request("eth_blockNumber", [])
+
+
+def test_backoff_doubles_up_to_the_cap_and_resets_on_success(monkeypatch):
+    StubNodes(monkeypatch, {})
+    monkeypatch.setattr(rpc_pool, "RPC_BACKOFF_BASE", 0.5)
+    monkeypatch.setattr(rpc_pool, "RPC_BACKOFF_MAX", 3)
+    monkeypatch.setattr(rpc_pool, "time", SimpleNamespace(monotonic=lambda: 100.0))
+    pool = RpcPool([PRIMARY])
+    endpoint = pool.endpoints[0]
+
+    backoffs = []
+    for _ in range(5):
+        pool.begin(endpoint)
+        pool.failed(endpoint, EndpointError("timeout"))
+        backoffs.append(endpoint.unhealthy_until - 100.0)
+    assert backoffs == [0.5, 1.0, 2.0, 3, 3]
+    assert not endpoint.available(100.0) and endpoint.available(103.0)
+
+    # A Retry-After longer than the backoff wins.
+    pool.failed(endpoint, EndpointError("rate_limited", retry_after=20))
+    assert endpoint.unhealthy_until == 120.0
+
+    pool.begin(endpoint)
+    pool.succeeded(endpoint, 100.0)
+    assert endpoint.consecutive_failures == 0 and endpoint.available(100.0)
+    pool.failed(endpoint, EndpointError("timeout"))
+    assert endpoint.unhealthy_until - 100.0 == 0.5
+
+
+def test_resent_transaction_already_known_returns_its_hash(monkeypatch):
+    # The primary accepts the transaction but times out before answering; the backup already
+    # has it from gossip when the send is retried there.
+    script = {PRIMARY: [EndpointError("timeout")], BACKUP: [error(-32000, "already known")]}
+    expected = "0x" + keccak(bytes.fromhex(RAW_TX[2:])).hex()
+
+    StubNodes(monkeypatch, script)
+    sync, _ = providers(RpcPool([PRIMARY, BACKUP]))
+    response = sync.make_request("eth_sendRawTransaction", [RAW_TX])
+    assert response["result"] == expected and "error" not in response
+
+    StubNodes(monkeypatch, script)
+    _, async_ = providers(RpcPool([PRIMARY, BACKUP]))
+    response = asyncio.run(async_.make_request("eth_sendRawTransaction", [RAW_TX]))
+    assert response["result"] == expected
+
+
+def test_other_send_errors_are_passed_through(monkeypatch):
+    StubNodes(monkeypatch, {PRIMARY: [error(-32000, "nonce too low"), error(-32000, "already known")]})
+    provider = PooledHTTPProvider(RpcPool([PRIMARY]))
+
+    assert provider.make_request("eth_sendRawTransaction", [RAW_TX])["error"]["message"] == "nonce too low"
+    # "already known" only means success for a transaction send.
+    assert provider.make_request("eth_call", [{}, "latest"])["error"]["message"] == "already known"
+
+
+def test_probe_marks_lagging_endpoints(monkeypatch):
+    StubNodes(monkeypatch, {PRIMARY: [result(hex(100))], BACKUP: [result(hex(100 - rpc_pool.RPC_MAX_LAG_BLOCKS - 1))]})
+    pool = RpcPool([PRIMARY, BACKUP])
+
+    pool.probe()
+
+    assert [e.lagging for e in pool.endpoints] == [False, True]
+    assert [e.url for e in pool.candidates()] == [PRIMARY, BACKUP]
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.telegram import TelegramApprovalDispatcher
+
+CHIEF = 4242
+DELIVERY_ID = "0x6b582bd8" + "00" * 28
+PREFIX = "6b582bd8"
+
+
+class FakeTelegram:
+    # getUpdates long-polls the queued updates from `offset` on, like the Bot API; every call and
+    # its parameters are recorded.
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.updates = []
+        self.next_update_id = 100
+        self.calls = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, result):
+                body = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                fake.record("getUpdates", query)
+                self._reply(fake.get_updates(int(query.get("offset", 0)), float(query["timeout"])))
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                method = urlparse(self.path).path.rsplit("/", 1)[-1]
+                fake.record(method, payload)
+                self._reply({"message_id": 1, "date": int(time.time()), "chat": {"id": payload.get("chat_id")}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def record(self, method, params):
+        with self.cond:
+            self.calls.append((method, params))
+            self.cond.notify_all()
+
+    def push(self, **update):
+        with self.cond:
+            update["update_id"] = self.next_update_id
+            self.next_update_id += 1
+            self.updates.append(update)
+            self.cond.notify_all()
+        return update["update_id"]
+
+    def get_updates(self, offset, timeout):
+        with self.cond:
+            # Asking from `offset` confirms everything before it.
+            self.updates = [u for u in self.updates if u["update_id"] >= offset]
+            self.cond.wait_for(lambda: self.updates, timeout)
+            return list(self.updates)
+
+    def called(self, method):
+        with self.cond:
+            return [params for name, params in self.calls if name == method]
+
+    def wait_for(self, predicate, timeout=5):
+        with self.cond:
+            assert self.cond.wait_for(predicate, timeout)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def message(text, chat=CHIEF, sender=CHIEF, date=None):
+    return {"message_id": 7, "date": int(time.time()) if date is None else date,
+            "chat": {"id": chat}, "from": {"id": sender}, "text": text}
+
+
+@pytest.fixture
+def telegram():
+    fake = FakeTelegram()
+    yield fake
+    fake.stop()
+
+
+def run(telegram, scenario, sender_ids=None):
+    async def main():
+        dispatcher = TelegramApprovalDispatcher("TOKEN", str(CHIEF), api_url=telegram.url, poll_timeout=1,
+                                                sender_ids=sender_ids)
+        try:
+            return await scenario(dispatcher)
+        finally:
+            await dispatcher.stop()
+
+    return asyncio.run(main())
+
+
+def test_offset_acknowledges_processed_updates(telegram):
+    async def scenario(dispatcher):
+        first = telegram.push(message=message("hello"))
+        last = telegram.push(message=message("SIGN"))
+        await dispatcher.start()
+        await asyncio.to_thread(telegram.wait_for, lambda: len(telegram.called("getUpdates")) >= 2)
+        return first, last
+
+    first, last = run(telegram, scenario)
+    polls = telegram.called("getUpdates")
+    assert "offset" not in polls[0]
+    assert int(polls[1]["offset"]) == last + 1
+    assert json.loads(polls[0]["allowed_updates"]) == ["message", "callback_query"]
+    assert last == first + 1
+
+
+def test_sign_reply_approves_the_matching_delivery(telegram):
+    async def scenario(dispatcher):
+        await dispatcher.request_approval(DELIVERY_ID, "Approve delivery")
+        waiting = asyncio.create_task(dispatcher.wait_for_approval(DELIVERY_ID, timeout=5))
+        telegram.push(message=message("SIGN deadbeef"))
+        telegram.push(message=message(f"sign {PREFIX.upper()}"))
+        return await waiting
+
+    assert run(telegram, scenario) is True
+    prompt = telegram.called("sendMessage")[0]
+    assert prompt["chat_id"] == str(CHIEF)
+    assert f"SIGN {PREFIX}" in prompt["text"]
+    assert prompt["reply_markup"]["inline_keyboard"][0][0]["callback_data"] == f"SIGN:{PREFIX}"
+
+
+def test_button_press_approves_and_is_answered(telegram):
+    async def scenario(dispatcher):
+        await dispatcher.request_approval(DELIVERY_ID, "Approve delivery")
+        waiting = asyncio.create_task(dispatcher.wait_for_approval(DELIVERY_ID, timeout=5))
+        prompt = message("Approve delivery", sender=999)  # the bot's own message
+        telegram.push(callback_query={"id": "cb-1", "data": f"SIGN:{PREFIX}", "from": {"id": CHIEF},
+                                      "message": prompt})
+        approved = await waiting
+        await asyncio.to_thread(telegram.wait_for, lambda: telegram.called("answerCallbackQuery"))
+        return approved
+
+    assert run(telegram, scenario) is True
+    assert telegram.called("answerCallbackQuery") == [{"callback_query_id": "cb-1"}]
+
+
+@pytest.mark.parametrize("approval", [
+    message(f"SIGN {PREFIX}", chat=1111, sender=1111),  # another chat
+    message(f"SIGN {PREFIX}", sender=1111),  # someone else in the chief's chat
+    message(f"SIGN {PREFIX}", date=int(time.time()) - 600),  # answers an earlier request
+])
+def test_rejected_approvals(telegram, approval):
+    async def scenario(dispatcher):
+        waiting = asyncio.create_task(dispatcher.wait_for_approval(DELIVERY_ID, timeout=1.5))
+        telegram.push(message=approval)
+        return await waiting
+
+    assert run(telegram, scenario) is False
+
+
+def test_button_under_an_old_prompt_is_rejected(telegram):
+    async def scenario(dispatcher):
+        waiting = asyncio.create_task(dispatcher.wait_for_approval(DELIVERY_ID, timeout=1.5))
+        old_prompt = message("Approve delivery", sender=999, date=int(time.time()) - 600)
+        telegram.push(callback_query={"id": "cb-2", "data": f"SIGN:{PREFIX}", "from": {"id": CHIEF},
+                                      "message": old_prompt})
+        await asyncio.to_thread(telegram.wait_for, lambda: telegram.called("answerCallbackQuery"))
+        return await waiting
+
+    assert run(telegram, scenario) is False
+    assert telegram.called("answerCallbackQuery") == [{"callback_query_id": "cb-2"}]
+
+
+def test_configured_chief_user_may_approve_in_a_group(telegram):
+    async def scenario(dispatcher):
+        waiting = asyncio.create_task(dispatcher.wait_for_approval(DELIVERY_ID, timeout=5))
+        telegram.push(message=message(f"SIGN {PREFIX}", sender=77))
+        return await waiting
+
+    assert run(telegram, scenario, sender_ids=["77"]) is True
+
+
+def test_early_approval_is_kept_for_the_request_it_answers(telegram):
+    requested_at = int(time.time()) - 60
+
+    async def scenario(dispatcher):
+        await dispatcher.start()
+        # Seen before this process started waiting, e.g. while the job was being resumed.
+        telegram.push(message=message(f"SIGN {PREFIX}"))
+        await asyncio.to_thread(telegram.wait_for, lambda: len(telegram.called("getUpdates")) >= 2)
+        assert dispatcher.pending_approvals() == 0
+        return await dispatcher.wait_for_approval(DELIVERY_ID, timeout=1, requested_at=requested_at)
+
+    assert run(telegram, scenario) is True
+
+
+def test_early_approval_older_than_the_request_is_dropped(telegram):
+    async def scenario(dispatcher):
+        await dispatcher.start()
+        telegram.push(message=message(f"SIGN {PREFIX}", date=int(time.time()) - 600))
+        await asyncio.to_thread(telegram.wait_for, lambda: len(telegram.called("getUpdates")) >= 2)
+        return await dispatcher.wait_for_approval(DELIVERY_ID, timeout=1)
+
+    assert run(telegram, scenario) is False
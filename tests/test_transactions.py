@@ -0,0 +1,201 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import TransactionNotFound
+
+from app.core.transactions import NonceManager, ReceiptTracker, TransactionDropped
+
+SENDER = "0x" + "11" * 20
+
+
+class StubEth:
+    # The handful of eth_* calls NonceManager and ReceiptTracker make, backed by plain dicts.
+
+    def __init__(self, pending_count=5):
+        self.pending_count = pending_count
+        self.count_reads = 0
+        self.block_number = 100
+        self.receipts = {}
+        self.mempool = set()
+        self.raw_sent = []
+
+    def get_transaction_count(self, address, block_identifier):
+        self.count_reads += 1
+        return self.pending_count
+
+    def get_transaction_receipt(self, tx_hash):
+        if bytes(tx_hash) not in self.receipts:
+            raise TransactionNotFound(f"no receipt for {bytes(tx_hash).hex()}")
+        return self.receipts[bytes(tx_hash)]
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout):
+        return self.get_transaction_receipt(tx_hash)
+
+    def get_transaction(self, tx_hash):
+        if bytes(tx_hash) not in self.mempool and bytes(tx_hash) not in self.receipts:
+            raise TransactionNotFound(f"unknown {bytes(tx_hash).hex()}")
+        return {"hash": tx_hash}
+
+    def send_raw_transaction(self, raw):
+        tx_hash = HexBytes(raw)
+        self.raw_sent.append(raw)
+        self.mempool.add(bytes(tx_hash))
+        return tx_hash
+
+
+class AsyncStubEth:
+    def __init__(self, eth):
+        self.eth = eth
+
+    async def get_transaction_count(self, address, block_identifier):
+        return self.eth.get_transaction_count(address, block_identifier)
+
+
+def tx(n):
+    return HexBytes(bytes([n]) * 32)
+
+
+@pytest.fixture
+def w3():
+    return SimpleNamespace(eth=StubEth())
+
+
+def test_allocate_counts_up_from_the_pending_count(w3):
+    nonces = NonceManager(w3, SENDER)
+    allocated = []
+    threads = [threading.Thread(target=lambda: allocated.append(nonces.allocate())) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(allocated) == list(range(5, 25))
+    assert w3.eth.count_reads == 1
+
+
+def test_allocate_async_seeds_once(w3):
+    nonces = NonceManager(w3, SENDER)
+    async_w3 = SimpleNamespace(eth=AsyncStubEth(w3.eth))
+
+    async def allocate_many():
+        return await asyncio.gather(*(nonces.allocate_async(async_w3) for _ in range(5)))
+
+    assert sorted(asyncio.run(allocate_many())) == [5, 6, 7, 8, 9]
+
+
+def test_resync_waits_for_outstanding_nonces(w3):
+    nonces = NonceManager(w3, SENDER)
+    with nonces.reserve() as in_flight:
+        assert in_flight == 5
+        # The tracker finds a dropped tx meanwhile; the node's count (6 by now) misses nonce 5,
+        # which is still on its way, so re-reading it here would hand 5 out a second time.
+        w3.eth.pending_count = 6
+        nonces.resync()
+        with nonces.reserve() as next_nonce:
+            assert next_nonce == 6
+    assert w3.eth.count_reads == 1
+
+    w3.eth.pending_count = 4
+    assert nonces.allocate() == 4
+    assert w3.eth.count_reads == 2
+
+
+def test_failed_send_resyncs_once_the_last_nonce_settles(w3):
+    nonces = NonceManager(w3, SENDER)
+    first = nonces.allocate()
+    with pytest.raises(ConnectionError):
+        with nonces.reserve():
+            raise ConnectionError("send failed")
+    # 6 never reached the node, but 5 may still; the counter is kept until 5 settles.
+    assert nonces.allocate() == 7
+    nonces.settle(first, sent=True)
+    nonces.settle(7, sent=True)
+
+    w3.eth.pending_count = 6
+    assert nonces.allocate() == 6
+
+
+def test_receipt_resolves_the_tracked_future(w3):
+    tracker = ReceiptTracker(w3, poll_interval=0.01)
+    future = tracker.track(tx(1), SENDER, 5)
+    w3.eth.receipts[bytes(tx(1))] = {"status": 1, "transactionHash": tx(1)}
+
+    assert future.result(timeout=2)["status"] == 1
+    assert tracker.wait(tx(1), timeout=1)["status"] == 1
+    assert tracker.pending_count() == 0
+
+
+def test_dropped_tx_fails_its_future_and_resyncs_the_sender(w3):
+    nonces = NonceManager(w3, SENDER)
+    assert nonces.allocate() == 5
+    nonces.settle(5, sent=True)
+    tracker = ReceiptTracker(w3, poll_interval=0.01, drop_after=0)
+
+    future = tracker.track(tx(1), SENDER, 5, nonce_manager=nonces)
+
+    with pytest.raises(TransactionDropped) as dropped:
+        future.result(timeout=2)
+    assert dropped.value.nonce == 5 and dropped.value.tx_hash == tx(1)
+    w3.eth.pending_count = 5
+    assert nonces.allocate() == 5
+
+
+def test_tx_still_in_the_mempool_is_not_dropped(w3):
+    tracker = ReceiptTracker(w3, poll_interval=0.01, drop_after=0)
+    w3.eth.mempool.add(bytes(tx(1)))
+    future = tracker.track(tx(1), SENDER, 5)
+
+    tracker.poll()
+    assert not future.done()
+    w3.eth.receipts[bytes(tx(1))] = {"status": 1}
+    assert future.result(timeout=2) == {"status": 1}
+
+
+def test_stuck_tx_is_replaced_and_the_replacement_resolves_the_original(w3):
+    fee_oracle = SimpleNamespace(
+        replacement_fees=lambda w3, txn: {"maxFeePerGas": txn["maxFeePerGas"] * 2,
+                                          "maxPriorityFeePerGas": txn["maxPriorityFeePerGas"] * 2}
+    )
+    tracker = ReceiptTracker(w3, poll_interval=3600, fee_oracle=fee_oracle, replace_after_blocks=2)
+    txn = {"nonce": 5, "maxFeePerGas": 10, "maxPriorityFeePerGas": 1}
+    signed = []
+
+    def sign(txn):
+        signed.append(txn)
+        return bytes([len(signed) + 1]) * 32
+
+    w3.eth.mempool.add(bytes(tx(1)))
+    future = tracker.track(tx(1), SENDER, 5, txn=txn, sign=sign, label="anchorQuantumSeal")
+
+    tracker.poll()  # first sighting, at block 100
+    w3.eth.block_number = 101
+    tracker.poll()
+    assert signed == []
+    w3.eth.block_number = 102
+    tracker.poll()
+    assert signed == [{"nonce": 5, "maxFeePerGas": 20, "maxPriorityFeePerGas": 2}]
+    assert w3.eth.raw_sent == [bytes(tx(2))]
+
+    w3.eth.receipts[bytes(tx(2))] = {"status": 1, "transactionHash": tx(2)}
+    w3.eth.block_number = 103
+    tracker.poll()
+    assert future.result(timeout=1)["transactionHash"] == tx(2)
+    # Callers only know the original hash; it keeps pointing at the settled future.
+    assert tracker.wait(tx(1), timeout=1)["transactionHash"] == tx(2)
+
+
+def test_replacement_stops_at_the_fee_cap(w3):
+    tracker = ReceiptTracker(w3, poll_interval=3600, fee_oracle=SimpleNamespace(replacement_fees=lambda w3, txn: None),
+                             replace_after_blocks=1)
+    w3.eth.mempool.add(bytes(tx(1)))
+    future = tracker.track(tx(1), SENDER, 5, txn={"nonce": 5, "maxFeePerGas": 10}, sign=lambda txn: b"\x02" * 32)
+
+    for block in range(100, 105):
+        w3.eth.block_number = block
+        tracker.poll()
+
+    assert w3.eth.raw_sent == []
+    assert not future.done()
@@ -0,0 +1,71 @@
+import asyncio
+import gc
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import schemas
+from app.api import endpoints
+from app.services.verification import BatchVerifier
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    # BatchVerifier.run yields one record, then waits for `gate.open` before finishing.
+    gate = SimpleNamespace(streaming=threading.Event(), open=threading.Event())
+
+    def run(self, delivery_ids=None, statuses=("QUANTUM_SEALED",), limit=None):
+        yield {"delivery_id": "ab", "ok": True}
+        gate.streaming.set()
+        gate.open.wait(5)
+        self.summary = {"records": 1}
+
+    monkeypatch.setattr(BatchVerifier, "run", run)
+    yield gate
+    gate.open.set()
+
+
+def request():
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(maritime_client=None)))
+
+
+def test_second_run_is_refused_while_one_streams(gated):
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    app.state.maritime_client = None
+    body = {"check_chain": False}
+    responses = []
+
+    with TestClient(app) as http:
+        first = threading.Thread(target=lambda: responses.append(http.post("/verify/batch", json=body)))
+        first.start()
+        assert gated.streaming.wait(5)
+        assert http.post("/verify/batch", json=body).status_code == 429
+        gated.open.set()
+        first.join(5)
+
+        assert responses[0].text.splitlines() == ['{"delivery_id": "ab", "ok": true}', '{"summary": {"records": 1}}']
+        assert not endpoints._verify_lock.locked()
+        assert http.post("/verify/batch", json=body).status_code == 200
+
+
+def test_lock_is_released_when_the_report_never_starts(gated):
+    response = endpoints.verify_batch(schemas.VerifyBatch(check_chain=False), request())
+    assert endpoints._verify_lock.locked()
+    asyncio.run(response.background())
+    assert not endpoints._verify_lock.locked()
+
+    # Releasing twice must not free a run that started in between.
+    endpoints._verify_lock.acquire()
+    asyncio.run(response.background())
+    assert endpoints._verify_lock.locked()
+    endpoints._verify_lock.release()
+
+    # No background task either, e.g. the ASGI server dropped the response on a disconnect.
+    response = endpoints.verify_batch(schemas.VerifyBatch(check_chain=False), request())
+    del response
+    gc.collect()
+    assert not endpoints._verify_lock.locked()